@@ -0,0 +1 @@
+"""Benchmarks hors-ligne du bot (aucun navigateur ni réseau requis)."""
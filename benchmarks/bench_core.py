@@ -0,0 +1,220 @@
+"""
+Débit et surcoût des boucles principales, contre le WebDriver factice.
+
+- auto_like : itérations/s et commandes WebDriver par like ;
+- get_live_comments : coût selon le nombre de nœuds du chat (comparé au
+  mode observer, CommentCapture.poll) ;
+- send_message_to_tiktok : temps de bout en bout (inclut la pause fixe de
+  0,5 s avant saisie) ;
+- live_reply_loop : commentaires/s lus, générés et envoyés, avec une
+  génération IA simulée (--gen-latency-ms) et sans rythme d'envoi.
+
+Sans --human-delays, get_human_delay() est neutralisé pour ne mesurer que
+le bot lui-même. Les résultats sont écrits en JSON ; --compare affiche
+l'écart avec un résultat précédent.
+
+Usage : python -m benchmarks.bench_core [--latency-ms 1] [--nodes 50 200 1000]
+        [--duration 5] [--output res.json] [--compare ancien.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+
+import tik_backend
+from benchmarks.fake_driver import FakeDriver
+from tik_comments import CommentCapture
+
+_started = set()
+
+
+def start_once(name, target):
+    if name not in _started:
+        threading.Thread(target=target, name=name, daemon=True).start()
+        _started.add(name)
+
+
+def use_driver(driver):
+    tik_backend.driver = driver
+    start_once("driver-executor", tik_backend.driver_executor.serve_forever)
+
+
+def bench_auto_like(latency_ms, duration):
+    driver = FakeDriver(latency_ms, chat_nodes=50)
+    use_driver(driver)
+    tik_backend.auto_like_pause_event.set()
+    tik_backend.state.set("running", True)
+    start_once("auto-like", tik_backend.auto_like)
+    likes_before = tik_backend.state.get("likes_sent")
+    commands_before = sum(driver.commands.values())
+    time.sleep(duration)
+    tik_backend.state.set("running", False)
+    likes = tik_backend.state.get("likes_sent") - likes_before
+    return {
+        "likes": likes,
+        "iterations_per_s": round(likes / duration, 1),
+        "commands_per_like": round((sum(driver.commands.values()) - commands_before) / max(1, likes), 2),
+    }
+
+
+def bench_get_live_comments(latency_ms, node_counts, repeats):
+    results = {}
+    for nodes in node_counts:
+        driver = FakeDriver(latency_ms, chat_nodes=nodes)
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            comments = tik_backend.get_live_comments(driver)
+        scan = (time.perf_counter() - t0) / repeats
+        scan_commands = sum(driver.commands.values()) / repeats
+        capture = CommentCapture()
+        capture.poll(driver)
+        driver.commands.clear()
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            driver.add_comment()
+            capture.poll(driver)
+        observer = (time.perf_counter() - t0) / repeats
+        results[str(nodes)] = {
+            "comments": len(comments),
+            "scan_ms": round(scan * 1000, 2),
+            "scan_commands": round(scan_commands, 1),
+            "observer_ms": round(observer * 1000, 2),
+            "observer_commands": round(sum(driver.commands.values()) / repeats, 1),
+        }
+    return results
+
+
+def bench_send_message(latency_ms, iterations):
+    driver = FakeDriver(latency_ms, chat_nodes=50)
+    use_driver(driver)
+    durations = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        tik_backend.send_message_to_tiktok(f"message de test {i}")
+        durations.append(time.perf_counter() - t0)
+    durations.sort()
+    return {
+        "sent": len(driver.sent_messages),
+        "avg_ms": round(sum(durations) / len(durations) * 1000, 1),
+        "max_ms": round(durations[-1] * 1000, 1),
+    }
+
+
+def bench_live_reply_loop(latency_ms, duration, comments_per_s, gen_latency_ms):
+    driver = FakeDriver(latency_ms, chat_nodes=200, comments_per_s=comments_per_s)
+    use_driver(driver)
+
+    def fake_generate(user_text, previous_dialog=None, stream=False):
+        time.sleep(gen_latency_ms / 1000.0)
+        return f"Merci pour ton message : {user_text[:40]}"
+
+    tik_backend.chatgpt_generate_reply = fake_generate
+    tik_backend.auto_like_pause_event.clear()  # likes suspendus: on ne mesure que l'IA
+    tik_backend.state.set("ENABLE_AUTO_CHATGPT", True)
+    tik_backend.state.set("running", True)
+    start_once("live-reply", tik_backend.live_reply_loop)
+    while tik_backend.reply_pipeline is None:
+        time.sleep(0.05)
+    pipeline = tik_backend.reply_pipeline
+    pipeline.min_interval = pipeline.max_interval = 0
+    new_comments = tik_backend.metric_comments_new.labels()
+    submitted_before = new_comments.value
+    sent_before = len(driver.sent_messages)
+    time.sleep(duration)
+    tik_backend.state.set("running", False)
+    snap = pipeline.snapshot()
+    submitted = new_comments.value - submitted_before
+    sent = len(driver.sent_messages) - sent_before
+    return {
+        "offered_per_s": comments_per_s,
+        "read_per_s": round(submitted / duration, 1),
+        "sent_per_s": round(sent / duration, 1),
+        "ingest_depth": snap["ingest_depth"],
+        "dropped": snap["dropped"],
+        "end_to_end_p50_ms": snap["stages"]["end_to_end"]["p50_ms"],
+        "end_to_end_p95_ms": snap["stages"]["end_to_end"]["p95_ms"],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(tik_backend.__file__))).stdout.strip()
+    except OSError:
+        return None
+
+
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(old, new):
+    previous = dict(_flatten(old["results"]))
+    print(f"\nComparaison avec {old['meta'].get('revision')} ({old['meta'].get('date')}) :")
+    for path, value in _flatten(new["results"]):
+        if path in previous and previous[path]:
+            print(f"  {path:<48}{previous[path]:>12} → {value:<12} ({(value / previous[path] - 1) * 100:+.1f} %)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="latence simulée par commande WebDriver")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[50, 200, 1000], help="tailles de chat testées")
+    parser.add_argument("--repeats", type=int, default=5, help="répétitions par taille de chat")
+    parser.add_argument("--duration", type=float, default=5.0, help="durée des mesures de débit (s)")
+    parser.add_argument("--messages", type=int, default=5, help="messages envoyés pour send_message_to_tiktok")
+    parser.add_argument("--comments-per-s", type=float, default=5.0, help="commentaires générés (live_reply_loop)")
+    parser.add_argument("--gen-latency-ms", type=float, default=800.0, help="latence IA simulée")
+    parser.add_argument("--human-delays", action="store_true", help="garder les délais humains de get_human_delay")
+    parser.add_argument("--only", nargs="+", choices=["auto_like", "get_live_comments", "send_message", "live_reply_loop"])
+    parser.add_argument("--output", help="fichier JSON de résultats (défaut: benchmarks/results/core-<date>.json)")
+    parser.add_argument("--compare", help="résultat JSON précédent à comparer")
+    args = parser.parse_args()
+
+    if not args.human_delays:
+        tik_backend.get_human_delay = lambda: 0.0
+    selected = set(args.only or ["auto_like", "get_live_comments", "send_message", "live_reply_loop"])
+    results = {}
+    if "get_live_comments" in selected:
+        results["get_live_comments"] = bench_get_live_comments(args.latency_ms, args.nodes, args.repeats)
+    if "send_message" in selected:
+        results["send_message"] = bench_send_message(args.latency_ms, args.messages)
+    if "auto_like" in selected:
+        results["auto_like"] = bench_auto_like(args.latency_ms, args.duration)
+    # En dernier: remplace chatgpt_generate_reply et laisse la boucle IA tourner
+    if "live_reply_loop" in selected:
+        results["live_reply_loop"] = bench_live_reply_loop(
+            args.latency_ms, args.duration, args.comments_per_s, args.gen_latency_ms
+        )
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "params": vars(args),
+        },
+        "results": results,
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", time.strftime("core-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Résultats : {output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
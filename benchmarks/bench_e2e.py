@@ -0,0 +1,229 @@
+"""
+Bout en bout : le backend réel contre la page de live synthétique, en Chrome headless.
+
+Aucun accès réseau : la page (benchmarks.fake_live) et l'API IA
+(benchmarks.fake_openai) sont servies en local. Il faut Chrome et un
+chromedriver installés localement.
+
+Mesures :
+- launch_driver (--launch-driver) : durée de lancement + connexion simulée ;
+- get_live_comments / CommentCapture.poll : coût par appel avec le chat plein ;
+- send_message_to_tiktok : durée côté bot et réception par la page ;
+- auto_like : likes/s envoyés et comptés par la page ;
+- live_reply_loop : commentaires générés, lus et réponses reçues par seconde,
+  percentiles du pipeline ;
+- fin de live : délai entre l'affichage du bandeau et sa détection.
+
+Usage : python -m benchmarks.bench_e2e [--rate 5] [--max-nodes 200] [--duration 20]
+        [--mode observer] [--launch-driver] [--output res.json] [--compare ancien.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+from openai import OpenAI
+from selenium import webdriver
+
+import tik_backend
+from benchmarks import fake_live, fake_openai
+from benchmarks.bench_core import compare, git_revision, start_once, use_driver
+from tik_comments import CommentCapture
+from tik_settings import Settings
+
+
+def _wait(condition, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _override_settings(**values):
+    tik_backend.settings.current = Settings.from_dict({**tik_backend.settings.current.as_dict(), **values})
+
+
+def open_driver(live_url, args):
+    if args.launch_driver:
+        # Chemin réel: undetected_chromedriver, navigation et séquence de connexion
+        tik_backend.state.set("current_live", live_url)
+        _override_settings(CHROME_HEADLESS=True)
+        started = time.time()
+        tik_backend.launch_driver()
+        start_once("driver-executor", tik_backend.driver_executor.serve_forever)
+        return time.time() - started
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={tik_backend.WINDOW_SIZE[0]},{tik_backend.WINDOW_SIZE[1]}")
+    started = time.time()
+    driver = webdriver.Chrome(options=options)
+    driver.get(live_url)
+    use_driver(driver)
+    return time.time() - started
+
+
+def bench_comments(live, repeats):
+    # Remplit le chat vite, puis revient au débit demandé
+    rate, live.rate = live.rate, 200.0
+    _wait(lambda: live.snapshot()["generated"] >= live.max_nodes, 30)
+    live.rate = rate
+    run = tik_backend.driver_executor.run
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        comments = run(tik_backend.get_live_comments, tik_backend.PRIORITY_COMMENTS, "comments")
+    scan = (time.perf_counter() - t0) / repeats
+    capture = CommentCapture(tik_backend.COMMENT_BUFFER_SIZE)
+    run(capture.poll, tik_backend.PRIORITY_COMMENTS, "comments")
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        run(capture.poll, tik_backend.PRIORITY_COMMENTS, "comments")
+    observer = (time.perf_counter() - t0) / repeats
+    return {
+        "nodes": len(comments),
+        "scan_ms": round(scan * 1000, 1),
+        "observer_ms": round(observer * 1000, 1),
+    }
+
+
+def bench_send_message(live, count):
+    durations, delivery = [], []
+    for i in range(count):
+        before = live.snapshot()["messages"]
+        t0 = time.time()
+        tik_backend.send_message_to_tiktok(f"message de test {i}")
+        durations.append(time.time() - t0)
+        if _wait(lambda: live.snapshot()["messages"] > before, 5):
+            delivery.append(live.messages[-1][0] - t0)
+    return {
+        "sent": count,
+        "delivered": len(delivery),
+        "avg_ms": round(sum(durations) / len(durations) * 1000, 1),
+        "max_ms": round(max(durations) * 1000, 1),
+        "delivery_avg_ms": round(sum(delivery) / len(delivery) * 1000, 1) if delivery else None,
+    }
+
+
+def bench_auto_like(live, duration):
+    tik_backend.auto_like_pause_event.set()
+    tik_backend.state.set("running", True)
+    start_once("auto-like", tik_backend.auto_like)
+    likes_before, page_before = tik_backend.state.get("likes_sent"), live.snapshot()["likes"]
+    time.sleep(duration)
+    tik_backend.state.set("running", False)
+    time.sleep(1.0)  # dernier relevé des compteurs de la page
+    sent = tik_backend.state.get("likes_sent") - likes_before
+    counted = live.snapshot()["likes"] - page_before
+    return {
+        "sent_per_s": round(sent / duration, 1),
+        "counted_per_s": round(counted / duration, 1),
+        "lost": sent - counted,
+    }
+
+
+def bench_live_reply(live, duration):
+    tik_backend.auto_like_pause_event.clear()  # likes suspendus: on ne mesure que l'IA
+    tik_backend.state.set("ENABLE_AUTO_CHATGPT", True)
+    tik_backend.state.set("running", True)
+    start_once("live-reply", tik_backend.live_reply_loop)
+    _wait(lambda: tik_backend.reply_pipeline is not None, 5)
+    pipeline = tik_backend.reply_pipeline
+    pipeline.min_interval = pipeline.max_interval = 0
+    new_comments = tik_backend.metric_comments_new.labels()
+    before = live.snapshot()
+    read_before, dropped_before = new_comments.value, pipeline.dropped
+    time.sleep(duration)
+    tik_backend.state.set("running", False)
+    tik_backend.state.set("ENABLE_AUTO_CHATGPT", False)
+    after = live.snapshot()
+    snap = pipeline.snapshot()
+    return {
+        "generated_per_s": round((after["generated"] - before["generated"]) / duration, 2),
+        "read_per_s": round((new_comments.value - read_before) / duration, 2),
+        "replies_per_s": round((after["messages"] - before["messages"]) / duration, 2),
+        "dropped": pipeline.dropped - dropped_before,
+        "generation_p50_ms": snap["stages"]["generation"]["p50_ms"],
+        "end_to_end_p50_ms": snap["stages"]["end_to_end"]["p50_ms"],
+        "end_to_end_p95_ms": snap["stages"]["end_to_end"]["p95_ms"],
+    }
+
+
+def bench_live_end(live):
+    tik_backend.live_monitor.reset()
+    tik_backend.state.set("running", True)
+    start_once("live-state", tik_backend.live_state_loop)
+    t0 = time.time()
+    live.end()
+    detected = _wait(tik_backend.live_monitor.is_ended, 30)
+    return {
+        "detected": detected,
+        "detection_ms": round((time.time() - t0) * 1000, 1) if detected else None,
+        "check_interval_s": tik_backend.settings.current.LIVE_CHECK_INTERVAL,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=5.0, help="commentaires/s générés par la page")
+    parser.add_argument("--max-nodes", type=int, default=200, help="nœuds gardés dans le chat")
+    parser.add_argument("--duration", type=float, default=20.0, help="durée des mesures de débit (s)")
+    parser.add_argument("--repeats", type=int, default=10, help="lectures du chat mesurées")
+    parser.add_argument("--messages", type=int, default=5, help="messages envoyés")
+    parser.add_argument("--mode", choices=("scan", "observer"), default=tik_backend.COMMENT_CAPTURE_MODE)
+    parser.add_argument("--ai-latency", type=float, default=0.8, help="latence moyenne du faux OpenAI (s)")
+    parser.add_argument("--human-delays", action="store_true", help="garder les délais humains de get_human_delay")
+    parser.add_argument("--launch-driver", action="store_true", help="passer par tik_backend.launch_driver()")
+    parser.add_argument("--output", help="fichier JSON de résultats (défaut: benchmarks/results/e2e-<date>.json)")
+    parser.add_argument("--compare", help="résultat JSON précédent à comparer")
+    args = parser.parse_args()
+
+    live = fake_live.FakeLiveState(args.rate, args.max_nodes)
+    live_server, live_url = fake_live.start_server(live)
+    ai = fake_openai.FakeOpenAIState(fake_openai.LatencyModel("lognormal", args.ai_latency, 0.5))
+    ai_server, ai_url = fake_openai.start_server(ai)
+    tik_backend.client = OpenAI(api_key="fake", base_url=ai_url, max_retries=0)
+    tik_backend.COMMENT_CAPTURE_MODE = args.mode
+    if not args.human_delays:
+        tik_backend.get_human_delay = lambda: 0.0
+
+    results = {"startup_s": round(open_driver(live_url, args), 2)}
+    try:
+        results["logins"] = live.snapshot()["logins"]
+        results["get_live_comments"] = bench_comments(live, args.repeats)
+        results["send_message"] = bench_send_message(live, args.messages)
+        results["auto_like"] = bench_auto_like(live, args.duration)
+        results["live_reply_loop"] = bench_live_reply(live, args.duration)
+        results["live_end"] = bench_live_end(live)
+    finally:
+        try:
+            tik_backend.driver.quit()
+        except Exception:
+            pass
+        live_server.shutdown()
+        ai_server.shutdown()
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "params": vars(args),
+        },
+        "results": results,
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", time.strftime("e2e-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Résultats : {output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Test de charge du panel web : requêtes/s et latences (p50/p99) par route.
+
+Vise une instance locale déjà lancée (run.py ou tik_frontend.py). Chaque
+worker rejoue ses requêtes en boucle pendant --duration secondes ; avec
+--conditional, il renvoie l'ETag reçu (If-None-Match) comme un navigateur.
+
+Usage : python -m benchmarks.bench_http [--url http://127.0.0.1:5000] [--routes / /status]
+        [--concurrency 8] [--duration 10] [--user 1234 --password 5678] [--gzip] [--conditional]
+"""
+
+import argparse
+import base64
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from tik_stats import percentile
+
+
+def worker(base_url, route, headers, conditional, deadline, results, lock):
+    latencies, statuses, received = [], {}, 0
+    etag = None
+    while time.time() < deadline:
+        req_headers = dict(headers)
+        if conditional and etag:
+            req_headers["If-None-Match"] = etag
+        req = urllib.request.Request(base_url + route, headers=req_headers)
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                body = resp.read()
+                status = resp.status
+                etag = resp.headers.get("ETag") or etag
+        except urllib.error.HTTPError as e:
+            body = b""
+            status = e.code
+        except Exception:
+            body = b""
+            status = "error"
+        latencies.append(time.perf_counter() - t0)
+        statuses[status] = statuses.get(status, 0) + 1
+        received += len(body)
+    with lock:
+        entry = results.setdefault(route, {"latencies": [], "statuses": {}, "bytes": 0})
+        entry["latencies"].extend(latencies)
+        entry["bytes"] += received
+        for status, n in statuses.items():
+            entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + n
+
+
+def run(base_url, routes, concurrency, duration, headers, conditional):
+    results, lock = {}, threading.Lock()
+    deadline = time.time() + duration
+    threads = [
+        threading.Thread(target=worker, args=(base_url, route, headers, conditional, deadline, results, lock))
+        for route in routes for _ in range(concurrency)
+    ]
+    started = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - started
+    report = {}
+    for route, entry in results.items():
+        values = sorted(entry["latencies"])
+        report[route] = {
+            "requests": len(values),
+            "req_per_s": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "avg_kb": round(entry["bytes"] / max(1, len(values)) / 1024, 2),
+            "statuses": entry["statuses"],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="instance à tester")
+    parser.add_argument("--routes", nargs="+", default=["/", "/status"], help="routes GET à charger")
+    parser.add_argument("--concurrency", type=int, default=8, help="workers par route")
+    parser.add_argument("--duration", type=float, default=10.0, help="durée du test (secondes)")
+    parser.add_argument("--user", default="", help="identifiant du panel (auth basique)")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--gzip", action="store_true", help="envoyer Accept-Encoding: gzip")
+    parser.add_argument("--conditional", action="store_true", help="renvoyer l'ETag reçu (If-None-Match)")
+    parser.add_argument("--json", action="store_true", help="sortie JSON brute")
+    args = parser.parse_args()
+
+    headers = {}
+    if args.user:
+        token = base64.b64encode(f"{args.user}:{args.password}".encode()).decode()
+        headers["Authorization"] = f"Basic {token}"
+    if args.gzip:
+        headers["Accept-Encoding"] = "gzip"
+
+    report = run(args.url.rstrip("/"), args.routes, args.concurrency, args.duration, headers, args.conditional)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'route':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'Ko/rép':>10}  statuts")
+    for route, r in report.items():
+        print(f"{route:<16}{r['req_per_s']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}{r['avg_kb']:>10}  {r['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Coût par itération d'auto_like pour la détection "live terminé".
+
+Avant : driver.page_source.lower() à chaque like (transfert + copie de la page).
+Après : LiveStateMonitor.is_ended() à chaque like + une sonde execute_script
+toutes les LIVE_CHECK_INTERVAL secondes (coût amorti sur les likes).
+
+Usage : python -m benchmarks.bench_live_state [--page-mb 3] [--iterations 200]
+"""
+
+import argparse
+import time
+
+from tik_livestate import LiveStateMonitor
+
+
+class SlowPageDriver:
+    """Driver minimal : latence fixe par commande + débit de sérialisation simulé."""
+
+    def __init__(self, page_mb, call_latency_ms, mb_per_s):
+        self.page = ("<div class='chat'>salut</div>" * (int(page_mb * 1024 * 1024) // 30)).upper()
+        self.call_latency = call_latency_ms / 1000.0
+        self.transfer = page_mb / mb_per_s
+
+    @property
+    def page_source(self):
+        time.sleep(self.call_latency + self.transfer)
+        return self.page
+
+    def execute_script(self, script, *args):
+        time.sleep(self.call_latency)
+        return {"ended": False, "url": "https://www.tiktok.com/@demo/live"}
+
+
+def bench_before(driver, iterations):
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        if "live terminé" in driver.page_source.lower():
+            break
+    return (time.perf_counter() - t0) / iterations
+
+
+def bench_after(driver, iterations, likes_per_check):
+    monitor = LiveStateMonitor()
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        if monitor.is_ended():
+            break
+    per_like = (time.perf_counter() - t0) / iterations
+    t0 = time.perf_counter()
+    for _ in range(max(1, iterations // 10)):
+        monitor.check(driver)
+    per_check = (time.perf_counter() - t0) / max(1, iterations // 10)
+    return per_like + per_check / likes_per_check
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-mb", type=float, default=3.0, help="taille de page_source simulée (Mo)")
+    parser.add_argument("--call-latency-ms", type=float, default=2.0, help="latence chromedriver par commande")
+    parser.add_argument("--mb-per-s", type=float, default=100.0, help="débit de sérialisation de page_source")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--check-interval", type=float, default=5.0, help="LIVE_CHECK_INTERVAL (s)")
+    parser.add_argument("--like-interval", type=float, default=0.9, help="intervalle moyen entre likes (s)")
+    args = parser.parse_args()
+
+    driver = SlowPageDriver(args.page_mb, args.call_latency_ms, args.mb_per_s)
+    likes_per_check = max(1.0, args.check_interval / args.like_interval)
+    before = bench_before(driver, args.iterations)
+    after = bench_after(driver, args.iterations, likes_per_check)
+    print(f"Page simulée : {args.page_mb} Mo, latence {args.call_latency_ms} ms/commande")
+    print(f"Avant (page_source par like) : {before * 1e3:9.3f} ms / itération")
+    print(f"Après (sonde amortie)        : {after * 1e3:9.3f} ms / itération")
+    print(f"Gain                         : x{before / after:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Vérifie RequestScheduler contre le faux serveur OpenAI qui renvoie des 429.
+
+Plusieurs threads envoient des requêtes via le vrai client `openai` pointé
+sur le serveur local. Le scénario échoue (code de sortie 1) si une requête
+arrive pendant une fenêtre Retry-After ou si la limite RPM est dépassée.
+
+Usage : python -m benchmarks.bench_ratelimit [--requests 60] [--rpm 120]
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from openai import OpenAI
+
+from benchmarks.fake_openai import FakeOpenAIState, start_server
+from tik_ratelimit import RateLimited, RequestScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--rate-429", type=float, default=0.15)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--max-wait", type=float, default=5.0)
+    args = parser.parse_args()
+
+    state = FakeOpenAIState(latency=0.02, rate_429=args.rate_429, retry_after=args.retry_after)
+    server, base_url = start_server(state)
+    client = OpenAI(api_key="fake", base_url=base_url, max_retries=0)
+    scheduler = RequestScheduler(rpm=args.rpm, max_wait=args.max_wait, base_backoff=0.2)
+
+    results = {"ok": 0, "rate_limited": 0}
+    lock = threading.Lock()
+    todo = iter(range(args.requests))
+
+    def worker():
+        for _ in todo:
+            messages = [{"role": "user", "content": "salut"}]
+            try:
+                scheduler.call(lambda: client.chat.completions.create(
+                    model="fake", messages=messages, max_tokens=20
+                ), estimated_tokens=20)
+                key = "ok"
+            except RateLimited:
+                key = "rate_limited"
+            with lock:
+                results[key] += 1
+
+    started = time.time()
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - started
+    server.shutdown()
+
+    # Le seau RPM est plein au départ: capacité initiale + recharge pendant le test
+    allowed = args.rpm + args.rpm * elapsed / 60.0
+    print(f"Durée : {elapsed:.1f}s · résultats : {results}")
+    print(f"Serveur : {state.counters}")
+    print(f"Ordonnanceur : {scheduler.stats()}")
+    failures = []
+    if state.counters["violations"]:
+        failures.append(f"{state.counters['violations']} requête(s) envoyée(s) pendant un Retry-After")
+    if state.counters["requests"] > allowed:
+        failures.append(f"{state.counters['requests']} requêtes > {allowed:.0f} autorisées par le RPM")
+    if results["ok"] + results["rate_limited"] != args.requests:
+        failures.append("requêtes perdues")
+    for f in failures:
+        print(f"ÉCHEC : {f}")
+    print("OK" if not failures else "KO")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
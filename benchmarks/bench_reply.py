@@ -0,0 +1,164 @@
+"""
+Charge du chemin IA (live_reply_loop → pipeline → OpenAI) contre le faux serveur.
+
+Le client `OpenAI` du bot est recréé avec base_url pointée sur
+benchmarks.fake_openai (comme OPENAI_BASE_URL dans config.json), le chat est
+le WebDriver factice qui reçoit `rate` commentaires/s. Pour chaque débit :
+- réponses générées et envoyées par seconde ;
+- croissance des files (profondeur ingestion + envoi relevée toutes les
+  0,5 s, pente en éléments/s) et commentaires abandonnés ;
+- percentiles des étapes du pipeline (génération, premier token, bout en bout) ;
+- compteurs serveur (requêtes, 429, 500, tokens).
+
+Sans --pacing, l'intervalle min/max entre messages est à 0 : la limite
+mesurée est celle de la génération et de la saisie, pas du rythme humain.
+
+Usage : python -m benchmarks.bench_reply [--rates 1 5 20] [--duration 20]
+        [--latency-dist lognormal --latency 0.8 --latency-spread 0.5] [--stream]
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+from openai import OpenAI
+
+import tik_backend
+from benchmarks.bench_core import compare, git_revision, start_once, use_driver
+from benchmarks.fake_driver import FakeDriver
+from benchmarks.fake_openai import add_server_arguments, start_server, state_from_args
+from tik_settings import Settings
+from tik_stats import LatencyStats
+
+
+def _slope(points):
+    """Pente (moindres carrés) de la profondeur des files, en éléments/s."""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_d = sum(d for _, d in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    return sum((t - mean_t) * (d - mean_d) for t, d in points) / var if var else 0.0
+
+
+def _drain(pipeline):
+    # Bot arrêté: l'envoi refuse les réponses restantes, on vide l'ingestion
+    tik_backend.state.set("running", False)
+    pipeline.shed(0)
+    deadline = time.time() + 10
+    while pipeline.send_queue.qsize() and time.time() < deadline:
+        time.sleep(0.1)
+
+
+def run_rate(driver, rate, args, server_state):
+    pipeline = tik_backend.reply_pipeline
+    if pipeline is not None:
+        _drain(pipeline)
+        pipeline.stats = {name: LatencyStats() for name in pipeline.stats}
+    # Même chat d'un débit à l'autre: pas de commentaire rejoué pris pour un doublon
+    driver.comments_per_s = rate
+    driver._generated_until = time.time()
+    sent_before = len(driver.sent_messages)
+    tik_backend.state.set("running", True)
+    start_once("live-reply", tik_backend.live_reply_loop)
+    while tik_backend.reply_pipeline is None:
+        time.sleep(0.05)
+    pipeline = tik_backend.reply_pipeline
+    if not args.pacing:
+        pipeline.min_interval = pipeline.max_interval = 0
+    dropped_before = pipeline.dropped
+    server_before = dict(server_state.counters)
+
+    depths = []
+    started = time.time()
+    while time.time() - started < args.duration:
+        time.sleep(0.5)
+        depths.append((time.time() - started, pipeline.ingest_queue.qsize() + pipeline.send_queue.qsize()))
+    elapsed = time.time() - started
+    sent = len(driver.sent_messages) - sent_before
+    snap = pipeline.snapshot()
+    _drain(pipeline)
+
+    server = {k: server_state.counters[k] - server_before[k] for k in server_before}
+    stages = snap["stages"]
+    return {
+        "offered_per_s": rate,
+        "generated_per_s": round(stages["generation"]["count"] / elapsed, 2),
+        "sent_per_s": round(sent / elapsed, 2),
+        "queue_max": max((d for _, d in depths), default=0),
+        "queue_final": depths[-1][1] if depths else 0,
+        "queue_growth_per_s": round(_slope(depths), 2),
+        "dropped": pipeline.dropped - dropped_before,
+        "generation_p50_ms": stages["generation"]["p50_ms"],
+        "generation_p95_ms": stages["generation"]["p95_ms"],
+        "ttft_p50_ms": stages["ttft"]["p50_ms"],
+        "end_to_end_p50_ms": stages["end_to_end"]["p50_ms"],
+        "end_to_end_p95_ms": stages["end_to_end"]["p95_ms"],
+        "server_requests": server["requests"],
+        "server_429": server["http_429"],
+        "server_500": server["http_500"],
+        "tokens": server["tokens"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=float, nargs="+", default=[1, 5, 20], help="commentaires/s simulés")
+    parser.add_argument("--duration", type=float, default=20.0, help="durée par débit (s)")
+    parser.add_argument("--concurrency", type=int, default=tik_backend.CHATGPT_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--stream", action="store_true", help="réponses en streaming (CHATGPT_STREAMING)")
+    parser.add_argument("--pacing", action="store_true", help="garder CHATGPT_MIN/MAX_INTERVAL")
+    parser.add_argument("--driver-latency-ms", type=float, default=1.0)
+    parser.add_argument("--output", help="fichier JSON de résultats (défaut: benchmarks/results/reply-<date>.json)")
+    parser.add_argument("--compare", help="résultat JSON précédent à comparer")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server_state = state_from_args(args)
+    server, base_url = start_server(server_state)
+    tik_backend.client = OpenAI(api_key="fake", base_url=base_url, max_retries=0)
+    tik_backend.get_human_delay = lambda: 0.0
+    tik_backend.CHATGPT_CONCURRENCY = args.concurrency
+    tik_backend.settings.current = Settings.from_dict({
+        **tik_backend.settings.current.as_dict(),
+        "CHATGPT_STREAMING": args.stream,
+        "CHATGPT_BATCH_SIZE": args.batch_size,
+    })
+    tik_backend.auto_like_pause_event.clear()  # likes suspendus: on ne mesure que l'IA
+    tik_backend.state.set("ENABLE_AUTO_CHATGPT", True)
+
+    driver = FakeDriver(args.driver_latency_ms, chat_nodes=200)
+    use_driver(driver)
+    results = {}
+    for rate in args.rates:
+        print(f"→ {rate:g} commentaires/s pendant {args.duration:g} s…")
+        results[f"{rate:g}/s"] = row = run_rate(driver, rate, args, server_state)
+        print("   " + ", ".join(f"{k}={v}" for k, v in row.items()))
+    server.shutdown()
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "params": vars(args),
+            "server_latency": server_state.latency.describe(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", time.strftime("reply-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Résultats : {output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
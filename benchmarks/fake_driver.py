@@ -0,0 +1,171 @@
+"""
+WebDriver factice en mémoire : le sous-ensemble utilisé par tik_backend.
+
+- find_element(s) (sélecteurs du chat, de la zone de saisie, des boutons de
+  connexion), .text / .id / click() / send_keys() sur les éléments ;
+- page_source, get(), current_url, set_window_size(), quit() ;
+- execute() pour les actions W3C (ActionChains(...).send_keys("l").perform()) ;
+- execute_script() pour la sonde "live terminé" (tik_livestate) et le buffer
+  du MutationObserver (tik_comments).
+
+Chaque commande coûte `call_latency_ms` (aller-retour chromedriver simulé) ;
+le chat contient au plus `chat_nodes` nœuds et reçoit `comments_per_s`
+nouveaux commentaires par seconde.
+"""
+
+import itertools
+import random
+import time
+
+ENTER = "\ue007"  # selenium Keys.ENTER
+WORDS = ("salut", "trop bien", "tu joues à quoi", "bonjour de Lyon", "❤️❤️", "first", "on t'aime", "gg", "quelle map")
+
+
+class FakeNoSuchElement(Exception):
+    pass
+
+
+class FakeElement:
+    _ids = itertools.count(1)
+
+    def __init__(self, driver, kind, text="", user=""):
+        self.driver = driver
+        self.kind = kind
+        self.id = f"fake-{next(self._ids)}"
+        self._text = text
+        self.user = user
+        self.typed = []
+
+    @property
+    def text(self):
+        self.driver._command("element_text")
+        return self._text
+
+    def get_attribute(self, name):
+        self.driver._command("element_attribute")
+        return {"data-e2e": "chat-message" if self.kind == "chat" else ""}.get(name)
+
+    def click(self):
+        self.driver._command("element_click")
+
+    def clear(self):
+        self.driver._command("element_clear")
+        self.typed = []
+
+    def send_keys(self, *keys):
+        self.driver._command("element_send_keys")
+        for key in keys:
+            if key == ENTER:
+                self.driver.sent_messages.append("".join(self.typed))
+                self.typed = []
+            else:
+                self.typed.append(key)
+
+    def find_element(self, by, value):
+        return self.driver.find_element(by, value)
+
+
+class FakeDriver:
+    def __init__(self, call_latency_ms=1.0, chat_nodes=200, comments_per_s=0.0, url="https://www.tiktok.com/@demo/live"):
+        self.call_latency = call_latency_ms / 1000.0
+        self.max_nodes = chat_nodes
+        self.comments_per_s = comments_per_s
+        self.current_url = url
+        self.ended = False
+        self.commands = {}
+        self.keys = []
+        self.sent_messages = []
+        self.chat_box = FakeElement(self, "chat_box")
+        self.login_button = FakeElement(self, "button", "Se connecter")
+        self.chat = []
+        self.seq = 0
+        self.capture = []  # buffer du "MutationObserver" (tout commentaire ajouté)
+        self._generated_until = time.time()
+        self.fill_chat(chat_nodes)
+
+    # ---- Génération de commentaires ----
+    def add_comment(self, text=None, user=None):
+        self.seq += 1
+        user = user or f"viewer{random.randint(1, 5000)}"
+        text = text or f"{random.choice(WORDS)} #{self.seq}"
+        node = FakeElement(self, "chat", f"{user} {text}", user)
+        self.chat.append(node)
+        self.capture.append({"user": user, "content": text, "seq": self.seq, "ts": time.time() * 1000})
+        if len(self.chat) > self.max_nodes:
+            del self.chat[: len(self.chat) - self.max_nodes]
+        if len(self.capture) > 10000:
+            del self.capture[:5000]
+
+    def fill_chat(self, count):
+        for _ in range(count):
+            self.add_comment()
+
+    def _generate(self):
+        if not self.comments_per_s:
+            return
+        now = time.time()
+        due = int((now - self._generated_until) * self.comments_per_s)
+        if due:
+            self._generated_until += due / self.comments_per_s
+            for _ in range(due):
+                self.add_comment()
+
+    # ---- WebDriver ----
+    def _command(self, kind):
+        self.commands[kind] = self.commands.get(kind, 0) + 1
+        if self.call_latency:
+            time.sleep(self.call_latency)
+
+    def find_elements(self, by, value):
+        self._command("find_elements")
+        self._generate()
+        if "chat" in value or "comment" in value:
+            return list(self.chat)
+        return []
+
+    def find_element(self, by, value):
+        self._command("find_element")
+        if "contenteditable" in value:
+            return self.chat_box
+        if "login" in value or "Se connecter" in value or "Connexion" in value:
+            return self.login_button
+        raise FakeNoSuchElement(value)
+
+    @property
+    def page_source(self):
+        self._command("page_source")
+        self._generate()
+        nodes = "".join(f"<div data-e2e='chat-message'>{n._text}</div>" for n in self.chat)
+        banner = "<div>LIVE terminé</div>" if self.ended else ""
+        return f"<html><body>{nodes}{banner}</body></html>"
+
+    def get(self, url):
+        self._command("get")
+        self.current_url = url
+
+    def execute(self, command, params=None):
+        # Actions W3C envoyées par ActionChains.perform()
+        self._command("execute")
+        for source in (params or {}).get("actions", []):
+            for action in source.get("actions", []):
+                if action.get("type") == "keyDown":
+                    self.keys.append(action.get("value"))
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        self._command("execute_script")
+        self._generate()
+        if "live terminé" in script:
+            return {"ended": self.ended, "url": self.current_url}
+        if "__tikCapture" in script:
+            cursor = args[0] if args else 0
+            size = args[2] if len(args) > 2 else 500
+            items = [it for it in self.capture[-size:] if it["seq"] > cursor]
+            return {"id": "fake", "cursor": self.seq, "items": items, "dropped": 0}
+        return None
+
+    def set_window_size(self, width, height):
+        self._command("set_window_size")
+
+    def quit(self):
+        self._command("quit")
@@ -0,0 +1,274 @@
+"""
+Page de live TikTok synthétique servie en local, pour les tests de bout en bout.
+
+Reprend les formes de DOM ciblées par le bot :
+- nœuds du chat `data-e2e="chat-message"` / `.comment-item` avec l'auteur dans
+  `data-e2e="message-owner-name"` (get_live_comments, CommentCapture) ;
+- zone de saisie `contenteditable="plaintext-only"` avec le placeholder
+  "Saisis ton message..." (send_message_to_tiktok) ; Entrée envoie le message ;
+- boutons et champs de la séquence de connexion de launch_driver ;
+- bandeau "LIVE terminé" affiché après POST /end ou --end-after (sonde tik_livestate) ;
+- touche "l" comptée comme un like (auto_like).
+
+Les commentaires sont générés dans la page à `rate` par seconde (modifiable
+en cours de route par POST /control?rate=N). La page remonte ses compteurs
+(commentaires, likes) et chaque message envoyé ; GET /stats les expose.
+
+Usage : python -m benchmarks.fake_live [--port 8766] [--rate 5] [--max-nodes 200]
+        puis "current_live": "http://127.0.0.1:8766/@demo/live"
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE = r"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>demo est en LIVE | TikTok</title>
+<style>
+body { font-family: sans-serif; margin: 0; display: flex; height: 100vh; }
+#player { flex: 1; background: #111; color: #fff; display: flex; align-items: center; justify-content: center; }
+#side { width: 360px; display: flex; flex-direction: column; border-left: 1px solid #ddd; }
+#room { flex: 1; overflow-y: auto; padding: 8px; }
+.comment-item { padding: 2px 0; font-size: 14px; }
+[data-e2e="message-owner-name"] { font-weight: bold; margin-right: 4px; }
+[contenteditable] { border: 1px solid #ccc; border-radius: 8px; margin: 8px; padding: 8px; min-height: 20px; }
+[contenteditable]:empty:before { content: attr(placeholder); color: #999; }
+#login-modal { position: fixed; top: 20%; left: 35%; background: #fff; border: 1px solid #ccc; padding: 16px; }
+#login-modal > * { display: block; margin: 6px 0; }
+</style>
+</head>
+<body>
+<div id="player">
+  <header><button id="login"><div>Se connecter</div></button></header>
+</div>
+<div id="side">
+  <div id="room" data-e2e="live-room-list"></div>
+  <div contenteditable="plaintext-only" placeholder="Saisis ton message..."></div>
+</div>
+<div id="login-modal" hidden>
+  <div class="login-option">Utiliser le téléphone/l'e-mail</div>
+  <a href="#/login/phone-or-email/email">Se connecter avec l'e-mail</a>
+  <input placeholder="E-mail ou nom d'utilisateur">
+  <input type="password" placeholder="Mot de passe">
+  <button data-e2e="login-button">Valider</button>
+</div>
+<script>
+const WORDS = ["salut", "trop bien", "tu joues à quoi ?", "bonjour de Lyon", "❤️❤️", "first", "on t'aime", "gg", "quelle map ?"];
+const fx = window.__fixture = {generated: 0, likes: 0, sent: 0, rate: __RATE__, maxNodes: __MAX_NODES__, ended: false};
+const room = document.getElementById("room");
+const box = document.querySelector("[contenteditable]");
+
+function post(path, payload) {
+    fetch(path, {method: "POST", headers: {"Content-Type": "application/json"}, body: JSON.stringify(payload)});
+}
+
+function addComment(user, text) {
+    const node = document.createElement("div");
+    node.className = "comment-item";
+    node.setAttribute("data-e2e", "chat-message");
+    const owner = document.createElement("span");
+    owner.setAttribute("data-e2e", "message-owner-name");
+    owner.textContent = user;
+    const body = document.createElement("span");
+    body.textContent = text;
+    node.append(owner, body);
+    room.append(node);
+    while (room.children.length > fx.maxNodes) room.firstElementChild.remove();
+    room.scrollTop = room.scrollHeight;
+}
+
+// Génération à débit constant, rattrapée si le timer prend du retard
+let seq = 0, carry = 0, last = performance.now();
+setInterval(() => {
+    const now = performance.now();
+    carry += (now - last) / 1000 * fx.rate;
+    last = now;
+    while (carry >= 1 && !fx.ended) {
+        carry -= 1;
+        seq += 1;
+        fx.generated += 1;
+        addComment("viewer" + (1 + Math.floor(Math.random() * 5000)), WORDS[seq % WORDS.length] + " #" + seq);
+    }
+}, 50);
+
+document.addEventListener("keydown", e => {
+    if (e.target === box) {
+        if (e.key === "Enter") {
+            e.preventDefault();
+            const text = box.innerText.trim();
+            box.textContent = "";
+            box.blur();  // les likes suivants repartent vers la page
+            if (text) {
+                fx.sent += 1;
+                post("/event", {type: "message", text: text, ts: Date.now()});
+            }
+        }
+        return;
+    }
+    if (e.key === "l" || e.key === "L") fx.likes += 1;
+});
+
+const modal = document.getElementById("login-modal");
+document.getElementById("login").addEventListener("click", () => { modal.hidden = false; });
+modal.querySelector("[data-e2e='login-button']").addEventListener("click", () => {
+    modal.hidden = true;
+    post("/event", {type: "login", ts: Date.now()});
+});
+
+// Le texte du bandeau n'apparaît pas tel quel dans ce script (la sonde lit aussi les <script>)
+function showEnded() {
+    if (fx.ended) return;
+    fx.ended = true;
+    const banner = document.createElement("div");
+    banner.textContent = "LIVE termin\u00e9";
+    document.getElementById("player").append(banner);
+}
+
+setInterval(async () => {
+    try {
+        const r = await fetch("/control?generated=" + fx.generated + "&likes=" + fx.likes);
+        const c = await r.json();
+        fx.rate = c.rate;
+        fx.maxNodes = c.max_nodes;
+        if (c.ended) showEnded();
+    } catch (err) {}
+}, 500);
+</script>
+</body>
+</html>
+"""
+
+
+class FakeLiveState:
+    def __init__(self, rate=5.0, max_nodes=200, end_after=0.0):
+        self.rate = rate
+        self.max_nodes = max_nodes
+        self.end_after = end_after
+        self.started = time.time()
+        self.ended_at = None
+        self.counters = {"page_loads": 0, "generated": 0, "likes": 0, "messages": 0, "logins": 0}
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def end(self):
+        with self.lock:
+            if self.ended_at is None:
+                self.ended_at = time.time()
+
+    def is_ended(self):
+        if self.end_after and self.ended_at is None and time.time() - self.started >= self.end_after:
+            self.end()
+        return self.ended_at is not None
+
+    def report(self, generated, likes):
+        # Compteurs cumulés côté page ; une page rechargée repart de zéro
+        with self.lock:
+            self.counters["generated"] = max(self.counters["generated"], generated)
+            self.counters["likes"] = max(self.counters["likes"], likes)
+
+    def record(self, event):
+        with self.lock:
+            if event.get("type") == "message":
+                self.counters["messages"] += 1
+                self.messages.append((time.time(), event.get("text", "")))
+                del self.messages[:-1000]
+            elif event.get("type") == "login":
+                self.counters["logins"] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                **self.counters,
+                "rate": self.rate,
+                "max_nodes": self.max_nodes,
+                "ended": self.ended_at is not None,
+                "uptime": round(time.time() - self.started, 1),
+            }
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body, content_type="application/json"):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/control":
+                state.report(int(query.get("generated", ["0"])[0]), int(query.get("likes", ["0"])[0]))
+                return self._send(200, {"rate": state.rate, "max_nodes": state.max_nodes, "ended": state.is_ended()})
+            if url.path == "/stats":
+                return self._send(200, state.snapshot())
+            if url.path == "/" or url.path.endswith("/live"):
+                with state.lock:
+                    state.counters["page_loads"] += 1
+                page = PAGE.replace("__RATE__", str(state.rate)).replace("__MAX_NODES__", str(state.max_nodes))
+                return self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+            self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) if length else b""
+            if url.path == "/event":
+                state.record(json.loads(body or b"{}"))
+                return self._send(200, {"ok": True})
+            if url.path == "/end":
+                state.end()
+                return self._send(200, state.snapshot())
+            if url.path == "/control":
+                if "rate" in query:
+                    state.rate = float(query["rate"][0])
+                if "max_nodes" in query:
+                    state.max_nodes = int(query["max_nodes"][0])
+                return self._send(200, state.snapshot())
+            self._send(404, {"error": "not found"})
+
+    return Handler
+
+
+def start_server(state, port=0):
+    """Démarre le serveur dans un thread daemon ; retourne (server, live_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-live", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/@demo/live"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--rate", type=float, default=5.0, help="commentaires/s générés par la page")
+    parser.add_argument("--max-nodes", type=int, default=200, help="nœuds gardés dans le chat")
+    parser.add_argument("--end-after", type=float, default=0.0, help="afficher le bandeau de fin après N s (0 = jamais)")
+    args = parser.parse_args()
+    state = FakeLiveState(args.rate, args.max_nodes, args.end_after)
+    server, live_url = start_server(state, args.port)
+    print(f"Live synthétique sur {live_url} (Ctrl+C pour arrêter)")
+    try:
+        while True:
+            time.sleep(5)
+            print(state.snapshot())
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Faux serveur OpenAI (chat.completions) local, sans dépendance.
+
+- latence tirée d'une distribution (fixed, uniform, normal, lognormal,
+  pareto) avant la réponse ou le premier morceau d'un flux ;
+- streaming SSE (stream=True) : un morceau par mot toutes les
+  `token_latency` secondes, usage final si stream_options.include_usage ;
+- réponses batch (response_format json_object) au format {"replies": [...]}
+  attendu par parse_batch_replies ;
+- injection d'erreurs 500 et de 429 avec Retry-After. Après une 429, toute
+  requête reçue avant la fin du Retry-After est refusée ; elle compte comme
+  violation si elle arrive plus de `grace` secondes après la 429 (au-delà,
+  elle n'était plus "en vol") ;
+- comptage des tokens (prompt/completion, par modèle) et latences servies,
+  lisibles via snapshot() ou GET /stats.
+
+Usage : python -m benchmarks.fake_openai [--port 8765] [--latency-dist lognormal]
+        [--latency 0.8] [--rate-429 0.2] [--rate-500 0.01]
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLIES = (
+    "Merci pour ton message !",
+    "Trop content de te voir dans le live, installe-toi !",
+    "Bonne question, je regarde ça juste après cette partie.",
+    "Salut et bienvenue, n'hésite pas à liker pour soutenir le live !",
+    "Haha merci, ça fait plaisir de lire ça 😄",
+)
+
+
+def estimate_text_tokens(text):
+    # ≈4 caractères par token, comme l'estimation côté bot
+    return max(1, len(text) // 4)
+
+
+class LatencyModel:
+    """Latence en secondes ; `mean` = moyenne visée, `spread` = dispersion (écart-type, σ ou alpha)."""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "pareto")
+
+    def __init__(self, kind="fixed", mean=0.05, spread=0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"distribution inconnue: {kind} (choix: {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.mean = mean
+        self.spread = spread
+
+    def sample(self):
+        mean, spread = self.mean, self.spread
+        if self.kind == "uniform":
+            value = random.uniform(mean - spread, mean + spread)
+        elif self.kind == "normal":
+            value = random.gauss(mean, spread)
+        elif self.kind == "lognormal":
+            # Queue à droite typique des API LLM ; mu choisi pour garder la moyenne
+            sigma = spread or 0.5
+            value = random.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma) if mean > 0 else 0.0
+        elif self.kind == "pareto":
+            alpha = spread if spread > 1 else 2.5
+            value = mean * (alpha - 1) / alpha * random.paretovariate(alpha)
+        else:
+            value = mean
+        return max(0.0, value)
+
+    def describe(self):
+        return f"{self.kind}(mean={self.mean}, spread={self.spread})"
+
+
+class FakeOpenAIState:
+    def __init__(self, latency=0.05, rate_429=0.0, retry_after=1.0, grace=0.1, rate_500=0.0, token_latency=0.0):
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel("fixed", latency)
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.retry_after = retry_after
+        self.grace = grace
+        self.token_latency = token_latency
+        self.blocked_since = 0.0
+        self.blocked_until = 0.0
+        self.counters = {
+            "requests": 0, "ok": 0, "streams": 0, "http_429": 0, "http_500": 0, "violations": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "tokens": 0,
+        }
+        self.models = {}
+        self.latencies = deque(maxlen=5000)
+        self.lock = threading.Lock()
+
+    def decide(self):
+        """Retourne None (succès), ("429", retry_after) ou ("500", None)."""
+        now = time.time()
+        with self.lock:
+            self.counters["requests"] += 1
+            if now < self.blocked_until:
+                if now - self.blocked_since > self.grace:
+                    self.counters["violations"] += 1
+                self.counters["http_429"] += 1
+                return "429", round(self.blocked_until - now, 3)
+            if random.random() < self.rate_429:
+                self.blocked_since = now
+                self.blocked_until = now + self.retry_after
+                self.counters["http_429"] += 1
+                return "429", self.retry_after
+            if random.random() < self.rate_500:
+                self.counters["http_500"] += 1
+                return "500", None
+            return None
+
+    def account(self, model, prompt_tokens, completion_tokens, latency, stream=False):
+        with self.lock:
+            self.counters["ok"] += 1
+            self.counters["streams"] += int(stream)
+            self.counters["prompt_tokens"] += prompt_tokens
+            self.counters["completion_tokens"] += completion_tokens
+            self.counters["tokens"] += prompt_tokens + completion_tokens
+            per_model = self.models.setdefault(model, {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            per_model["requests"] += 1
+            per_model["prompt_tokens"] += prompt_tokens
+            per_model["completion_tokens"] += completion_tokens
+            self.latencies.append(latency)
+
+    def snapshot(self):
+        with self.lock:
+            values = sorted(self.latencies)
+            counters, models = dict(self.counters), {k: dict(v) for k, v in self.models.items()}
+
+        def pct(q):
+            return round(values[min(len(values) - 1, int(q / 100.0 * len(values)))] * 1000, 1) if values else 0.0
+
+        return {
+            **counters,
+            "models": models,
+            "latency": self.latency.describe(),
+            "latency_p50_ms": pct(50),
+            "latency_p95_ms": pct(95),
+            "latency_p99_ms": pct(99),
+        }
+
+
+def make_reply(req):
+    """Texte de réponse ; JSON {"replies": [...]} pour les appels batch du bot."""
+    if (req.get("response_format") or {}).get("type") == "json_object":
+        try:
+            items = json.loads(req["messages"][-1]["content"])
+        except (KeyError, IndexError, TypeError, ValueError):
+            items = []
+        replies = [{"id": item.get("id"), "reply": random.choice(REPLIES)} for item in items if isinstance(item, dict)]
+        return json.dumps({"replies": replies}, ensure_ascii=False)
+    return random.choice(REPLIES)
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _json(self, code, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _event(self, payload):
+            data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+            self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                return self._json(200, state.snapshot())
+            if self.path.rstrip("/").endswith("/models"):
+                return self._json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+            self._json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            req = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.endswith("/chat/completions"):
+                return self._json(404, {"error": {"message": "not found"}})
+            started = time.time()
+            error = state.decide()
+            if error and error[0] == "429":
+                return self._json(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                    {"Retry-After": str(error[1])},
+                )
+            if error:
+                return self._json(500, {"error": {"message": "The server had an error", "type": "server_error"}})
+            time.sleep(state.latency.sample())
+            model = req.get("model", "fake")
+            text = make_reply(req)
+            prompt_tokens = sum(estimate_text_tokens(m.get("content") or "") for m in req.get("messages", []))
+            completion_tokens = estimate_text_tokens(text)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+            if req.get("stream"):
+                return self._stream(req, model, text, usage, started)
+            state.account(model, prompt_tokens, completion_tokens, time.time() - started)
+            self._json(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        def _stream(self, req, model, text, usage, started):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            def chunk(delta, finish_reason=None):
+                return {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+
+            try:
+                self._event(chunk({"role": "assistant", "content": ""}))
+                words = text.split(" ")
+                for i, word in enumerate(words):
+                    if i and state.token_latency:
+                        time.sleep(state.token_latency)
+                    self._event(chunk({"content": word if i == 0 else " " + word}))
+                self._event(chunk({}, "stop"))
+                if (req.get("stream_options") or {}).get("include_usage"):
+                    self._event({"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                                 "model": model, "choices": [], "usage": usage})
+                self._event("[DONE]")
+            except (BrokenPipeError, ConnectionResetError):
+                return  # client parti en cours de flux
+            state.account(model, usage["prompt_tokens"], usage["completion_tokens"], time.time() - started, stream=True)
+
+    return Handler
+
+
+def start_server(state, port=0):
+    """Démarre le serveur dans un thread daemon ; retourne (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def add_server_arguments(parser):
+    """Options du faux serveur, partagées avec les harnais qui le démarrent."""
+    parser.add_argument("--latency-dist", choices=LatencyModel.KINDS, default="fixed")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence moyenne (s)")
+    parser.add_argument("--latency-spread", type=float, default=0.0, help="écart-type (normal/uniform), σ (lognormal), alpha (pareto)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="délai entre morceaux en streaming (s)")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+
+
+def state_from_args(args):
+    return FakeOpenAIState(
+        LatencyModel(args.latency_dist, args.latency, args.latency_spread),
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        rate_500=args.rate_500,
+        token_latency=args.token_latency,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    state = state_from_args(args)
+    server, base_url = start_server(state, args.port)
+    print(f"Faux OpenAI sur {base_url} (Ctrl+C pour arrêter)")
+    print(f'Bot : "OPENAI_BASE_URL": "{base_url}" et une clé quelconque dans config.json')
+    try:
+        while True:
+            time.sleep(5)
+            print(state.snapshot())
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
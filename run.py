@@ -15,39 +15,43 @@ def main():
     print("=" * 50)
 
     # Serveur Flask (daemon)
-    flask_thread = threading.Thread(
-        target=lambda: tik_backend.app.run(
-            host="0.0.0.0", 
-            port=5000, 
-            debug=False, 
-            use_reloader=False
-        ),
-        daemon=True
-    )
+    flask_thread = threading.Thread(target=tik_backend.run_web_server, name="flask", daemon=True)
     flask_thread.start()
-    print("✓ Serveur Flask démarré sur http://0.0.0.0:5000")
+    print(f"✓ Serveur Flask ({tik_backend.WEB_SERVER_MODE}) démarré sur http://0.0.0.0:5000")
 
     # Outils & boucles
-    threading.Thread(target=launch_ngrok, daemon=True).start()
+    threading.Thread(target=launch_ngrok, name="ngrok", daemon=True).start()
     print("✓ Ngrok lancé")
 
-    threading.Thread(target=clear_terminal, daemon=True).start()
+    threading.Thread(target=clear_terminal, name="clear-terminal", daemon=True).start()
     print("✓ Nettoyage terminal activé")
 
-    threading.Thread(target=tik_backend.refresh_live_loop, daemon=True).start()
+    threading.Thread(target=tik_backend.refresh_live_loop, name="refresh-live", daemon=True).start()
     print("✓ Rafraîchissement live activé")
 
-    threading.Thread(target=tik_backend.auto_message_loop, daemon=True).start()
+    threading.Thread(target=tik_backend.live_state_loop, name="live-state", daemon=True).start()
+    print("✓ Surveillance fin de live activée")
+
+    threading.Thread(target=tik_backend.settings.watch, name="settings-watch", daemon=True).start()
+    print("✓ Rechargement à chaud de la configuration activé")
+
+    threading.Thread(target=tik_backend.telemetry.run, name="telemetry", daemon=True).start()
+    print("✓ Télémétrie système activée")
+
+    threading.Thread(target=tik_backend.auto_message_loop, name="auto-message", daemon=True).start()
     print("✓ Boucle auto-message activée")
 
-    threading.Thread(target=tik_backend.live_reply_loop, daemon=True).start()
+    threading.Thread(target=tik_backend.live_reply_loop, name="live-reply", daemon=True).start()
     print("✓ Boucle réponses ChatGPT activée")
 
     # Selenium + Auto-like
-    threading.Thread(target=tik_backend.launch_driver, daemon=True).start()
+    threading.Thread(target=tik_backend.driver_executor.serve_forever, name="driver-executor", daemon=True).start()
+    print("✓ Exécuteur WebDriver démarré")
+
+    threading.Thread(target=tik_backend.launch_driver, name="launch-driver", daemon=True).start()
     print("✓ Driver Selenium lancé")
 
-    threading.Thread(target=tik_backend.auto_like, daemon=True).start()
+    threading.Thread(target=tik_backend.auto_like, name="auto-like", daemon=True).start()
     print("✓ Auto-like activé")
 
     print("=" * 50)
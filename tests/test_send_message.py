@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+try:
+    from benchmarks import bench_core
+    from benchmarks.fake_driver import FakeDriver
+except Exception as exc:  # config_perso.json absent: le backend ne s'importe pas
+    pytest.skip(f"tik_backend indisponible : {exc}", allow_module_level=True)
+
+tik_backend = bench_core.tik_backend
+
+
+def streamed_reply(typing):
+    for part in ("Salut toi. ", "Merci pour le follow. ", "A plus !"):
+        yield part
+        typing.set()
+        time.sleep(0.4)  # segments suivants encore en génération
+
+
+def test_concurrent_sends_stay_separate(monkeypatch):
+    monkeypatch.setattr(tik_backend, "get_human_delay", lambda: 0)
+    driver = FakeDriver(call_latency_ms=1, chat_nodes=0)
+    bench_core.use_driver(driver)
+
+    typing = threading.Event()
+    reply = threading.Thread(target=tik_backend.send_message_to_tiktok, args=(streamed_reply(typing),))
+    reply.start()
+    assert typing.wait(5)  # la réponse est en cours de frappe
+    auto = threading.Thread(target=tik_backend.send_message_to_tiktok, args=("AUTO MESSAGE",))
+    auto.start()
+    reply.join(10)
+    auto.join(10)
+
+    assert driver.sent_messages == ["Salut toi. Merci pour le follow. A plus !", "AUTO MESSAGE"]
+    assert tik_backend.auto_like_pause_event.is_set()
+
+
+def test_failed_reply_is_not_remembered(monkeypatch):
+    monkeypatch.setattr(tik_backend, "get_human_delay", lambda: 0)
+    driver = FakeDriver(call_latency_ms=1, chat_nodes=0)
+    monkeypatch.setattr(driver, "find_element", lambda by, value: 1 / 0)  # zone de saisie introuvable
+    bench_core.use_driver(driver)
+    tik_backend.state.set("running", True)
+    tik_backend.state.set("ENABLE_AUTO_CHATGPT", True)
+    try:
+        sent = tik_backend.send_reply_for_comment({"user": "alice", "content": "salut"}, "Salut alice !")
+    finally:
+        tik_backend.state.set("running", False)
+
+    assert sent is False
+    assert driver.sent_messages == []
+    assert tik_backend.viewer_history("alice") == []
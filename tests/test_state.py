@@ -0,0 +1,23 @@
+import threading
+
+from tik_state import EventBus, StateStore
+
+
+def test_concurrent_incr_publishes_ordered_versions():
+    bus = EventBus()
+    store = StateStore(bus, likes_sent=0)
+    versions = []
+    bus.subscribe("state", lambda event: versions.append(event["version"]))
+
+    def writer():
+        for _ in range(20000):
+            store.incr("likes_sent")
+
+    threads = [threading.Thread(target=writer) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert store.get("likes_sent") == 40000
+    assert versions == list(range(1, 40001))
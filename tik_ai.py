@@ -0,0 +1,290 @@
+"""
+Outils autour des réponses ChatGPT : cache de réponses normalisé,
+complétions groupées (plusieurs commentaires en un seul appel),
+réponses en streaming découpées en phrases et mémoire des conversations.
+"""
+
+import json
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+
+
+def normalize_comment(text):
+    """Replie casse, accents, emojis et ponctuation : "Salut !! 👋" -> "salut"."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^\w\s]|_", " ", text)
+    text = re.sub(r"(.)\1{2,}", r"\1", text)  # "saluuuut" -> "salut"
+    return " ".join(text.split())
+
+
+class ReplyCache:
+    """Cache LRU + TTL des réponses, avec un petit pool de variantes par clé.
+
+    Tant que le pool d'une clé n'est pas plein, get() renvoie None pour qu'une
+    nouvelle variante soit générée ; ensuite les variantes sont tirées au hasard
+    sans répéter la précédente.
+    """
+
+    def __init__(self, max_size=500, ttl=1800, variants=3):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.variants = max(1, variants)
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._avg_latency = 0.0
+        self._entries = OrderedDict()  # key -> [created, [replies], last_index, generations]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, system_prompt, model):
+        return (normalize_comment(text), system_prompt, model)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if not entry or entry[3] < self.variants:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            choices = [i for i in range(len(entry[1])) if i != entry[2]] or [0]
+            entry[2] = random.choice(choices)
+            self.hits += 1
+            self.saved_seconds += self._avg_latency
+            return entry[1][entry[2]]
+
+    def put(self, key, reply, latency=0.0):
+        if not key[0]:
+            return
+        with self._lock:
+            # Moyenne glissante de la latence API, pour estimer le temps économisé
+            self._avg_latency = latency if not self._avg_latency else 0.9 * self._avg_latency + 0.1 * latency
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [time.time(), [], -1, 0]
+            entry[3] += 1
+            if reply not in entry[1]:
+                entry[1].append(reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "saved_seconds": round(self.saved_seconds, 1),
+        }
+
+
+class StreamingReply:
+    """Réponse reçue en streaming, publiée phrase par phrase.
+
+    Le thread de génération appelle pump(until_first=True) puis pump() ;
+    le thread d'envoi consomme iter_segments() en parallèle et peut donc
+    commencer à taper dès que la première phrase est complète.
+    """
+
+    _SENTENCE_END = re.compile(r"[.!?…]+\s+")
+
+    def __init__(self, chunks, started=None, on_done=None):
+        self._chunks = iter(chunks)
+        self._segments = queue.Queue()
+        self._buffer = ""
+        self._parts = []
+        self.started = started or time.time()
+        self.ttft = None
+        self.total = None
+        self.done = False
+        self.on_done = on_done
+
+    @property
+    def text(self):
+        return "".join(self._parts).strip()
+
+    def _emit(self, segment):
+        if not self._parts:
+            segment = segment.lstrip()
+        if segment:
+            self._parts.append(segment)
+            self._segments.put(segment)
+            return True
+        return False
+
+    def pump(self, until_first=False):
+        """Consomme le flux ; avec until_first, s'arrête à la première phrase. Retourne True si du texte est publié."""
+        try:
+            for piece in self._chunks:
+                if not piece:
+                    continue
+                if self.ttft is None:
+                    self.ttft = time.time() - self.started
+                self._buffer += piece
+                emitted = False
+                match = self._SENTENCE_END.search(self._buffer)
+                while match:
+                    emitted = self._emit(self._buffer[:match.end()]) or emitted
+                    self._buffer = self._buffer[match.end():]
+                    match = self._SENTENCE_END.search(self._buffer)
+                if until_first and emitted:
+                    return True
+        except Exception:
+            pass  # flux interrompu: on garde ce qui a été reçu
+        self._finish()
+        return bool(self._parts)
+
+    def _finish(self):
+        if self.done:
+            return
+        self._emit(self._buffer.rstrip())
+        self._buffer = ""
+        self.total = time.time() - self.started
+        self.done = True
+        self._segments.put(None)
+        if self.on_done and self.text:
+            self.on_done(self.text, self.total)
+
+    def iter_segments(self):
+        while True:
+            segment = self._segments.get()
+            if segment is None:
+                return
+            yield segment
+
+
+BATCH_INSTRUCTIONS = (
+    "Tu reçois plusieurs commentaires du live, numérotés. Réponds à chacun séparément, "
+    "en tenant compte de l'historique éventuel de la personne. "
+    'Réponds uniquement en JSON : {"replies": [{"id": 1, "reply": "..."}, ...]}'
+)
+
+
+def build_batch_messages(system_prompt, comments, memory, max_turns=2):
+    """Un seul prompt système pour N commentaires ; historique compact par viewer."""
+    items = []
+    for i, com in enumerate(comments, 1):
+        item = {"id": i, "user": com.get("user", ""), "comment": com.get("content", "")}
+        history = memory.history(com.get("user", ""))
+        if history:
+            item["history"] = [[t.user, t.assistant] for t in history[-max_turns:]]
+        items.append(item)
+    return [
+        {"role": "system", "content": f"{system_prompt}\n\n{BATCH_INSTRUCTIONS}"},
+        {"role": "user", "content": json.dumps(items, ensure_ascii=False)},
+    ]
+
+
+def parse_batch_replies(text, count):
+    """Retourne une liste de `count` réponses (None si absente), ou None si le JSON est illisible."""
+    if not text:
+        return None
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    entries = data.get("replies") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return None
+    replies = [None] * count
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        idx, reply = entry.get("id"), entry.get("reply")
+        if isinstance(idx, int) and 1 <= idx <= count and isinstance(reply, str) and reply.strip():
+            replies[idx - 1] = reply.strip()
+    return replies
+
+
+class Turn:
+    """Un échange viewer → bot, sans __dict__ pour rester compact."""
+
+    __slots__ = ("user", "assistant")
+
+    def __init__(self, user, assistant):
+        self.user = user
+        self.assistant = assistant
+
+    def size(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.user) + sys.getsizeof(self.assistant)
+
+
+class ConversationMemory:
+    """Historique par viewer, borné en nombre de viewers (LRU) et en inactivité (TTL).
+
+    Les viewers sont gardés du moins au plus récemment actif : l'éviction se
+    fait toujours par le début, en O(1) par viewer retiré. La taille mémoire
+    des tours est tenue à jour à chaque ajout/éviction.
+    """
+
+    def __init__(self, max_viewers=2000, idle_ttl=1800, max_turns=10):
+        self.max_viewers = max_viewers
+        self.idle_ttl = idle_ttl
+        self.max_turns = max_turns
+        self.evicted = 0
+        self._viewers = OrderedDict()  # user -> [last_seen, deque[Turn]]
+        self._turns = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        viewers = self._viewers
+        while viewers:
+            user, (last_seen, turns) = next(iter(viewers.items()))
+            if len(viewers) <= self.max_viewers and now - last_seen <= self.idle_ttl:
+                break
+            viewers.popitem(last=False)
+            self._turns -= len(turns)
+            self._bytes -= sum(t.size() for t in turns)
+            self.evicted += 1
+
+    def history(self, user):
+        """Derniers tours du viewer (liste vide si inconnu ou expiré)."""
+        with self._lock:
+            self._evict(time.time())
+            entry = self._viewers.get(user)
+            return list(entry[1]) if entry else []
+
+    def append(self, user, user_text, reply):
+        now = time.time()
+        turn = Turn(user_text, reply)
+        with self._lock:
+            entry = self._viewers.get(user)
+            if entry is None:
+                entry = self._viewers[sys.intern(user)] = [now, deque(maxlen=self.max_turns)]
+            entry[0] = now
+            self._viewers.move_to_end(user)
+            turns = entry[1]
+            if len(turns) == turns.maxlen:
+                self._bytes -= turns[0].size()
+                self._turns -= 1
+            turns.append(turn)
+            self._turns += 1
+            self._bytes += turn.size()
+            self._evict(now)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "viewers": len(self._viewers),
+                "max_viewers": self.max_viewers,
+                "turns": self._turns,
+                "evicted": self.evicted,
+                "resident_kb": round(self._bytes / 1024, 1),
+            }
@@ -3,9 +3,8 @@ import os
 import threading
 import random
 import smtplib
-import psutil
 import json
-from collections import deque
+import atexit
 from functools import wraps
 from email.mime.text import MIMEText
 from flask import Flask, request, Response
@@ -13,13 +12,30 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from openai import OpenAI
+from tik_comments import CommentCapture, SeenComments, comment_key
+from tik_livestate import LiveStateMonitor
+from tik_state import EventBus, StateStore, StateStream
+from tik_server import install_http_optimizations, serve
+from tik_config import ConfigWriter
+from tik_settings import RESTART_REQUIRED, SettingsRegistry
+from tik_eventlog import EventLog
+from tik_metrics import MetricsRegistry
+from tik_profiler import SamplingProfiler, dump_stacks
+from tik_replay import CommentRecorder
+from tik_telemetry import TelemetrySampler
+from tik_messages import MessageLibrary
+from tik_driver import (
+    DriverExecutor, PRIORITY_MESSAGE, PRIORITY_NAVIGATION, PRIORITY_LIVE_STATE, PRIORITY_COMMENTS, PRIORITY_LIKE
+)
+from tik_pipeline import ReplyPipeline
+from tik_ratelimit import RateLimited, RequestScheduler, estimate_tokens
+from tik_ai import ConversationMemory, ReplyCache, StreamingReply, build_batch_messages, parse_batch_replies
 
 # ---------------- Events & Globals ----------------
 auto_like_pause_event = threading.Event()
 auto_like_pause_event.set()  # Par défaut, auto-like actif
+message_lock = threading.Lock()  # un message tapé à la fois dans le chat
 
-net_stats = {"last_bytes_sent": 0, "last_bytes_recv": 0}
-bandwidth_data = {"time": [], "upload": [], "download": []}
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 config_perso_path = os.path.join(script_dir, "config_perso.json")
@@ -46,6 +62,7 @@ EMAIL_PASSWORD_TIKTOK = config["EMAIL_PASSWORD_TIKTOK"]
 
 # ---- ChatGPT Config ----
 OPENAI_API_KEY = config.get("OPENAI_API_KEY", "")
+OPENAI_BASE_URL = config.get("OPENAI_BASE_URL", "")  # serveur compatible OpenAI (vide = api.openai.com)
 CHATGPT_MODEL = config.get("CHATGPT_MODEL", "gpt-5-nano")  # ex: "gpt-4o-mini"
 CHATGPT_SYSTEM_PROMPT = config.get(
     "CHATGPT_SYSTEM_PROMPT",
@@ -54,9 +71,47 @@ CHATGPT_SYSTEM_PROMPT = config.get(
 ENABLE_AUTO_CHATGPT = config.get("ENABLE_AUTO_CHATGPT", False)
 CHATGPT_MIN_INTERVAL = config.get("CHATGPT_MIN_INTERVAL", 4)  # secondes min entre réponses envoyées
 CHATGPT_MAX_INTERVAL = config.get("CHATGPT_MAX_INTERVAL", 8)  # secondes max entre réponses envoyées
+CHATGPT_CONCURRENCY = config.get("CHATGPT_CONCURRENCY", 3)  # générations IA en parallèle
+REPLY_QUEUE_SIZE = config.get("REPLY_QUEUE_SIZE", 50)  # commentaires en attente max avant abandon des plus anciens
+REPLY_CACHE_SIZE = config.get("REPLY_CACHE_SIZE", 500)  # 0 = cache de réponses désactivé
+REPLY_CACHE_TTL = config.get("REPLY_CACHE_TTL", 1800)  # secondes de validité d'une réponse en cache
+REPLY_CACHE_VARIANTS = config.get("REPLY_CACHE_VARIANTS", 3)  # variantes générées avant de servir depuis le cache
+CHATGPT_BATCH_SIZE = config.get("CHATGPT_BATCH_SIZE", 1)  # >1 = plusieurs commentaires par appel API
+CHATGPT_BATCH_WINDOW = config.get("CHATGPT_BATCH_WINDOW", 1.5)  # secondes d'attente pour remplir un batch
+CHATGPT_STREAMING = config.get("CHATGPT_STREAMING", False)  # taper la réponse dès la première phrase reçue
+CONVERSATION_MAX_VIEWERS = config.get("CONVERSATION_MAX_VIEWERS", 2000)  # viewers suivis au maximum (LRU)
+CONVERSATION_IDLE_TTL = config.get("CONVERSATION_IDLE_TTL", 1800)  # secondes d'inactivité avant oubli d'un viewer
+CONVERSATION_MAX_TURNS = config.get("CONVERSATION_MAX_TURNS", 10)  # échanges gardés par viewer
+OPENAI_RPM = config.get("OPENAI_RPM", 0)  # requêtes/minute max (0 = illimité)
+OPENAI_TPM = config.get("OPENAI_TPM", 0)  # tokens/minute max (0 = illimité)
+OPENAI_BUDGET_HOURLY = config.get("OPENAI_BUDGET_HOURLY", 0)  # dépense max par heure glissante ($, 0 = illimité)
+OPENAI_BUDGET_DAILY = config.get("OPENAI_BUDGET_DAILY", 0)  # dépense max par 24h glissantes ($, 0 = illimité)
+OPENAI_COST_PER_1K_TOKENS = config.get("OPENAI_COST_PER_1K_TOKENS", 0.0)  # prix moyen ($) pour 1000 tokens
+OPENAI_MAX_WAIT = config.get("OPENAI_MAX_WAIT", 10)  # au-delà, la requête est abandonnée plutôt qu'attendue
+REPLY_SHED_KEEP = config.get("REPLY_SHED_KEEP", 5)  # commentaires gardés en file quand l'API est limitée
+COMMENT_CAPTURE_MODE = config.get("COMMENT_CAPTURE_MODE", "scan")  # "scan" (relecture DOM) ou "observer" (MutationObserver)
+COMMENT_BUFFER_SIZE = config.get("COMMENT_BUFFER_SIZE", 500)  # taille du buffer circulaire in-page (mode observer)
+SEEN_COMMENTS_MAX = config.get("SEEN_COMMENTS_MAX", 5000)  # nb max de commentaires mémorisés pour le dédoublonnage
+SEEN_COMMENTS_TTL = config.get("SEEN_COMMENTS_TTL", 600)  # secondes avant oubli d'un commentaire traité
+WEB_SERVER_MODE = config.get("WEB_SERVER_MODE", "dev")  # "dev" (serveur Flask) ou "production" (waitress multithread)
+WEB_SERVER_THREADS = config.get("WEB_SERVER_THREADS", 16)  # threads du serveur de production (1 par client SSE connecté)
+WEB_GZIP_MIN_SIZE = config.get("WEB_GZIP_MIN_SIZE", 500)  # octets minimum avant compression gzip des réponses
+CONFIG_SAVE_DELAY = config.get("CONFIG_SAVE_DELAY", 0.5)  # secondes de calme avant d'écrire config.json (regroupement)
+SETTINGS_WATCH_INTERVAL = config.get("SETTINGS_WATCH_INTERVAL", 2)  # secondes entre deux vérifications des fichiers de config
+EVENT_LOG_DIR = config.get("EVENT_LOG_DIR", "logs")  # dossier des journaux de session JSONL (relatif au script)
+EVENT_LOG_MAX_MB = config.get("EVENT_LOG_MAX_MB", 5)  # taille max d'un fichier avant rotation
+EVENT_LOG_ROTATE_SECONDS = config.get("EVENT_LOG_ROTATE_SECONDS", 3600)  # âge max d'un fichier avant rotation
+EVENT_LOG_BACKUPS = config.get("EVENT_LOG_BACKUPS", 20)  # fichiers de session conservés
+EVENT_LOG_CONSOLE = config.get("EVENT_LOG_CONSOLE", True)  # recopier les messages de statut sur la console
+PROFILER_INTERVAL_MS = config.get("PROFILER_INTERVAL_MS", 10)  # période d'échantillonnage du profileur intégré
+COMMENT_RECORD = config.get("COMMENT_RECORD", False)  # enregistrer commentaires et envois pour le rejeu (tik_replay)
+COMMENT_RECORD_DIR = config.get("COMMENT_RECORD_DIR", "recordings")
+TELEMETRY_INTERVAL = config.get("TELEMETRY_INTERVAL", 1.0)  # secondes entre deux relevés réseau / CPU / mémoire
+TELEMETRY_FILE = config.get("TELEMETRY_FILE", "logs/telemetry.npz")  # historique conservé entre deux lancements
 
 _effective_api_key = OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "")
-client = OpenAI(api_key=_effective_api_key) if _effective_api_key else None
+# Les retries sont gérés par openai_scheduler (Retry-After, backoff commun à tous les threads)
+client = OpenAI(api_key=_effective_api_key, base_url=OPENAI_BASE_URL or None, max_retries=0) if _effective_api_key else None
 
 # ---- Bot Config ----
 WINDOW_SIZE = tuple(config["WINDOW_SIZE"])
@@ -68,46 +123,222 @@ HUMAN_PAUSE_MIN = config["HUMAN_PAUSE_MIN"]
 HUMAN_PAUSE_MAX = config["HUMAN_PAUSE_MAX"]
 CLEAR_INTERVAL = config["CLEAR_INTERVAL"]
 HUMAN_DELAYS = config["HUMAN_DELAYS"]
-REFRESH_INTERVAL = 20 * 60  # 20 minutes
+REFRESH_INTERVAL = config.get("REFRESH_INTERVAL", 20 * 60)  # secondes entre deux rafraîchissements du live
+LIVE_CHECK_INTERVAL = config.get("LIVE_CHECK_INTERVAL", 5)  # secondes entre deux sondes "live terminé"
 
 # ---- Auto Messages (manuels) ----
-AUTO_MESSAGES = config.get("AUTO_MESSAGES", [])
 ENABLE_AUTO_MESSAGES = config.get("ENABLE_AUTO_MESSAGES", False)
 
-running = False
 driver = None
-current_live = "https://www.tiktok.com/"
 ngrok_url = None
-status_message = "Bot en attente..."
-likes_sent = 0
-bot_start_time = None
-next_pause_time = None
+
+# État d'exécution: lu/écrit via `state`, chaque changement est publié sur `events`
+events = EventBus()
+# Modifiée uniquement via ses méthodes: chaque changement de lignes est publié (sujet "messages")
+AUTO_MESSAGES = MessageLibrary(config.get("AUTO_MESSAGES", []), events)
+state = StateStore(
+    events,
+    running=False,
+    current_live="https://www.tiktok.com/",
+    status_message="Bot en attente...",
+    likes_sent=0,
+    bot_start_time=None,
+    next_pause_time=None,
+    ENABLE_AUTO_MESSAGES=ENABLE_AUTO_MESSAGES,
+    ENABLE_AUTO_CHATGPT=ENABLE_AUTO_CHATGPT,
+    CHATGPT_MODEL=CHATGPT_MODEL,
+    message_count=len(AUTO_MESSAGES),
+    messages_version=0,
+    reply_cache_stats=None,
+    ai_latency=None,
+)
+# Flux SSE du panel web (/events): deltas d'état rejouables depuis Last-Event-ID
+state_stream = StateStream(state)
+# Réglages rechargés à chaud depuis config.json/config_perso.json: les boucles lisent
+# settings.current ; les constantes ci-dessus ne sont que les valeurs au démarrage
+settings = SettingsRegistry(
+    [config_path, config_perso_path],
+    events,
+    interval=SETTINGS_WATCH_INTERVAL,
+    on_error=lambda e: set_status(f"⚠️ Configuration rejetée, dernière version valide conservée : {e}"),
+)
+settings.load()
+
+# Métriques exportées sur /metrics (format texte Prometheus)
+metrics = MetricsRegistry("tiktok_")
+metric_driver_seconds = metrics.histogram("webdriver_command_seconds", "Durée d'exécution des commandes WebDriver", ["kind"])
+metric_driver_wait = metrics.histogram("webdriver_queue_wait_seconds", "Attente en file des commandes WebDriver", ["kind"])
+metric_driver_errors = metrics.counter("webdriver_command_errors", "Commandes WebDriver en erreur", ["kind"])
+metric_comments_poll = metrics.histogram("comments_poll_seconds", "Durée d'une lecture des commentaires du live")
+metric_comments_read = metrics.counter("comments_read", "Commentaires lus dans le DOM")
+metric_comments_new = metrics.counter("comments_new", "Commentaires nouveaux transmis au pipeline IA")
+metric_openai_seconds = metrics.histogram("openai_request_seconds", "Durée des appels OpenAI", ["mode"])
+metric_openai_tokens = metrics.counter("openai_tokens", "Tokens consommés (usage renvoyé par l'API)")
+metric_openai_limited = metrics.counter("openai_limited", "Appels OpenAI refusés par l'ordonnanceur")
+metric_message_seconds = metrics.histogram("message_send_seconds", "Durée de saisie et d'envoi d'un message")
+metric_messages = metrics.counter("messages", "Messages envoyés dans le chat", ["result"])
+metric_likes = metrics.counter("likes", "Likes envoyés")
+metric_likes_skipped = metrics.counter("likes_skipped", "Likes sautés (simulation humaine)")
+metric_pause_seconds = metrics.counter("pause_seconds", "Temps passé en pause humaine")
+metric_smtp_seconds = metrics.histogram("smtp_send_seconds", "Durée d'envoi d'un email d'alerte", ["result"])
+metric_bandwidth = metrics.gauge("bandwidth_kib_per_second", "Débit réseau relevé par la télémétrie (Kio/s)", ["direction"])
+metric_process_cpu = metrics.gauge("process_cpu_percent", "CPU des processus du bot (%)", ["process"])
+metric_process_rss = metrics.gauge("process_rss_mb", "Mémoire résidente des processus du bot (Mo)", ["process"])
+metrics.gauge("running", "1 si le bot est lancé").set_function(lambda: int(bool(state.get("running"))))
+
+def _observe_driver_command(kind, queue_wait, exec_time, failed):
+    metric_driver_wait.labels(kind).observe(queue_wait)
+    metric_driver_seconds.labels(kind).observe(exec_time)
+    if failed:
+        metric_driver_errors.labels(kind).inc()
+
+seen_comments = SeenComments(SEEN_COMMENTS_MAX, SEEN_COMMENTS_TTL)
+live_monitor = LiveStateMonitor()
+# Seul thread autorisé à utiliser le driver une fois lancé (voir tik_driver)
+driver_executor = DriverExecutor(lambda: driver, on_command=_observe_driver_command)
+metrics.gauge("webdriver_queue_depth", "Commandes WebDriver en attente").set_function(driver_executor.pending)
+metrics.gauge("reply_queue_depth", "Commentaires en attente de génération IA").set_function(
+    lambda: reply_pipeline.ingest_queue.qsize() if reply_pipeline else 0
+)
+reply_pipeline = None
+reply_cache = ReplyCache(REPLY_CACHE_SIZE, REPLY_CACHE_TTL, REPLY_CACHE_VARIANTS) if REPLY_CACHE_SIZE else None
+conversation_memory = ConversationMemory(CONVERSATION_MAX_VIEWERS, CONVERSATION_IDLE_TTL, CONVERSATION_MAX_TURNS)
+# Auteur des commentaires sans pseudo lisible (mode scan): pas de mémoire de conversation,
+# sinon tous les anonymes partageraient un historique et le cache de réponses ne servirait jamais
+ANONYMOUS_VIEWER = "viewer"
+
+def viewer_history(user):
+    return [] if user == ANONYMOUS_VIEWER else conversation_memory.history(user)
 
 app = Flask(__name__)
+install_http_optimizations(app, gzip_min_size=WEB_GZIP_MIN_SIZE)
 
 # ============== Helpers & Utilities ==============
+def _build_config():
+    # Appelé par le thread d'écriture: copie de l'état au moment de l'écriture
+    data = dict(config)
+    data["AUTO_MESSAGES"] = AUTO_MESSAGES.snapshot()
+    data["ENABLE_AUTO_MESSAGES"] = state.get("ENABLE_AUTO_MESSAGES")
+    data["ENABLE_AUTO_CHATGPT"] = state.get("ENABLE_AUTO_CHATGPT")
+    data["CHATGPT_MODEL"] = state.get("CHATGPT_MODEL")
+    data["CHATGPT_SYSTEM_PROMPT"] = settings.current.CHATGPT_SYSTEM_PROMPT
+    return data
+
+config_writer = ConfigWriter(
+    config_path,
+    _build_config,
+    delay=CONFIG_SAVE_DELAY,
+    on_written=lambda: set_status("✅ Configuration sauvegardée dans le JSON"),
+    on_error=lambda e: set_status(f"⚠️ Erreur sauvegarde JSON : {e}"),
+)
+# Les modifications encore en attente sont écrites à la fermeture
+atexit.register(config_writer.flush)
+
 def save_config_to_json():
-    global config, AUTO_MESSAGES, ENABLE_AUTO_MESSAGES, ENABLE_AUTO_CHATGPT, CHATGPT_MODEL, CHATGPT_SYSTEM_PROMPT
+    """Planifie l'écriture de config.json (regroupée, atomique, hors du thread appelant)."""
+    config_writer.schedule()
+    return True
+
+def run_web_server(host="0.0.0.0", port=5000):
+    """Sert le panel web (bloquant) selon WEB_SERVER_MODE."""
     try:
-        config["AUTO_MESSAGES"] = AUTO_MESSAGES
-        config["ENABLE_AUTO_MESSAGES"] = ENABLE_AUTO_MESSAGES
-        config["ENABLE_AUTO_CHATGPT"] = ENABLE_AUTO_CHATGPT
-        config["CHATGPT_MODEL"] = CHATGPT_MODEL
-        config["CHATGPT_SYSTEM_PROMPT"] = CHATGPT_SYSTEM_PROMPT
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
-        set_status("✅ Configuration sauvegardée dans le JSON")
-        return True
+        serve(app, host, port, WEB_SERVER_MODE, WEB_SERVER_THREADS)
     except Exception as e:
-        set_status(f"⚠️ Erreur sauvegarde JSON : {e}")
-        return False
+        set_status(f"⚠️ Erreur serveur web : {e}")
 
 def set_status(msg):
-    global status_message
-    status_message = msg
-    print(msg)
+    state.set("status_message", msg)
+
+def notify_messages_changed():
+    """À appeler après toute modification d'AUTO_MESSAGES (Qt ou web)."""
+    state.set("message_count", len(AUTO_MESSAGES))
+    state.incr("messages_version")
+
+# Journal JSONL: emit() n'écrit jamais sur le disque, le thread "event-log" s'en charge par lots
+event_log = EventLog(
+    os.path.join(script_dir, EVENT_LOG_DIR),
+    max_bytes=int(EVENT_LOG_MAX_MB * 1024 * 1024),
+    rotate_seconds=EVENT_LOG_ROTATE_SECONDS,
+    backups=EVENT_LOG_BACKUPS,
+    console=EVENT_LOG_CONSOLE,
+).start()
+atexit.register(event_log.flush)
+
+# Télémétrie système: thread "telemetry" (run.py / main), historique 1 s sur 1 h et 1 min sur 24 h
+def _on_telemetry_sample(values):
+    up, down, bot_cpu, bot_rss, driver_cpu, driver_rss, chrome_cpu, chrome_rss = values
+    metric_bandwidth.labels("upload").set(up)
+    metric_bandwidth.labels("download").set(down)
+    for name, cpu, rss in (("bot", bot_cpu, bot_rss), ("chromedriver", driver_cpu, driver_rss),
+                           ("chrome", chrome_cpu, chrome_rss)):
+        metric_process_cpu.labels(name).set(cpu)
+        metric_process_rss.labels(name).set(rss)
+    publish_ai_summaries()
+
+def publish_ai_summaries():
+    # Résumés arrondis dans l'état versionné (/status, flux SSE) : inchangés, ils ne créent
+    # pas de nouvelle version et un panel inactif garde ses 304
+    if reply_cache is not None:
+        cs = reply_cache.stats()
+        state.set("reply_cache_stats", {
+            "hit_rate": cs["hit_rate"],
+            "hits": cs["hits"],
+            "lookups": cs["hits"] + cs["misses"],
+            "saved_seconds": round(cs["saved_seconds"]),
+        })
+    if reply_pipeline is not None:
+        latency = {}
+        for stage in ("ttft", "generation", "end_to_end"):
+            s = reply_pipeline.stats[stage].summary()
+            latency[stage] = {"p50_ms": round(s["p50_ms"]), "p95_ms": round(s["p95_ms"])}
+        state.set("ai_latency", latency)
+
+telemetry = TelemetrySampler(TELEMETRY_INTERVAL, os.path.join(script_dir, TELEMETRY_FILE), on_sample=_on_telemetry_sample)
+atexit.register(telemetry.save)
+
+# Flux de commentaires enregistré pour le rejeu hors ligne : python -m tik_replay recordings/live-....jsonl.gz
+comment_recorder = None
+if COMMENT_RECORD:
+    comment_recorder = CommentRecorder(os.path.join(script_dir, COMMENT_RECORD_DIR), lambda: state.get("current_live"))
+    atexit.register(comment_recorder.close)
+
+# Profileur à la demande (panel web / fenêtre Qt) ; exports dans le dossier des journaux
+profiler = SamplingProfiler(PROFILER_INTERVAL_MS / 1000.0)
+
+def _write_diagnostic(prefix, text):
+    directory = os.path.join(script_dir, EVENT_LOG_DIR)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime(f"{prefix}-%Y%m%d-%H%M%S.txt"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+def start_profiler():
+    if profiler.start():
+        set_status(f"🔬 Profilage démarré ({PROFILER_INTERVAL_MS} ms)")
+    return profiler.summary()
+
+def stop_profiler():
+    """Arrête le profileur et exporte les piles repliées (format flamegraph) ; retourne le chemin."""
+    if not profiler.stop():
+        return None
+    path = _write_diagnostic("profile", profiler.collapsed())
+    set_status(f"🔬 Profil enregistré : {path}")
+    return path
+
+def export_thread_dump():
+    path = _write_diagnostic("threads", dump_stacks())
+    set_status(f"🧵 Piles des threads enregistrées : {path}")
+    return path
+
+def _log_state_change(event):
+    if event["key"] == "status_message":
+        event_log.emit("status", text=event["value"])
+
+events.subscribe("state", _log_state_change)
 
 def send_email_alert(subject, body):
+    started = time.time()
     try:
         msg = MIMEText(body)
         msg["Subject"] = subject
@@ -116,12 +347,14 @@ def send_email_alert(subject, body):
         with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(EMAIL_SENDER, EMAIL_PASSWORD)
             server.sendmail(EMAIL_SENDER, EMAIL_RECEIVER, msg.as_string())
+        metric_smtp_seconds.labels("ok").observe(time.time() - started)
         set_status(f"✉️ Email envoyé : {subject}")
     except Exception as e:
+        metric_smtp_seconds.labels("error").observe(time.time() - started)
         set_status(f"⚠️ Erreur envoi email : {e}")
 
 def get_human_delay():
-    base = random.choice(HUMAN_DELAYS)
+    base = random.choice(settings.current.HUMAN_DELAYS)
     variation = random.uniform(-5, 5)
     delay = max(100, base + variation)
     return delay / 1000.0
@@ -140,19 +373,11 @@ def try_action(description, func, retries=3, wait=2, fatal=True):
     return False
 
 def get_bandwidth():
-    global net_stats
-    counters = psutil.net_io_counters()
-    sent = counters.bytes_sent
-    recv = counters.bytes_recv
-    if net_stats["last_bytes_sent"] == 0:
-        net_stats["last_bytes_sent"] = sent
-        net_stats["last_bytes_recv"] = recv
+    """Dernier débit (Kio/s) relevé par le thread de télémétrie ; ne mesure rien lui-même."""
+    last = telemetry.latest()
+    if last is None:
         return 0, 0
-    upload = (sent - net_stats["last_bytes_sent"]) / 1024
-    download = (recv - net_stats["last_bytes_recv"]) / 1024
-    net_stats["last_bytes_sent"] = sent
-    net_stats["last_bytes_recv"] = recv
-    return upload, download
+    return last["net_up_kib_s"], last["net_down_kib_s"]
 
 # ============== Flask Auth ==============
 def check_auth(username, password):
@@ -171,55 +396,83 @@ def requires_auth(f):
     return decorated
 
 # ============== Core Bot ==============
+def set_running(value):
+    state.set("running", value)
+    if value:
+        if not state.get("bot_start_time"):
+            state.set("bot_start_time", time.time())
+        live_monitor.reset()
+
 def toggle_running():
-    global running, bot_start_time
-    running = not running
-    if running:
-        if not bot_start_time:
-            bot_start_time = time.time()
-        set_status("▶️ Bot activé")
-    else:
-        set_status("⏸️ Bot en pause")
+    set_running(not state.get("running"))
+    set_status("▶️ Bot activé" if state.get("running") else "⏸️ Bot en pause")
 
 def auto_like():
-    global running, driver, likes_sent, next_pause_time, auto_like_pause_event
-    actions = None
-    next_pause_time = time.time() + random.randint(HUMAN_PAUSE_FREQ_MIN, HUMAN_PAUSE_FREQ_MAX)
+    global driver, auto_like_pause_event
+    s = settings.current
+    state.set("next_pause_time", time.time() + random.randint(s.HUMAN_PAUSE_FREQ_MIN, s.HUMAN_PAUSE_FREQ_MAX))
     while True:
-        if running and driver:
+        if state.get("running") and driver and not live_monitor.is_ended():
             auto_like_pause_event.wait()
-            if not actions:
-                actions = ActionChains(driver)
             try:
-                if "live terminé" in driver.page_source.lower():
-                    set_status("⚠️ Live terminé détecté !")
-                    send_email_alert("Bot TikTok - Live terminé", f"Le live {current_live} est terminé.")
-                    running = False
-                    continue
                 if random.random() < 0.9:
-                    actions.send_keys("l").perform()
-                    likes_sent += 1
-                    set_status(f"💖 Like #{likes_sent}")
+                    driver_executor.run(lambda d: ActionChains(d).send_keys("l").perform(), PRIORITY_LIKE, "like")
+                    likes = state.incr("likes_sent")
+                    metric_likes.inc()
+                    event_log.emit("like", count=likes)
+                    set_status(f"💖 Like #{likes}")
                 else:
+                    metric_likes_skipped.inc()
+                    event_log.emit("like_skipped")
                     set_status("⏭️ Like sauté (simulation humaine)")
             except Exception as e:
                 set_status(f"⚠️ Erreur auto_like: {e}")
-            if time.time() >= next_pause_time:
-                pause_duration = random.randint(HUMAN_PAUSE_MIN, HUMAN_PAUSE_MAX)
+            if time.time() >= state.get("next_pause_time"):
+                s = settings.current
+                pause_duration = random.randint(s.HUMAN_PAUSE_MIN, s.HUMAN_PAUSE_MAX)
+                event_log.emit("pause", duration=pause_duration)
                 set_status(f"⏸️ Pause humaine pour {pause_duration} sec...")
                 time.sleep(pause_duration)
-                next_pause_time = time.time() + random.randint(HUMAN_PAUSE_FREQ_MIN, HUMAN_PAUSE_FREQ_MAX)
+                metric_pause_seconds.inc(pause_duration)
+                s = settings.current
+                state.set("next_pause_time", time.time() + random.randint(s.HUMAN_PAUSE_FREQ_MIN, s.HUMAN_PAUSE_FREQ_MAX))
             time.sleep(get_human_delay())
         else:
             time.sleep(0.1)
 
+def on_live_ended(url):
+    # Appelé par live_monitor.check, donc dans le thread "driver-executor": rien de lent ici
+    url = url or state.get("current_live")
+    state.set("running", False)
+    event_log.emit("live_ended", url=url)
+    set_status("⚠️ Live terminé détecté !")
+    threading.Thread(target=_finish_live, args=(url,), name="live-ended", daemon=True).start()
+
+def _finish_live(url):
+    # Fermeture du fichier et SMTP hors du thread WebDriver: un serveur mail lent ne bloque aucune commande
+    if comment_recorder is not None:
+        comment_recorder.close()  # le prochain live aura son propre fichier
+    send_email_alert("Bot TikTok - Live terminé", f"Le live {url} est terminé.")
+
+live_monitor.subscribe(on_live_ended)
+
+def live_state_loop():
+    # Sonde basse fréquence, indépendante du rythme des likes
+    while True:
+        try:
+            if state.get("running") and driver and not live_monitor.is_ended():
+                driver_executor.run(live_monitor.check, PRIORITY_LIVE_STATE, "live_state")
+        except Exception as e:
+            set_status(f"⚠️ Erreur live_state_loop : {e}")
+        time.sleep(settings.current.LIVE_CHECK_INTERVAL)
+
 def auto_message_loop():
-    global ENABLE_AUTO_MESSAGES, AUTO_MESSAGES
     while True:
-        if ENABLE_AUTO_MESSAGES and running and driver and AUTO_MESSAGES:
-            msg = random.choice(AUTO_MESSAGES)
+        msg = AUTO_MESSAGES.pick() if state.get("ENABLE_AUTO_MESSAGES") and state.get("running") and driver else None
+        if msg:
             send_message_to_tiktok(msg)
-            delay = random.randint(config.get("AUTO_MESSAGE_DELAY_MIN", 30), config.get("AUTO_MESSAGE_DELAY_MAX", 120))
+            s = settings.current
+            delay = random.randint(s.AUTO_MESSAGE_DELAY_MIN, s.AUTO_MESSAGE_DELAY_MAX)
             set_status(f"💬 Prochain auto-message dans {delay}s")
             time.sleep(delay)
         else:
@@ -242,7 +495,7 @@ def launch_driver():
         winreg = None
 
     import undetected_chromedriver as uc
-    global driver, current_live
+    global driver
 
     # 1) Fermer l'instance existante si présente
     if driver:
@@ -313,6 +566,9 @@ def launch_driver():
 
     # 3) Options UC
     options = uc.ChromeOptions()
+    if settings.current.CHROME_HEADLESS:
+        # Sans fenêtre: tests de bout en bout contre benchmarks.fake_live
+        options.add_argument("--headless=new")
 
     # Fixer explicitement le binaire si trouvé
     if chrome_path and os.path.exists(chrome_path):
@@ -332,7 +588,7 @@ def launch_driver():
     time.sleep(0.5)
     driver.set_window_position(100, 100)
     time.sleep(0.5)
-    driver.get(current_live)
+    driver.get(state.get("current_live"))
     time.sleep(3)
     time.sleep(0.5)
     driver.refresh()
@@ -374,14 +630,18 @@ def launch_driver():
         "xpath", "//button[@data-e2e='login-button']").click())
 
 def refresh_live_loop():
-    global driver, current_live
+    global driver
+    last_refresh = time.time()
     while True:
-        time.sleep(REFRESH_INTERVAL)
+        # Attente par petits pas: un nouveau REFRESH_INTERVAL s'applique sans redémarrage
+        while time.time() - last_refresh < settings.current.REFRESH_INTERVAL:
+            time.sleep(1)
+        last_refresh = time.time()
         try:
             if driver:
-                live_url = driver.current_url
+                live_url = driver_executor.run(lambda d: d.current_url, PRIORITY_NAVIGATION, "navigation")
                 set_status("♻️ Rafraîchissement automatique du live...")
-                driver.get(live_url)
+                driver_executor.run(lambda d: d.get(live_url), PRIORITY_NAVIGATION, "navigation")
                 time.sleep(5)
                 set_status(f"✅ Live rechargé : {live_url}")
                 send_email_alert("Bot TikTok - Rafraîchissement", f"Le live a été rechargé : {live_url}")
@@ -391,115 +651,297 @@ def refresh_live_loop():
             set_status(f"⚠️ Erreur refresh_live_loop : {e}")
 
 def send_message_to_tiktok(msg):
+    # msg: texte, ou itérable de segments (réponse IA en streaming) tapés au fil de l'eau ;
+    # retourne True si le message a été envoyé
     global driver, auto_like_pause_event
     if driver:
-        try:
-            auto_like_pause_event.clear()
-            set_status("⏸️ Auto-like en pause pour envoi message...")
-            time.sleep(0.5)
-            chat_box = driver.find_element(
-                "xpath",
-                "//div[@contenteditable='plaintext-only' and @placeholder='Saisis ton message...']"
-            )
-            chat_box.click()
-            time.sleep(get_human_delay())
-            chat_box.send_keys(msg)
-            time.sleep(get_human_delay())
-            chat_box.send_keys(Keys.ENTER)
-            set_status(f"💬 Message envoyé : {msg}")
-            time.sleep(get_human_delay())
-        except Exception as e:
-            set_status(f"⚠️ Erreur envoi message : {e}")
-        finally:
-            auto_like_pause_event.set()
-            set_status("▶️ Auto-like réactivé après envoi message")
+        # Un seul message à la fois, de l'ouverture du chat à ENTER: auto-messages,
+        # réponses IA et envois manuels ne se mélangent pas dans la zone de saisie
+        with message_lock:
+            try:
+                auto_like_pause_event.clear()
+                set_status("⏸️ Auto-like en pause pour envoi message...")
+                time.sleep(0.5)
+
+                def open_chat_box(d):
+                    chat_box = d.find_element(
+                        "xpath",
+                        "//div[@contenteditable='plaintext-only' and @placeholder='Saisis ton message...']"
+                    )
+                    chat_box.click()
+                    return chat_box
+
+                # Priorité maximale: passe devant les likes et la lecture du chat. Une commande courte
+                # par étape: l'attente des segments d'une réponse en streaming se fait ici, hors du
+                # thread WebDriver, et ne compte pas dans le timeout des commandes
+                started = time.time()
+                chat_box = driver_executor.run(open_chat_box, PRIORITY_MESSAGE, "message")
+                time.sleep(get_human_delay())
+                sent = ""
+                for part in ([msg] if isinstance(msg, str) else msg):
+                    driver_executor.run(lambda d, part=part: chat_box.send_keys(part), PRIORITY_MESSAGE, "message")
+                    sent += part
+                time.sleep(get_human_delay())
+                driver_executor.run(lambda d: chat_box.send_keys(Keys.ENTER), PRIORITY_MESSAGE, "message")
+                latency = time.time() - started
+                metric_message_seconds.observe(latency)
+                metric_messages.labels("sent").inc()
+                event_log.emit("message_sent", latency=latency, chars=len(sent))
+                if comment_recorder is not None:
+                    comment_recorder.send(sent)
+                set_status(f"💬 Message envoyé : {sent}")
+                time.sleep(get_human_delay())
+                return True
+            except Exception as e:
+                metric_messages.labels("failed").inc()
+                event_log.emit("message_failed", error=str(e))
+                set_status(f"⚠️ Erreur envoi message : {e}")
+                return False
+            finally:
+                auto_like_pause_event.set()
+                set_status("▶️ Auto-like réactivé après envoi message")
     else:
         set_status("⚠️ Driver non lancé, impossible d'envoyer le message.")
+        return False
 
 # ============== ChatGPT Integration ==============
-client = None
-if OPENAI_API_KEY:
-    client = OpenAI(api_key=OPENAI_API_KEY)
 
-def chatgpt_generate_reply(user_text, previous_dialog=None):
+openai_scheduler = RequestScheduler(
+    rpm=OPENAI_RPM,
+    tpm=OPENAI_TPM,
+    hourly_budget=OPENAI_BUDGET_HOURLY,
+    daily_budget=OPENAI_BUDGET_DAILY,
+    cost_per_1k_tokens=OPENAI_COST_PER_1K_TOKENS,
+    max_wait=OPENAI_MAX_WAIT,
+)
+
+# Champs de config gérés par l'application (UI/web) et non par les fichiers
+APP_OWNED_KEYS = ("AUTO_MESSAGES", "ENABLE_AUTO_MESSAGES", "ENABLE_AUTO_CHATGPT", "CHATGPT_MODEL")
+
+def _apply_settings(event):
+    s, changed = event["settings"], event["changed"]
+    # Le prochain save_config_to_json ne doit pas réécrire les anciennes valeurs
+    config.update({k: v for k, v in event["raw"].items() if k not in APP_OWNED_KEYS})
+    openai_scheduler.configure(
+        s.OPENAI_RPM, s.OPENAI_TPM, s.OPENAI_BUDGET_HOURLY, s.OPENAI_BUDGET_DAILY,
+        s.OPENAI_COST_PER_1K_TOKENS, s.OPENAI_MAX_WAIT,
+    )
+    conversation_memory.idle_ttl = s.CONVERSATION_IDLE_TTL
+    if reply_pipeline is not None:
+        reply_pipeline.min_interval = s.CHATGPT_MIN_INTERVAL
+        reply_pipeline.max_interval = s.CHATGPT_MAX_INTERVAL
+        reply_pipeline.batch_size = s.CHATGPT_BATCH_SIZE
+        reply_pipeline.batch_window = s.CHATGPT_BATCH_WINDOW
+    if not changed:
+        return
+    restart = sorted(k for k in changed if k in RESTART_REQUIRED)
+    event_log.emit("settings_reloaded", keys=sorted(changed), restart=restart)
+    set_status(f"🔄 Réglages rechargés : {', '.join(sorted(changed))}")
+    if restart:
+        set_status(f"⚠️ Redémarrage nécessaire pour : {', '.join(restart)}")
+
+events.subscribe("settings", _apply_settings)
+
+def chatgpt_generate_reply(user_text, previous_dialog=None, stream=False):
     if client is None:
         return None
-    messages = [{"role": "system", "content": CHATGPT_SYSTEM_PROMPT}]
+    # Cache réservé aux premiers échanges: sans historique, la réponse ne dépend que du texte
+    cache_key = None
+    if reply_cache is not None and not previous_dialog:
+        cache_key = reply_cache.key(user_text, settings.current.CHATGPT_SYSTEM_PROMPT, state.get("CHATGPT_MODEL"))
+        cached = reply_cache.get(cache_key)
+        if cached:
+            return cached
+    messages = [{"role": "system", "content": settings.current.CHATGPT_SYSTEM_PROMPT}]
     previous_dialog = previous_dialog or []
     for turn in previous_dialog[-6:]:
-        messages.append({"role": "user", "content": turn.get("user", "")})
-        messages.append({"role": "assistant", "content": turn.get("assistant", "")})
+        messages.append({"role": "user", "content": turn.user})
+        messages.append({"role": "assistant", "content": turn.assistant})
     messages.append({"role": "user", "content": user_text})
     try:
-        comp = client.chat.completions.create(
-            model=CHATGPT_MODEL,
+        started = time.time()
+        if stream:
+            chunks = openai_scheduler.call(lambda: client.chat.completions.create(
+                model=state.get("CHATGPT_MODEL"),
+                messages=messages,
+                temperature=0.7,
+                max_tokens=120,
+                stream=True
+            ), estimate_tokens(messages, 120))
+            def on_done(text, total):
+                metric_openai_seconds.labels("stream").observe(total)
+                if cache_key is not None:
+                    reply_cache.put(cache_key, text, total)
+            return StreamingReply(
+                (c.choices[0].delta.content or "" for c in chunks if c.choices), started, on_done
+            )
+        comp = openai_scheduler.call(lambda: client.chat.completions.create(
+            model=state.get("CHATGPT_MODEL"),
             messages=messages,
             temperature=0.7,
             max_tokens=120
-        )
+        ), estimate_tokens(messages, 120))
         reply = comp.choices[0].message.content.strip()
+        latency = time.time() - started
+        usage = getattr(comp, "usage", None)
+        tokens = getattr(usage, "total_tokens", None)
+        metric_openai_seconds.labels("single").observe(latency)
+        metric_openai_tokens.inc(tokens or 0)
+        event_log.emit("openai_reply", latency=latency, tokens=tokens)
+        if cache_key is not None and reply:
+            reply_cache.put(cache_key, reply, latency)
         return reply
+    except RateLimited as e:
+        metric_openai_limited.inc()
+        event_log.emit("openai_limited", reason=str(e))
+        set_status(f"⏳ ChatGPT limité : {e}")
+        return None
     except Exception as e:
         set_status(f"⚠️ Erreur ChatGPT: {e}")
         return None
 
+def chatgpt_generate_batch(comments):
+    """Répond à plusieurs commentaires en un seul appel ; None pour chaque réponse manquante."""
+    if client is None:
+        return None
+    replies = [None] * len(comments)
+    keys = [None] * len(comments)
+    pending = []
+    for i, com in enumerate(comments):
+        if reply_cache is not None and not viewer_history(com["user"]):
+            keys[i] = reply_cache.key(com["content"], settings.current.CHATGPT_SYSTEM_PROMPT, state.get("CHATGPT_MODEL"))
+            replies[i] = reply_cache.get(keys[i])
+        if not replies[i]:
+            pending.append(i)
+    if not pending:
+        return replies
+    batch = [comments[i] for i in pending]
+    try:
+        started = time.time()
+        messages = build_batch_messages(settings.current.CHATGPT_SYSTEM_PROMPT, batch, conversation_memory)
+        comp = openai_scheduler.call(lambda: client.chat.completions.create(
+            model=state.get("CHATGPT_MODEL"),
+            messages=messages,
+            temperature=0.7,
+            max_tokens=120 * len(batch),
+            response_format={"type": "json_object"}
+        ), estimate_tokens(messages, 120 * len(batch)))
+        parsed = parse_batch_replies(comp.choices[0].message.content, len(batch))
+    except Exception as e:
+        set_status(f"⚠️ Erreur ChatGPT (batch): {e}")
+        return replies
+    if parsed is None:
+        set_status("⚠️ Réponse batch illisible, repli sur des appels unitaires")
+        return replies
+    usage = getattr(comp, "usage", None)
+    tokens = getattr(usage, "total_tokens", None)
+    metric_openai_seconds.labels("batch").observe(time.time() - started)
+    metric_openai_tokens.inc(tokens or 0)
+    event_log.emit("openai_batch", latency=time.time() - started, size=len(batch), tokens=tokens)
+    latency = (time.time() - started) / len(batch)
+    for i, reply in zip(pending, parsed):
+        replies[i] = reply
+        if reply and keys[i] is not None:
+            reply_cache.put(keys[i], reply, latency)
+    return replies
+
 # Extraction des commentaires (DOM variable selon TikTok)
 def get_live_comments(driver):
     results = []
-    try:
-        # Fallback 1: data-e2e chatroom
-        nodes = driver.find_elements(By.XPATH, "//*[contains(@data-e2e,'chat')]")
-        for n in nodes:
+    visited = set()
+
+    def collect(elements):
+        for el in elements:
+            # Un même nœud peut matcher les deux sélecteurs (el.id ne fait pas d'appel WebDriver)
+            if el.id in visited:
+                continue
+            visited.add(el.id)
             try:
-                txt = n.text.strip()
+                txt = el.text.strip()
                 if txt and len(txt) < 300:
-                    results.append({"user": "", "content": txt})
+                    # Référence WebDriver du nœud: deux "salut" distincts gardent deux identités,
+                    # et un nœud déjà lu garde la sienne quand les plus anciens quittent le chat
+                    results.append({"user": "", "content": txt, "node": el.id})
             except Exception:
                 pass
+
+    try:
+        # Fallback 1: data-e2e chatroom
+        collect(driver.find_elements(By.XPATH, "//*[contains(@data-e2e,'chat')]"))
         # Fallback 2: classes génériques (à ajuster selon DOM réel)
-        items = driver.find_elements(By.CSS_SELECTOR, ".comment-item, .css-*, [class*='comment']")
-        for c in items:
-            try:
-                content = c.text.strip()
-                if content and len(content) < 300:
-                    results.append({"user": "", "content": content})
-            except Exception:
-                pass
+        collect(driver.find_elements(By.CSS_SELECTOR, ".comment-item, .css-*, [class*='comment']"))
     except Exception:
         pass
-    # Dédupliquer par contenu
-    unique = []
-    seen = set()
-    for r in results:
-        key = r["content"]
-        if key not in seen:
-            unique.append(r)
-            seen.add(key)
-    return unique
-
-# Boucle IA: lire commentaires → générer → envoyer
+    return results
+
+# Étapes du pipeline IA (appelées depuis les threads de tik_pipeline)
+def generate_reply_for_comment(com):
+    history = viewer_history(com["user"])
+    return chatgpt_generate_reply(com["content"], previous_dialog=history, stream=settings.current.CHATGPT_STREAMING)
+
+def send_reply_for_comment(com, reply):
+    # Le bot a pu être arrêté pendant la génération
+    if not (state.get("ENABLE_AUTO_CHATGPT") and state.get("running")):
+        return False
+    if isinstance(reply, StreamingReply):
+        sent = send_message_to_tiktok(reply.iter_segments())
+        reply = reply.text
+    else:
+        sent = send_message_to_tiktok(reply)
+    # Échec d'envoi: ni mémoire de conversation, ni latence bout-en-bout
+    if sent and com["user"] != ANONYMOUS_VIEWER:
+        conversation_memory.append(com["user"], com["content"], reply)
+    return sent
+
+def on_reply_send_error(com, error):
+    # Le thread d'envoi du pipeline continue avec la réponse suivante
+    event_log.emit("reply_send_error", user=com["user"], error=f"{type(error).__name__}: {error}")
+    set_status(f"⚠️ Erreur envoi réponse IA : {error}")
+
+# Boucle IA: lire commentaires → pipeline (génération concurrente → envoi rythmé)
 def live_reply_loop():
-    global ENABLE_AUTO_CHATGPT, driver, running
-    dialog_by_user = {}
-    seen_last = deque(maxlen=200)
+    global driver, reply_pipeline
+    capture = CommentCapture(COMMENT_BUFFER_SIZE) if COMMENT_CAPTURE_MODE == "observer" else None
+    reply_pipeline = ReplyPipeline(
+        generate_reply_for_comment,
+        send_reply_for_comment,
+        concurrency=CHATGPT_CONCURRENCY,
+        queue_size=REPLY_QUEUE_SIZE,
+        min_interval=settings.current.CHATGPT_MIN_INTERVAL,
+        max_interval=settings.current.CHATGPT_MAX_INTERVAL,
+        generate_batch=chatgpt_generate_batch,
+        batch_size=settings.current.CHATGPT_BATCH_SIZE,
+        batch_window=settings.current.CHATGPT_BATCH_WINDOW,
+        on_send_error=on_reply_send_error,
+    ).start()
     while True:
         try:
             # Activation condition modifiée pour n'activer que si bot lancé
-            if ENABLE_AUTO_CHATGPT and running and driver:
-                comments = get_live_comments(driver)
+            if state.get("ENABLE_AUTO_CHATGPT") and state.get("running") and driver:
+                # Mode observer: un seul execute_script vide le buffer in-page
+                polled_at = time.time()
+                comments = driver_executor.run(
+                    capture.poll if capture else get_live_comments, PRIORITY_COMMENTS, "comments"
+                )
+                # API limitée: on abandonne les plus vieux commentaires plutôt que d'accumuler du retard
+                if openai_scheduler.is_limited():
+                    reply_pipeline.shed(settings.current.REPLY_SHED_KEEP)
+                poll_latency = time.time() - polled_at
+                metric_comments_poll.observe(poll_latency)
+                metric_comments_read.inc(len(comments))
+                if comments:
+                    event_log.emit("comments", latency=poll_latency, count=len(comments))
                 for com in comments:
                     content = com.get("content", "").strip()
-                    user = com.get("user", "").strip() or "viewer"
-                    if not content or content in seen_last:
+                    user = com.get("user", "").strip() or ANONYMOUS_VIEWER
+                    if not content or not seen_comments.add(comment_key(com)):
                         continue
-                    seen_last.append(content)
-                    history = dialog_by_user.get(user, [])
-                    reply = chatgpt_generate_reply(content, previous_dialog=history)
-                    if reply:
-                        send_message_to_tiktok(reply)
-                        history.append({"user": content, "assistant": reply})
-                        dialog_by_user[user] = history[-10:]
-                        time.sleep(random.uniform(CHATGPT_MIN_INTERVAL, CHATGPT_MAX_INTERVAL))
+                    # Heure d'apparition in-page (mode observer) sinon heure de lecture
+                    seen_at = com["ts"] / 1000.0 if com.get("ts") else time.time()
+                    metric_comments_new.inc()
+                    if comment_recorder is not None:
+                        comment_recorder.comment(user, content, seen_at)
+                    reply_pipeline.submit({"user": user, "content": content, "seen_at": seen_at})
             time.sleep(2)
         except Exception as e:
             set_status(f"⚠️ Erreur live_reply_loop: {e}")
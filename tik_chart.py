@@ -0,0 +1,80 @@
+"""
+Graphe matplotlib temps réel mis à jour par blitting.
+
+Les lignes sont créées une seule fois (animated=True) et modifiées en place
+avec set_data(). À chaque rafraîchissement, on restaure le fond mémorisé
+(axes, légende, graduations), on redessine uniquement les lignes et on
+blitte la zone du graphe. Le rendu complet (draw_idle) n'a lieu que si
+l'échelle change : plafond Y « rond » avec hystérésis, ou nouvelle fenêtre.
+"""
+
+import math
+import time
+
+
+def nice_ceiling(value):
+    """Plus petite valeur 1, 2 ou 5 × 10^n supérieure ou égale à `value`."""
+    if value <= 0:
+        return 0
+    exponent = 10 ** math.floor(math.log10(value))
+    for mantissa in (1, 2, 5, 10):
+        if value <= mantissa * exponent:
+            return mantissa * exponent
+
+
+class LiveLineChart:
+    def __init__(self, canvas, ax, series, styles, window=30, max_points=300, min_ymax=100, columns=None):
+        self.canvas = canvas
+        self.ax = ax
+        self.series = series
+        # Colonnes de la série tracées (une par style) ; par défaut les premières
+        self.columns = [series.names.index(c) for c in columns] if columns else list(range(len(styles)))
+        self.window = window
+        self.max_points = max_points
+        self.min_ymax = min_ymax
+        self.full_draws = 0
+        self.blits = 0
+        self._ymax = min_ymax
+        self._background = None
+        self.lines = [ax.plot([], [], animated=True, **style)[0] for style in styles]
+        ax.set_xlim(-window, 0)
+        ax.set_ylim(0, min_ymax)
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # Rendu complet (échelle, redimensionnement) : nouveau fond, puis les lignes par-dessus
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_lines()
+        self.full_draws += 1
+
+    def _draw_lines(self):
+        for line in self.lines:
+            self.ax.draw_artist(line)
+
+    def set_window(self, seconds):
+        self.window = seconds
+        self.ax.set_xlim(-seconds, 0)
+        self.refresh(force_draw=True)
+
+    def refresh(self, now=None, force_draw=False):
+        now = time.time() if now is None else now
+        t, values = self.series.window(self.window, self.max_points, now)
+        x = t - now
+        values = values[:, self.columns]
+        for i, line in enumerate(self.lines):
+            line.set_data(x, values[:, i])
+        peak = float(values.max()) if len(values) else 0.0
+        target = max(self.min_ymax, nice_ceiling(peak))
+        # Agrandit dès que ça déborde, ne réduit que si le pic est nettement plus bas
+        if target > self._ymax or target * 4 <= self._ymax:
+            self._ymax = target
+            self.ax.set_ylim(0, target)
+            force_draw = True
+        if force_draw or self._background is None:
+            self._background = None
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_lines()
+        self.canvas.blit(self.ax.bbox)
+        self.blits += 1
@@ -0,0 +1,185 @@
+"""
+Capture et dédoublonnage des commentaires du live.
+
+Mode "observer" : un MutationObserver injecté dans la page pousse chaque
+nouveau commentaire dans un buffer circulaire côté navigateur. Python le vide
+avec un seul execute_script par tick, quel que soit le nombre de nœuds du chat.
+
+SeenComments : ensemble des commentaires déjà traités, indexé par une identité
+stable (user + texte + nœud), avec éviction par âge et par nombre.
+"""
+
+import time
+from collections import OrderedDict
+
+# Sélecteurs identiques à ceux de tik_backend.get_live_comments
+CHAT_NODE_SELECTOR = "[data-e2e*='chat'], .comment-item, [class*='comment']"
+
+# Installe (si besoin) l'observer puis vide le buffer à partir du curseur.
+# arguments[0] = curseur, arguments[1] = id de session connu, arguments[2] = taille du buffer
+_DRAIN_JS = r"""
+const cursor = arguments[0] || 0;
+const knownId = arguments[1];
+const size = arguments[2] || 500;
+const SELECTOR = arguments[3];
+
+function readNode(node) {
+    const text = (node.innerText || node.textContent || "").trim();
+    if (!text || text.length >= 300) return null;
+    let user = "";
+    const owner = node.querySelector("[data-e2e*='owner'], [data-e2e*='nickname'], [data-e2e*='name']");
+    if (owner) user = (owner.innerText || owner.textContent || "").trim();
+    let content = text;
+    if (user && content.startsWith(user)) content = content.slice(user.length).replace(/^[\s:]+/, "");
+    return {user: user, content: content || text};
+}
+
+function push(state, node) {
+    if (node.__tikSeq) return;  // déjà capturé (ré-attachement de l'observer)
+    const item = readNode(node);
+    if (!item) return;
+    state.seq += 1;
+    item.seq = state.seq;
+    item.ts = Date.now();
+    state.buf[state.seq % state.size] = item;
+    node.__tikSeq = state.seq;
+}
+
+function scanAdded(state, node) {
+    if (node.nodeType !== 1) return;
+    if (node.matches(SELECTOR)) { push(state, node); return; }
+    node.querySelectorAll(SELECTOR).forEach(n => push(state, n));
+}
+
+function findContainer() {
+    const first = document.querySelector(SELECTOR);
+    return (first && first.parentElement) || document.body;
+}
+
+function attach(state) {
+    if (state.observer) state.observer.disconnect();
+    state.container = findContainer();
+    state.observer = new MutationObserver(muts => {
+        for (const m of muts) m.addedNodes.forEach(n => scanAdded(state, n));
+    });
+    state.observer.observe(state.container, {childList: true, subtree: true});
+    // Les commentaires déjà affichés sont capturés une fois à l'installation
+    state.container.querySelectorAll(SELECTOR).forEach(n => push(state, n));
+}
+
+let state = window.__tikCapture;
+if (!state) {
+    state = window.__tikCapture = {
+        id: Math.random().toString(36).slice(2),
+        seq: 0, size: size, buf: new Array(size), observer: null, container: null
+    };
+    attach(state);
+} else if (!state.container || !state.container.isConnected) {
+    attach(state);
+}
+
+let from = (state.id === knownId) ? cursor : 0;
+let dropped = 0;
+if (state.seq - from > state.size) {
+    dropped = state.seq - from - state.size;
+    from = state.seq - state.size;
+}
+const items = [];
+for (let s = from + 1; s <= state.seq; s++) items.push(state.buf[s % state.size]);
+return {id: state.id, cursor: state.seq, items: items, dropped: dropped};
+"""
+
+
+class CommentCapture:
+    """Lecteur du buffer in-page alimenté par le MutationObserver."""
+
+    def __init__(self, buffer_size=500):
+        self.buffer_size = buffer_size
+        self.session_id = None
+        self.cursor = 0
+        self.dropped = 0
+
+    def poll(self, driver):
+        """Retourne les commentaires arrivés depuis le dernier appel (un seul aller-retour WebDriver)."""
+        res = driver.execute_script(
+            _DRAIN_JS, self.cursor, self.session_id, self.buffer_size, CHAT_NODE_SELECTOR
+        )
+        if not res:
+            return []
+        # Page rechargée : nouvel observer, le curseur repart de zéro côté navigateur
+        self.session_id = res.get("id")
+        self.cursor = res.get("cursor", 0)
+        self.dropped += res.get("dropped", 0)
+        return [
+            {"user": it.get("user", ""), "content": it.get("content", ""), "seq": it.get("seq"), "ts": it.get("ts")}
+            for it in res.get("items", []) if it
+        ]
+
+
+def comment_key(com):
+    """Identité stable d'un commentaire: hash de (user, texte, nœud).
+
+    Le nœud est le numéro de séquence in-page (mode observer) ou la référence
+    WebDriver de l'élément (mode scan), identique d'un scan à l'autre tant que
+    le nœud reste dans le DOM. Limite commune aux deux modes: après un
+    rechargement de la page, les commentaires réaffichés ont une nouvelle identité.
+    """
+    return hash((com.get("user", ""), com.get("content", ""), com.get("seq") or com.get("node")))
+
+
+class SeenComments:
+    """Ensemble des commentaires déjà vus, lookup/insert en O(1).
+
+    Les entrées sont gardées dans l'ordre d'insertion, ce qui permet d'évincer
+    par le début à la fois par âge (ttl secondes) et par nombre (max_size).
+    """
+
+    def __init__(self, max_size=5000, ttl=600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _evict(self, now):
+        entries = self._entries
+        limit = now - self.ttl
+        while entries:
+            key, ts = next(iter(entries.items()))
+            if ts >= limit and len(entries) < self.max_size:
+                break
+            entries.popitem(last=False)
+            self.evicted += 1
+
+    def add(self, key, now=None):
+        """Retourne True si le commentaire est nouveau (et l'enregistre), False s'il est déjà vu."""
+        now = time.time() if now is None else now
+        self._evict(now)
+        if key in self._entries:
+            # Toujours visible: l'entrée est rafraîchie pour ne pas expirer pendant qu'il reste affiché
+            self.hits += 1
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            return False
+        self.misses += 1
+        self._entries[key] = now
+        return True
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
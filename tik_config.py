@@ -0,0 +1,122 @@
+"""
+Persistance différée et atomique de config.json.
+
+Les modifications (cases à cocher, messages, modèle...) appellent schedule() ;
+un thread d'arrière-plan attend `delay` secondes sans nouvelle modification
+(au plus `max_delay` après la première) puis écrit une seule fois :
+fichier temporaire dans le même dossier + fsync + os.replace, donc jamais de
+config.json tronqué. Les écritures sont sérialisées par un verrou ; flush()
+force l'écriture immédiate (arrêt du programme).
+"""
+
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+
+def atomic_write_json(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crée le fichier en 0600 : garder les droits du fichier remplacé
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigWriter:
+    """Écriture en arrière-plan, regroupée, de build() vers path."""
+
+    def __init__(self, path, build, delay=0.5, max_delay=5.0, on_written=None, on_error=None):
+        self.path = path
+        self.build = build
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_written = on_written
+        self.on_error = on_error
+        self.requested = 0
+        self.writes = 0
+        self.last_write_ms = 0.0
+        self.last_error = None
+        self._dirty_since = None
+        self._due = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def schedule(self):
+        """Signale une modification ; l'écriture suivra après `delay` secondes de calme."""
+        now = time.time()
+        with self._cond:
+            self.requested += 1
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._due = min(now + self.delay, self._dirty_since + self.max_delay)
+            self._cond.notify()
+        if self._thread is None:
+            self.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._due is None or time.time() < self._due:
+                    self._cond.wait(None if self._due is None else max(0.0, self._due - time.time()))
+            self.flush()
+
+    def flush(self):
+        """Écrit maintenant si des modifications sont en attente. Retourne True si écrit."""
+        with self._write_lock:
+            with self._cond:
+                if self._dirty_since is None:
+                    return False
+                self._dirty_since = None
+                self._due = None
+            started = time.time()
+            try:
+                # build() est appelé au moment de l'écriture: il voit toutes les modifications regroupées
+                atomic_write_json(self.path, self.build())
+            except Exception as e:
+                self.last_error = str(e)
+                with self._cond:
+                    # Nouvel essai plus tard plutôt que perdre les modifications
+                    if self._dirty_since is None:
+                        self._dirty_since = time.time()
+                    self._due = time.time() + self.max_delay
+                    self._cond.notify()
+                if self.on_error:
+                    self.on_error(e)
+                return False
+            self.writes += 1
+            self.last_write_ms = round((time.time() - started) * 1000, 1)
+            self.last_error = None
+            if self.on_written:
+                self.on_written()
+            return True
+
+    def stats(self):
+        return {
+            "requested": self.requested,
+            "writes": self.writes,
+            "pending": self._dirty_since is not None,
+            "last_write_ms": self.last_write_ms,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,132 @@
+"""
+Exécuteur unique des commandes WebDriver.
+
+Un seul thread parle à chromedriver ; les boucles lui soumettent des
+commandes (fonctions qui reçoivent le driver) dans une file à priorités :
+messages sortants, puis navigation, état du live, lecture des commentaires
+et enfin likes. Chaque commande a un timeout et des statistiques par type
+(attente en file, temps d'exécution, erreurs, timeouts).
+"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as CommandTimeout
+
+from tik_stats import LatencyStats
+
+PRIORITY_MESSAGE = 0
+PRIORITY_NAVIGATION = 1
+PRIORITY_LIVE_STATE = 2
+PRIORITY_COMMENTS = 3
+PRIORITY_LIKE = 4
+
+# Timeout par défaut (secondes) selon le type de commande
+DEFAULT_TIMEOUTS = {
+    PRIORITY_MESSAGE: 30,
+    PRIORITY_NAVIGATION: 30,
+    PRIORITY_LIVE_STATE: 10,
+    PRIORITY_COMMENTS: 10,
+    PRIORITY_LIKE: 5,
+}
+
+
+class _KindStats:
+    def __init__(self):
+        self.queue_wait = LatencyStats()
+        self.exec_time = LatencyStats()
+        self.errors = 0
+        self.timeouts = 0
+
+    def summary(self):
+        return {
+            "queue_wait": self.queue_wait.summary(),
+            "exec": self.exec_time.summary(),
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+        }
+
+
+class DriverExecutor:
+    """Propriétaire unique du driver Selenium."""
+
+    def __init__(self, get_driver, on_command=None):
+        self.get_driver = get_driver
+        # on_command(kind, queue_wait, exec_time, failed): export des métriques
+        self.on_command = on_command
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.busy_seconds = 0.0
+        self.started = time.time()
+
+    def _kind_stats(self, kind):
+        with self._lock:
+            stats = self._stats.get(kind)
+            if stats is None:
+                stats = self._stats[kind] = _KindStats()
+            return stats
+
+    def submit(self, fn, priority=PRIORITY_LIKE, kind="command", timeout=None):
+        """Met fn(driver) en file ; retourne un Future."""
+        timeout = DEFAULT_TIMEOUTS.get(priority, 10) if timeout is None else timeout
+        future = Future()
+        now = time.time()
+        self._queue.put((priority, next(self._seq), now, now + timeout, kind, fn, future))
+        return future
+
+    def run(self, fn, priority=PRIORITY_LIKE, kind="command", timeout=None):
+        """Exécute fn(driver) sur le thread propriétaire et attend le résultat.
+
+        Lève concurrent.futures.TimeoutError si la commande n'a pas abouti à temps.
+        """
+        timeout = DEFAULT_TIMEOUTS.get(priority, 10) if timeout is None else timeout
+        future = self.submit(fn, priority, kind, timeout)
+        try:
+            return future.result(timeout=timeout)
+        except CommandTimeout:
+            future.cancel()
+            self._kind_stats(kind).timeouts += 1
+            raise
+
+    def serve_forever(self):
+        while True:
+            priority, _, queued_at, deadline, kind, fn, future = self._queue.get()
+            stats = self._kind_stats(kind)
+            started = time.time()
+            stats.queue_wait.record(started - queued_at)
+            # Commande abandonnée par l'appelant ou périmée: inutile de l'exécuter
+            if not future.set_running_or_notify_cancel():
+                continue
+            if started > deadline:
+                stats.timeouts += 1
+                future.set_exception(CommandTimeout(f"{kind}: expirée après {started - queued_at:.1f}s en file"))
+                continue
+            failed = False
+            try:
+                future.set_result(fn(self.get_driver()))
+            except Exception as e:
+                failed = True
+                stats.errors += 1
+                future.set_exception(e)
+            elapsed = time.time() - started
+            stats.exec_time.record(elapsed)
+            self.busy_seconds += elapsed
+            if self.on_command is not None:
+                self.on_command(kind, started - queued_at, elapsed, failed)
+
+    def pending(self):
+        """Nombre de commandes en attente d'exécution."""
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            kinds = {kind: s.summary() for kind, s in self._stats.items()}
+        uptime = max(1e-9, time.time() - self.started)
+        return {
+            "pending": self.pending(),
+            "utilization": round(self.busy_seconds / uptime, 3),
+            "kinds": kinds,
+        }
@@ -0,0 +1,192 @@
+"""
+Journal d'événements structuré (JSONL) écrit en arrière-plan.
+
+emit() ne fait qu'ajouter un dict à une deque (append atomique, sans verrou ni
+I/O) : les boucles chaudes comme auto_like ne bloquent jamais sur le disque.
+Un thread vide la deque par lots toutes les `flush_interval` secondes vers
+logs/session-AAAAMMJJ-HHMMSS.jsonl, avec rotation par taille et par âge et
+conservation des `backups` derniers fichiers. Les événements "status" peuvent
+aussi être recopiés sur la console, une écriture par lot.
+
+Résumé d'une session : python -m tik_eventlog logs/session-....jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from tik_stats import percentile
+
+
+class EventLog:
+    def __init__(self, directory, max_bytes=5 * 1024 * 1024, rotate_seconds=3600, backups=20,
+                 flush_interval=1.0, max_pending=100000, console=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.console = console
+        self.written = 0
+        self.files = 0
+        self.last_error = None
+        self._pending = deque(maxlen=max_pending)
+        self._file = None
+        self._file_path = None
+        self._file_opened = 0.0
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def emit(self, kind, **fields):
+        fields["ts"] = time.time()
+        fields["kind"] = kind
+        self._pending.append(fields)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                self.last_error = str(e)
+
+    def _open(self, now):
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        name = time.strftime("session-%Y%m%d-%H%M%S", time.localtime(now))
+        path = os.path.join(self.directory, name + ".jsonl")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{name}-{suffix}.jsonl")
+            suffix += 1
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_path = path
+        self._file_opened = now
+        self.files += 1
+        self._prune()
+
+    def _prune(self):
+        paths = [os.path.join(self.directory, f) for f in os.listdir(self.directory)
+                 if f.startswith("session-") and f.endswith(".jsonl")]
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:-self.backups] if self.backups else []:
+            if path != self._file_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def flush(self):
+        """Écrit les événements en attente ; retourne leur nombre."""
+        batch = []
+        pending = self._pending
+        while pending:
+            try:
+                batch.append(pending.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return 0
+        if self.console:
+            lines = [f"{ev['text']}\n" for ev in batch if ev["kind"] == "status"]
+            if lines:
+                sys.stdout.write("".join(lines))
+                sys.stdout.flush()
+        data = "".join(json.dumps(ev, ensure_ascii=False, default=str) + "\n" for ev in batch)
+        with self._write_lock:
+            now = time.time()
+            if self._file is None or now - self._file_opened >= self.rotate_seconds or \
+                    self._file.tell() >= self.max_bytes:
+                self._open(now)
+            self._file.write(data)
+            self._file.flush()
+        self.written += len(batch)
+        return len(batch)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "file": self._file_path,
+            "files": self.files,
+            "last_error": self.last_error,
+        }
+
+
+# ---------- Lecture ----------
+
+def read_events(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # dernière ligne tronquée (arrêt brutal)
+
+
+def summarize(paths):
+    """Compte par type, durée couverte et latences (champ latency, secondes) par type."""
+    counts, latencies = {}, {}
+    first = last = None
+    for path in paths:
+        for ev in read_events(path):
+            kind = ev.get("kind", "?")
+            counts[kind] = counts.get(kind, 0) + 1
+            ts = ev.get("ts")
+            if ts is not None:
+                first = ts if first is None else min(first, ts)
+                last = ts if last is None else max(last, ts)
+            if isinstance(ev.get("latency"), (int, float)):
+                latencies.setdefault(kind, []).append(ev["latency"])
+    return {
+        "events": sum(counts.values()),
+        "start": first,
+        "duration_s": round(last - first, 1) if first is not None else 0.0,
+        "counts": dict(sorted(counts.items(), key=lambda kv: -kv[1])),
+        "latency": {
+            kind: {
+                "count": len(values),
+                "p50_ms": round(percentile(sorted(values), 50) * 1000, 1),
+                "p95_ms": round(percentile(sorted(values), 95) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1),
+            }
+            for kind, values in latencies.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résumé d'un ou plusieurs journaux de session JSONL")
+    parser.add_argument("paths", nargs="+", help="fichiers logs/session-*.jsonl")
+    parser.add_argument("--json", action="store_true", help="sortie JSON brute")
+    args = parser.parse_args()
+    summary = summarize(args.paths)
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+    start = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(summary["start"])) if summary["start"] else "-"
+    print(f"Session du {start} — {summary['duration_s']}s, {summary['events']} événements")
+    for kind, n in summary["counts"].items():
+        print(f"  {kind:<20}{n:>8}")
+    if summary["latency"]:
+        print("Latences (p50 / p95 / max, ms) :")
+        for kind, lat in summary["latency"].items():
+            print(f"  {kind:<20}{lat['p50_ms']:>8} {lat['p95_ms']:>8} {lat['max_ms']:>8}  (n={lat['count']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,36 +5,39 @@ import subprocess
 import requests
 import threading
 import tik_backend
-from flask import render_template_string, request
-from PyQt6.QtCore import Qt, QTimer
+from flask import Response, request
+from PyQt6.QtCore import Qt, QTimer, QObject, pyqtSignal, QAbstractListModel, QModelIndex, QSortFilterProxyModel
 from PyQt6.QtGui import QPalette, QColor
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QTabWidget, QLabel,
     QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QCheckBox,
-    QListWidget, QMessageBox, QFrame, QDialog
+    QListView, QMessageBox, QFrame, QDialog, QComboBox, QFileDialog
 )
 import matplotlib
 matplotlib.use("QtAgg")
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from tik_chart import LiveLineChart
 
 # Importer les fonctions et variables pour un accès direct
 from tik_backend import (
     # Fonctions
     save_config_to_json,
     set_status,
+    notify_messages_changed,
     send_email_alert,
     get_human_delay,
     try_action,
-    get_bandwidth,
     check_auth,
     authenticate,
     requires_auth,
+    set_running,
     toggle_running,
     auto_like,
     auto_message_loop,
     launch_driver,
     refresh_live_loop,
+    live_state_loop,
     send_message_to_tiktok,
     chatgpt_generate_reply,
     get_live_comments,
@@ -43,7 +46,6 @@ from tik_backend import (
     AUTO_MESSAGES,
     CHATGPT_MAX_INTERVAL,
     CHATGPT_MIN_INTERVAL,
-    CHATGPT_MODEL,
     CHATGPT_SYSTEM_PROMPT,
     CLEAR_INTERVAL,
     CLICK_INTERVAL_MAX,
@@ -53,8 +55,6 @@ from tik_backend import (
     EMAIL_PASSWORD_TIKTOK,
     EMAIL_RECEIVER,
     EMAIL_SENDER,
-    ENABLE_AUTO_CHATGPT,
-    ENABLE_AUTO_MESSAGES,
     HUMAN_DELAYS,
     HUMAN_PAUSE_FREQ_MAX,
     HUMAN_PAUSE_FREQ_MIN,
@@ -65,19 +65,18 @@ from tik_backend import (
     REFRESH_INTERVAL,
     USERNAME,
     WINDOW_SIZE,
-    # Variables d'état
-    likes_sent,
-    bot_start_time,
-    next_pause_time,
-    status_message,
+    # État d'exécution (toujours lire via state.get / state.snapshot)
+    state,
+    events,
     client,
-    running,
-    bandwidth_data,
     app
 )
 
 # ============== PyQt6 UI ==============
 
+# Fenêtres du graphe bande passante (libellé, secondes) ; au plus 300 points tracés quelle que soit la durée
+BANDWIDTH_WINDOWS = (("30 s", 30), ("10 min", 600), ("1 h", 3600), ("6 h", 6 * 3600), ("24 h", 24 * 3600))
+
 class CharLimitDialog(QDialog):
     def __init__(self, parent=None, max_chars=100, initial_text=""):
         super().__init__(parent)
@@ -133,6 +132,69 @@ class CharLimitDialog(QDialog):
     def get_text(self):
         return self.text_input.text()
 
+class StateBridge(QObject):
+    """Relaie les événements du bus (threads du bot) vers le thread Qt."""
+    changed = pyqtSignal(str, object)
+
+class MessageListModel(QAbstractListModel):
+    """
+    Copie de la bibliothèque d'auto-messages tenue à jour ligne par ligne à
+    partir des événements "messages" du bus (insert/update/remove/reset) :
+    la vue ne redessine que les lignes concernées, même avec des milliers de messages.
+    """
+    changed = pyqtSignal(object)
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        # Signal Qt: les événements venant du thread Flask sont appliqués dans le thread UI
+        self.changed.connect(self.apply)
+        events.subscribe("messages", self.changed.emit)
+        self._version, self._items = library.snapshot_with_version()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        msg = self._items[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            display = msg[:60] + "..." if len(msg) > 60 else msg
+            return f"{index.row() + 1}. {display}"
+        if role in (Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.UserRole):
+            return msg
+        return None
+
+    def _renumber(self, first):
+        # Les numéros affichés des lignes suivantes changent après insertion/suppression
+        if first < len(self._items):
+            self.dataChanged.emit(self.index(first), self.index(len(self._items) - 1),
+                                  [Qt.ItemDataRole.DisplayRole])
+
+    def apply(self, event):
+        if event["version"] <= self._version:
+            return  # déjà inclus dans la copie initiale
+        self._version = event["version"]
+        op, index = event["op"], event.get("index")
+        if op == "insert":
+            texts = event["texts"]
+            self.beginInsertRows(QModelIndex(), index, index + len(texts) - 1)
+            self._items[index:index] = texts
+            self.endInsertRows()
+            self._renumber(index + len(texts))
+        elif op == "update":
+            self._items[index] = event["texts"][0]
+            self.dataChanged.emit(self.index(index), self.index(index))
+        elif op == "remove":
+            self.beginRemoveRows(QModelIndex(), index, index + event["count"] - 1)
+            del self._items[index:index + event["count"]]
+            self.endRemoveRows()
+            self._renumber(index)
+        elif op == "reset":
+            self.beginResetModel()
+            self._items = list(event["texts"])
+            self.endResetModel()
+
 class BotWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -178,7 +240,14 @@ class BotWindow(QMainWindow):
         self.tabs.addTab(self.tab_messages, "💬 Messages")
         self._build_messages_tab()
 
-        # Timer UI
+        # État: mis à jour par événements (signal Qt => exécuté dans le thread UI)
+        self.state_bridge = StateBridge(self)
+        self.state_bridge.changed.connect(self.on_state_changed)
+        events.subscribe("state", lambda ev: self.state_bridge.changed.emit(ev["key"], ev["value"]))
+        for key, value in state.snapshot()[1].items():
+            self.on_state_changed(key, value)
+
+        # Timer UI (valeurs dérivées du temps: uptime, compte à rebours, graphes)
         self.ui_timer = QTimer(self)
         self.ui_timer.timeout.connect(self.update_stats_ui)
         self.ui_timer.start(1000)
@@ -208,8 +277,6 @@ class BotWindow(QMainWindow):
         return v
 
     def _build_control_tab(self):
-        global ENABLE_AUTO_MESSAGES, ENABLE_AUTO_CHATGPT, CHATGPT_MODEL
-
         base = QVBoxLayout(self.tab_control)
         base.setContentsMargins(16, 16, 16, 16)
         base.setSpacing(14)
@@ -248,17 +315,17 @@ class BotWindow(QMainWindow):
         # Carte: Automations & IA
         card_toggles = self._card(base, "Automations & IA")
         self.chk_auto = QCheckBox("Activer l’envoi automatique de messages (liste)")
-        self.chk_auto.setChecked(ENABLE_AUTO_MESSAGES)
+        self.chk_auto.setChecked(state.get("ENABLE_AUTO_MESSAGES"))
         self.chk_auto.stateChanged.connect(self.on_toggle_auto_messages)
         card_toggles.addWidget(self.chk_auto)
 
         self.chk_ai = QCheckBox("Activer réponses IA (ChatGPT) aux commentaires")
-        self.chk_ai.setChecked(ENABLE_AUTO_CHATGPT)
+        self.chk_ai.setChecked(state.get("ENABLE_AUTO_CHATGPT"))
         self.chk_ai.stateChanged.connect(self.on_toggle_ai)
         card_toggles.addWidget(self.chk_ai)
 
         row_ai = QHBoxLayout()
-        self.model_edit = QLineEdit(CHATGPT_MODEL)
+        self.model_edit = QLineEdit(state.get("CHATGPT_MODEL"))
         self.model_edit.setPlaceholderText("Modèle ChatGPT (ex: gpt-5-nano, gpt-4o-mini)")
         btn_set_model = QPushButton("💾 Enregistrer modèle")
         btn_set_model.setObjectName("ghostButton")
@@ -286,24 +353,59 @@ class BotWindow(QMainWindow):
         self.lbl_uptime = QLabel("Temps de fonctionnement : 0s")
         self.lbl_next_pause = QLabel("Prochaine pause : -")
         self.lbl_status = QLabel("Status: En attente...")
-        for lab in [self.lbl_likes, self.lbl_uptime, self.lbl_next_pause, self.lbl_status]:
+        self.lbl_pipeline = QLabel("Pipeline IA : -")
+        self.lbl_cache = QLabel("Cache réponses : -")
+        self.lbl_latency = QLabel("Latence IA : -")
+        self.lbl_memory = QLabel("Mémoire conversations : -")
+        self.lbl_resources = QLabel("Ressources : -")
+        for lab in [self.lbl_likes, self.lbl_uptime, self.lbl_next_pause, self.lbl_status,
+                    self.lbl_pipeline, self.lbl_cache, self.lbl_latency, self.lbl_memory, self.lbl_resources]:
             lab.setObjectName("statLine")
             grid.addWidget(lab)
         card_stats.addLayout(grid)
 
-        # Graphe bande passante harmonisé au thème
+        # Graphe bande passante harmonisé au thème: décor construit une fois, lignes blittées
+        row_window = QHBoxLayout()
+        row_window.addWidget(QLabel("Fenêtre du graphe :"))
+        self.combo_window = QComboBox()
+        for label, seconds in BANDWIDTH_WINDOWS:
+            self.combo_window.addItem(label, seconds)
+        self.combo_window.currentIndexChanged.connect(
+            lambda _: self.bandwidth_chart.set_window(self.combo_window.currentData())
+        )
+        row_window.addWidget(self.combo_window)
+        row_window.addStretch(1)
+        card_stats.addLayout(row_window)
         self.fig = Figure(figsize=(6.6, 1.8), dpi=100)
         self.ax = self.fig.add_subplot(111)
-        self.ax.set_ylim(0, 100)
-        self.ax.set_title("Upload / Download (KB/s)", fontsize=9, color="#eaeaea")
+        self.ax.set_title("Upload / Download (Kio/s)", fontsize=9, color="#eaeaea")
         self.ax.set_facecolor("#1b1b1f")
         self.ax.get_xaxis().set_visible(False)
         for spine in self.ax.spines.values():
             spine.set_color("#2a2a2a")
         self.ax.tick_params(colors="#b7b7b7")
         self.canvas = FigureCanvasQTAgg(self.fig)
+        # Historique tenu par le thread de télémétrie: l'UI ne fait que lire
+        self.bandwidth_chart = LiveLineChart(self.canvas, self.ax, tik_backend.telemetry.series, [
+            {"label": "up", "color": "#00f2ea", "linewidth": 1.5},
+            {"label": "down", "color": "#9f9f9f", "linewidth": 1.2, "linestyle": "--"},
+        ], window=BANDWIDTH_WINDOWS[0][1], columns=("net_up_kib_s", "net_down_kib_s"))
+        self.ax.legend(loc="upper right", fontsize=7, facecolor="#1b1b1f", edgecolor="#2a2a2a")
         card_stats.addWidget(self.canvas)
 
+        # Carte: Diagnostic (profileur par échantillonnage)
+        card_diag = self._card(base, "Diagnostic")
+        row_diag = QHBoxLayout()
+        self.btn_profiler = QPushButton("🔬 Démarrer profilage")
+        self.btn_profiler.setObjectName("ghostButton")
+        self.btn_profiler.clicked.connect(self.on_toggle_profiler)
+        btn_threads = QPushButton("🧵 Dump des threads")
+        btn_threads.setObjectName("ghostButton")
+        btn_threads.clicked.connect(lambda: tik_backend.export_thread_dump())
+        row_diag.addWidget(self.btn_profiler)
+        row_diag.addWidget(btn_threads)
+        card_diag.addLayout(row_diag)
+
     def _build_messages_tab(self):
         global AUTO_MESSAGES
         base = QVBoxLayout(self.tab_messages)
@@ -318,11 +420,21 @@ class BotWindow(QMainWindow):
         self.lbl_count.setObjectName("badge")
         card_info.addWidget(self.lbl_count)
 
-        # Carte: liste + actions
+        # Carte: liste + actions (modèle mis à jour ligne par ligne, filtre côté Qt)
         card_list = self._card(base, "Messages")
-        self.list_messages = QListWidget()
+        self.messages_model = MessageListModel(AUTO_MESSAGES, self)
+        self.messages_proxy = QSortFilterProxyModel(self)
+        self.messages_proxy.setSourceModel(self.messages_model)
+        self.messages_proxy.setFilterRole(Qt.ItemDataRole.UserRole)
+        self.messages_proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.input_filter = QLineEdit()
+        self.input_filter.setPlaceholderText("🔍 Filtrer les messages...")
+        self.input_filter.textChanged.connect(self.messages_proxy.setFilterFixedString)
+        card_list.addWidget(self.input_filter)
+        self.list_messages = QListView()
+        self.list_messages.setUniformItemSizes(True)
+        self.list_messages.setModel(self.messages_proxy)
         card_list.addWidget(self.list_messages)
-        self.refresh_messages_list()
 
         row = QHBoxLayout()
         btn_add = QPushButton("➕ Ajouter")
@@ -331,17 +443,32 @@ class BotWindow(QMainWindow):
         btn_edit.setObjectName("ghostButton")
         btn_del = QPushButton("🗑️ Supprimer")
         btn_del.setObjectName("dangerButton")
+        btn_import = QPushButton("📥 Importer")
+        btn_import.setObjectName("ghostButton")
         btn_clear = QPushButton("🧹 Tout effacer")
         btn_clear.setObjectName("ghostButton")
         btn_add.clicked.connect(self.add_message)
         btn_edit.clicked.connect(self.edit_message)
         btn_del.clicked.connect(self.delete_message)
+        btn_import.clicked.connect(self.import_messages)
         btn_clear.clicked.connect(self.clear_all_messages)
-        for b in (btn_add, btn_edit, btn_del, btn_clear):
+        for b in (btn_add, btn_edit, btn_del, btn_import, btn_clear):
             row.addWidget(b)
         card_list.addLayout(row)
 
     # ---- Contrôle ----
+    def on_toggle_profiler(self):
+        if tik_backend.profiler.is_running():
+            tik_backend.stop_profiler()
+        else:
+            tik_backend.start_profiler()
+        self.update_profiler_button()
+
+    def update_profiler_button(self):
+        # Le profileur peut aussi être piloté depuis le panel web
+        running = tik_backend.profiler.is_running()
+        self.btn_profiler.setText("⏹️ Arrêter et exporter le profil" if running else "🔬 Démarrer profilage")
+
     def on_send_message(self):
         txt = self.msg_edit.text().strip()
         if txt:
@@ -349,48 +476,36 @@ class BotWindow(QMainWindow):
             self.msg_edit.clear()
 
     def set_running(self, val: bool):
-        global running, bot_start_time
-        tik_backend.running = val
-        if running and not bot_start_time:
-            bot_start_time = time.time()
-        set_status("▶️ Auto-like démarré" if running else "⏸️ Auto-like arrêté")
-
-    def on_toggle_auto_messages(self, state):
-        global ENABLE_AUTO_MESSAGES
-        tik_backend.ENABLE_AUTO_MESSAGES = (state == Qt.CheckState.Checked.value)
+        set_running(val)
+        set_status("▶️ Auto-like démarré" if val else "⏸️ Auto-like arrêté")
+
+    def on_toggle_auto_messages(self, check_state):
+        enabled = state.set("ENABLE_AUTO_MESSAGES", check_state == Qt.CheckState.Checked.value)
         save_config_to_json()
-        set_status(f"🔁 Auto-messages {'activés' if ENABLE_AUTO_MESSAGES else 'désactivés'} et sauvegardé")
+        set_status(f"🔁 Auto-messages {'activés' if enabled else 'désactivés'} et sauvegardé")
 
-    def on_toggle_ai(self, state):
-        global ENABLE_AUTO_CHATGPT, running
-        tik_backend.ENABLE_AUTO_CHATGPT = (state == Qt.CheckState.Checked.value)
+    def on_toggle_ai(self, check_state):
+        enabled = state.set("ENABLE_AUTO_CHATGPT", check_state == Qt.CheckState.Checked.value)
         save_config_to_json()
-        if ENABLE_AUTO_CHATGPT and not running:
+        if enabled and not state.get("running"):
             set_status("🧠 IA armée (en attente). Lance le bot pour activer les réponses IA.")
         else:
-            set_status(f"🧠 IA (ChatGPT) {'activée' if ENABLE_AUTO_CHATGPT else 'désactivée'} et sauvegardée")
+            set_status(f"🧠 IA (ChatGPT) {'activée' if enabled else 'désactivée'} et sauvegardée")
 
     def on_save_model(self):
-        global CHATGPT_MODEL
         model = self.model_edit.text().strip()
         if model:
-            tik_backend.CHATGPT_MODEL = model
+            state.set("CHATGPT_MODEL", model)
             save_config_to_json()
-            set_status(f"💾 Modèle ChatGPT sauvegardé: {CHATGPT_MODEL}")
+            set_status(f"💾 Modèle ChatGPT sauvegardé: {model}")
 
     # ---- Messages ----
-    def refresh_messages_list(self):
-        global AUTO_MESSAGES
-        self.list_messages.clear()
-        for i, msg in enumerate(AUTO_MESSAGES, 1):
-            display = msg[:60] + "..." if len(msg) > 60 else msg
-            self.list_messages.addItem(f"{i}. {display}")
-        if hasattr(self, "lbl_count") and self.lbl_count is not None:
-            self.lbl_count.setText(f"Messages configurés : {len(AUTO_MESSAGES)}")
+    def selected_message_row(self):
+        """Position dans la bibliothèque du message sélectionné (à travers le filtre), ou -1."""
+        index = self.list_messages.currentIndex()
+        return self.messages_proxy.mapToSource(index).row() if index.isValid() else -1
 
     def add_message(self):
-        global AUTO_MESSAGES
-        
         # Utiliser le dialogue personnalisé
         dialog = CharLimitDialog(self, max_chars=100)
         
@@ -403,22 +518,22 @@ class BotWindow(QMainWindow):
                 return
             
             if new_msg:
-                AUTO_MESSAGES.append(new_msg)
-                self.refresh_messages_list()
+                AUTO_MESSAGES.add(new_msg)
                 save_config_to_json()
+                notify_messages_changed()
                 set_status(f"✅ Message ajouté et sauvegardé : {new_msg[:30]}...")
             else:
                 QMessageBox.warning(self, "Validation", "Le message ne peut pas être vide.")
 
     def edit_message(self):
-        global AUTO_MESSAGES
-        current = self.list_messages.currentRow()
-        if current < 0 or current >= len(AUTO_MESSAGES):
+        current = self.selected_message_row()
+        if current < 0:
             QMessageBox.warning(self, "Sélection", "Veuillez sélectionner un message à modifier.")
             return
         
         # Utiliser le dialogue personnalisé avec le texte existant
-        dialog = CharLimitDialog(self, max_chars=100, initial_text=AUTO_MESSAGES[current])
+        current_text = self.messages_model.data(self.messages_model.index(current), Qt.ItemDataRole.UserRole)
+        dialog = CharLimitDialog(self, max_chars=100, initial_text=current_text)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_msg = dialog.get_text().strip()
@@ -429,90 +544,143 @@ class BotWindow(QMainWindow):
                 return
             
             if new_msg:
-                AUTO_MESSAGES[current] = new_msg
-                self.refresh_messages_list()
+                try:
+                    AUTO_MESSAGES.edit(current, new_msg)
+                except IndexError:
+                    QMessageBox.warning(self, "Sélection", "Ce message a été supprimé entre-temps.")
+                    return
                 save_config_to_json()
+                notify_messages_changed()
                 set_status("✅ Message modifié et sauvegardé")
             else:
                 QMessageBox.warning(self, "Validation", "Le message ne peut pas être vide.")
 
     def delete_message(self):
-        global AUTO_MESSAGES
-        current = self.list_messages.currentRow()
-        if current < 0 or current >= len(AUTO_MESSAGES):
+        current = self.selected_message_row()
+        if current < 0:
             QMessageBox.warning(self, "Sélection", "Veuillez sélectionner un message à supprimer.")
             return
         confirm = QMessageBox.question(self, "Confirmation", "Êtes-vous sûr de vouloir supprimer ce message ?")
         if confirm == QMessageBox.StandardButton.Yes:
-            del AUTO_MESSAGES[current]
-            self.refresh_messages_list()
+            try:
+                AUTO_MESSAGES.delete(current)
+            except IndexError:
+                return  # déjà supprimé (panel web)
             save_config_to_json()
+            notify_messages_changed()
             set_status("🗑️ Message supprimé et sauvegardé")
 
+    def import_messages(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Importer des messages", "", "Texte ou CSV (*.txt *.csv);;Tous les fichiers (*)"
+        )
+        if not path:
+            return
+        try:
+            with open(path, "rb") as f:
+                result = AUTO_MESSAGES.import_file(f.read(), path)
+        except OSError as e:
+            QMessageBox.warning(self, "Import", f"Lecture impossible : {e}")
+            return
+        if result["added"]:
+            save_config_to_json()
+            notify_messages_changed()
+        set_status(f"📥 Import : {result['added']} ajoutés, {result['duplicates']} doublons, "
+                   f"{result['invalid']} invalides (> {AUTO_MESSAGES.max_length} caractères)")
+
     def clear_all_messages(self):
-        global AUTO_MESSAGES
         confirm = QMessageBox.question(self, "Confirmation", "Êtes-vous sûr de vouloir supprimer TOUS les messages ?")
         if confirm == QMessageBox.StandardButton.Yes:
             AUTO_MESSAGES.clear()
-            self.refresh_messages_list()
             save_config_to_json()
+            notify_messages_changed()
             set_status("🗑️ Tous les messages supprimés et sauvegardés")
 
     # ---- UI refresh ----
+    def on_state_changed(self, key, value):
+        # Appelé dans le thread UI à chaque changement publié par le StateStore
+        if key == "likes_sent":
+            self.lbl_likes.setText(f"Likes envoyés : {value}")
+        elif key == "status_message":
+            self.lbl_status.setText(f"Status: {value}")
+        elif key == "ENABLE_AUTO_MESSAGES":
+            self.lbl_auto_status.setText(f"Auto-messages : {'ON' if value else 'OFF'}")
+            if self.chk_auto.isChecked() != bool(value):
+                self.chk_auto.blockSignals(True)
+                self.chk_auto.setChecked(bool(value))
+                self.chk_auto.blockSignals(False)
+        elif key == "message_count":
+            # La liste elle-même suit les événements "messages" (MessageListModel)
+            self.lbl_msg_count.setText(f"Messages configurés : {value}")
+            self.lbl_count.setText(f"Messages configurés : {value}")
+        if key in ("ENABLE_AUTO_CHATGPT", "running"):
+            # IA active uniquement si: toggle IA + bot lancé + client OpenAI initialisé
+            ai_active = state.get("ENABLE_AUTO_CHATGPT") and state.get("running") and (client is not None)
+            self.lbl_ai_status.setText(f"IA (ChatGPT) : {'ON' if ai_active else 'OFF'}")
+
     def update_stats_ui(self):
-        global likes_sent, bot_start_time, next_pause_time
-        global ENABLE_AUTO_MESSAGES, ENABLE_AUTO_CHATGPT, AUTO_MESSAGES
-        global status_message, client, running
+        global AUTO_MESSAGES
 
         # Uptime
         uptime = 0
+        bot_start_time = state.get("bot_start_time")
         if bot_start_time:
             uptime = int(time.time() - bot_start_time)
-        self.lbl_likes.setText(f"Likes envoyés : {likes_sent}")
         self.lbl_uptime.setText(f"Temps de fonctionnement : {uptime}s")
 
         # Prochaine pause
+        next_pause_time = state.get("next_pause_time")
         if next_pause_time:
             remaining = int(max(0, next_pause_time - time.time()))
             self.lbl_next_pause.setText(f"Prochaine pause : {remaining}s")
         else:
             self.lbl_next_pause.setText("Prochaine pause : -")
 
-        # Statuts
-        self.lbl_auto_status.setText(f"Auto-messages : {'ON' if ENABLE_AUTO_MESSAGES else 'OFF'}")
-
-        # IA active uniquement si: toggle IA + bot lancé + client OpenAI initialisé
-        ai_active = ENABLE_AUTO_CHATGPT and running and (client is not None)
-        self.lbl_ai_status.setText(f"IA (ChatGPT) : {'ON' if ai_active else 'OFF'}")
-
-        self.lbl_msg_count.setText(f"Messages configurés : {len(AUTO_MESSAGES)}")
-        self.lbl_status.setText(f"Status: {status_message}")
+        self.update_profiler_button()
+
+        # Pipeline IA: profondeur des files et latences
+        pipeline = tik_backend.reply_pipeline
+        if pipeline is not None:
+            snap = pipeline.snapshot()
+            gen = snap["stages"]["generation"]
+            e2e = snap["stages"]["end_to_end"]
+            self.lbl_pipeline.setText(
+                f"Pipeline IA : file {snap['ingest_depth']} · envoi {snap['send_depth']} · "
+                f"génération p95 {gen['p95_ms']:.0f} ms · bout-en-bout p95 {e2e['p95_ms']:.0f} ms · "
+                f"abandonnés {snap['dropped']}"
+            )
+            ttft = snap["stages"]["ttft"]
+            self.lbl_latency.setText(
+                f"Latence IA (p50/p95) : 1er token {ttft['p50_ms']:.0f}/{ttft['p95_ms']:.0f} ms · "
+                f"génération {gen['p50_ms']:.0f}/{gen['p95_ms']:.0f} ms · "
+                f"commentaire→envoi {e2e['p50_ms'] / 1000:.1f}/{e2e['p95_ms'] / 1000:.1f} s"
+            )
+
+        mem = tik_backend.conversation_memory.stats()
+        self.lbl_memory.setText(
+            f"Mémoire conversations : {mem['viewers']}/{mem['max_viewers']} viewers · "
+            f"{mem['turns']} échanges · {mem['resident_kb']:.0f} Ko"
+        )
 
-        # Bande passante
+        cache = tik_backend.reply_cache
+        if cache is not None:
+            cs = cache.stats()
+            self.lbl_cache.setText(
+                f"Cache réponses : {cs['hit_rate'] * 100:.0f}% hits ({cs['hits']}/{cs['hits'] + cs['misses']}) · "
+                f"{cs['saved_seconds']:.0f}s d'API économisées"
+            )
+
+        usage = tik_backend.telemetry.latest()
+        if usage is not None:
+            self.lbl_resources.setText(
+                f"Ressources : bot {usage['bot_cpu']:.0f}% / {usage['bot_rss_mb']:.0f} Mo · "
+                f"chromedriver {usage['driver_cpu']:.0f}% / {usage['driver_rss_mb']:.0f} Mo · "
+                f"Chrome {usage['chrome_cpu']:.0f}% / {usage['chrome_rss_mb']:.0f} Mo"
+            )
+
+        # Bande passante (échantillonnée par le thread de télémétrie)
         try:
-            up, down = get_bandwidth()
-            bandwidth_data["time"].append(time.time())
-            bandwidth_data["upload"].append(up)
-            bandwidth_data["download"].append(down)
-
-            if len(bandwidth_data["upload"]) > 30:
-                bandwidth_data["upload"].pop(0)
-                bandwidth_data["download"].pop(0)
-                bandwidth_data["time"].pop(0)
-
-            self.ax.clear()
-            self.ax.set_facecolor("#1b1b1f")
-            self.ax.plot(bandwidth_data["upload"], label="up", color="#00f2ea", linewidth=1.5)
-            self.ax.plot(bandwidth_data["download"], label="down", color="#9f9f9f", linewidth=1.2, linestyle="--")
-            ymax = max(100, max(bandwidth_data["upload"] + bandwidth_data["download"] + [0]))
-            self.ax.set_ylim(0, ymax)
-            self.ax.get_xaxis().set_visible(False)
-            self.ax.legend(loc="upper right", fontsize=7, facecolor="#1b1b1f", edgecolor="#2a2a2a")
-            for spine in self.ax.spines.values():
-                spine.set_color("#2a2a2a")
-            self.ax.tick_params(colors="#b7b7b7")
-            self.ax.set_title("Upload / Download (KB/s)", fontsize=9, color="#eaeaea")
-            self.canvas.draw_idle()
+            self.bandwidth_chart.refresh()
         except Exception:
             pass
 
@@ -601,7 +769,7 @@ class BotWindow(QMainWindow):
             color: #8f8f8f;
         }
 
-        QListWidget {
+        QListView {
             background: #17171a;
             border: 1px solid #2a2a2a;
             border-radius: 10px;
@@ -709,6 +877,7 @@ HTML_PAGE = """
         .message-actions { display: flex; gap: 5px; }
         .input-group { display: flex; align-items: center; justify-content: center; gap: 10px; margin: 10px 0; }
         .input-group input { margin: 0; }
+        .pager { display: flex; align-items: center; justify-content: center; gap: 10px; }
     </style>
 </head>
 <body>
@@ -733,20 +902,21 @@ HTML_PAGE = """
             <input type="text" id="newMessage" placeholder="Nouveau message..." maxlength="200">
             <button class="btn" onclick="addMessage()">➕ Ajouter</button>
         </div>
-        <div class="message-list" id="messagesList">
-            {% for message in messages %}
-            <div class="message-item" data-index="{{ loop.index0 }}">
-                <span class="message-text">{{ loop.index }}. {{ message }}</span>
-                <div class="message-actions">
-                    <button class="btn btn-small" onclick="editMessage({{ loop.index0 }}, '{{ message|replace("'", "\\'") }}')">✏️</button>
-                    <button class="btn btn-small btn-danger" onclick="deleteMessage({{ loop.index0 }})">🗑️</button>
-                </div>
-            </div>
-            {% endfor %}
+        <input type="search" id="messageFilter" placeholder="🔍 Filtrer les messages...">
+        <!-- Liste chargée page par page depuis GET /messages (la page HTML ne contient aucun message) -->
+        <div class="message-list" id="messagesList"></div>
+        <div class="pager">
+            <button class="btn btn-small" id="prevPage" onclick="changePage(-1)">◀</button>
+            <span id="pageInfo">-</span>
+            <button class="btn btn-small" id="nextPage" onclick="changePage(1)">▶</button>
+        </div>
+        <div class="input-group">
+            <input type="file" id="importFile" accept=".txt,.csv">
+            <button class="btn" onclick="importMessages()">📥 Importer (texte / CSV)</button>
         </div>
         <div style="margin-top: 15px;">
-            <button class="btn btn-danger" onclick="clearAllMessages()" {% if not messages %}disabled{% endif %}>🧹 Tout effacer</button>
-            <span style="margin-left: 20px;">Messages configurés : <strong id="messageCount">{{ messages|length }}</strong></span>
+            <button class="btn btn-danger" id="clearMessages" onclick="clearAllMessages()" {% if not message_count %}disabled{% endif %}>🧹 Tout effacer</button>
+            <span style="margin-left: 20px;">Messages configurés : <strong id="messageCount">{{ message_count }}</strong></span>
         </div>
     </div>
     <div class="card">
@@ -755,23 +925,212 @@ HTML_PAGE = """
         <p>Temps de fonctionnement : <span id="uptime">0s</span></p>
         <p>Prochaine pause prévue : <span id="next_pause">-</span></p>
         <p>Auto-messages : <span id="auto_status">{{ 'ON' if auto_messages else 'OFF' }}</span></p>
-        <p>Messages configurés : <span id="message_count">{{ messages|length }}</span></p>
+        <p>Messages configurés : <span id="message_count">{{ message_count }}</span></p>
+        <p>Latence IA (p50/p95) : <span id="ai_latency">-</span></p>
+        <p>Cache réponses : <span id="reply_cache">-</span></p>
+    </div>
+    <div class="card">
+        <h2>🔬 Diagnostic</h2>
+        <button class="btn" onclick="profiler('start')">▶️ Démarrer le profilage</button>
+        <button class="btn btn-danger" onclick="profiler('stop')">⏹️ Arrêter</button>
+        <a class="btn" href="/profiler/collapsed" target="_blank">🔥 Piles repliées</a>
+        <a class="btn" href="/threads" target="_blank">🧵 Piles des threads</a>
+        <pre id="profilerSummary" style="text-align: left; white-space: pre-wrap;"></pre>
+        <p>Réseau : <span id="telemetry_net">-</span></p>
+        <p>Ressources : <span id="telemetry_usage">-</span></p>
     </div>
     <h3 id="status">Status: En attente...</h3>
     <script>
-        setInterval(function(){
-            fetch("/status?_=" + new Date().getTime())
-                .then(res => res.json())
+        const PAGE_SIZE = 50;
+        const messagesView = {offset: 0, query: "", version: null, items: []};
+        let polling = null;
+        function showLatency(s) {
+            if (!s) return;
+            document.getElementById("ai_latency").innerText =
+                "1er token " + s.ttft.p50_ms + "/" + s.ttft.p95_ms + " ms · génération " +
+                s.generation.p50_ms + "/" + s.generation.p95_ms + " ms · commentaire→envoi " +
+                (s.end_to_end.p50_ms / 1000).toFixed(1) + "/" + (s.end_to_end.p95_ms / 1000).toFixed(1) + " s";
+        }
+        function showCache(c) {
+            if (!c) return;
+            document.getElementById("reply_cache").innerText =
+                Math.round(c.hit_rate * 100) + "% hits (" + c.hits + "/" + c.lookups + ") · " +
+                c.saved_seconds + "s d'API économisées";
+        }
+        function pollStatus() {
+            // Pas de paramètre anti-cache: /status répond 304 si rien n'a changé (ETag)
+            fetch("/status", {cache: "no-cache"})
+                .then(res => {
+                    // Heure serveur (en-tête Date, à la seconde) pour le calcul local de l'uptime
+                    const date = Date.parse(res.headers.get("Date"));
+                    if (date) { clockOffset = date / 1000 - Date.now() / 1000; }
+                    return res.json();
+                })
                 .then(data => {
                     document.getElementById("status").innerText = "Status: " + data.status;
                     document.getElementById("likes").innerText = data.likes;
-                    document.getElementById("uptime").innerText = data.uptime;
-                    document.getElementById("next_pause").innerText = data.next_pause;
+                    live.bot_start_time = data.bot_start_time;
+                    live.next_pause_time = data.next_pause_time;
                     document.getElementById("auto_status").innerText = data.auto_messages ? "ON" : "OFF";
                     document.getElementById("message_count").innerText = data.message_count;
                     document.getElementById("messageCount").innerText = data.message_count;
+                    if (data.messages_version !== live.messages_version) {
+                        live.messages_version = data.messages_version;
+                        scheduleLoad();
+                    }
+                    showLatency(data.ai_latency);
+                    showCache(data.reply_cache_stats);
                 });
-        }, 2000);
+        }
+        function pollTelemetry() {
+            fetch("/telemetry?window=0")
+                .then(res => res.json())
+                .then(data => {
+                    const u = data.latest;
+                    if (!u) return;
+                    document.getElementById("telemetry_net").innerText =
+                        "↑ " + u.net_up_kib_s.toFixed(1) + " Kio/s · ↓ " + u.net_down_kib_s.toFixed(1) + " Kio/s";
+                    document.getElementById("telemetry_usage").innerText =
+                        "bot " + u.bot_cpu.toFixed(0) + "% / " + u.bot_rss_mb.toFixed(0) + " Mo · chromedriver " +
+                        u.driver_cpu.toFixed(0) + "% / " + u.driver_rss_mb.toFixed(0) + " Mo · Chrome " +
+                        u.chrome_cpu.toFixed(0) + "% / " + u.chrome_rss_mb.toFixed(0) + " Mo";
+                });
+        }
+        pollTelemetry();
+        setInterval(pollTelemetry, 5000);
+        function startPolling() {
+            if (!polling) { polling = setInterval(pollStatus, 2000); }
+        }
+        // Flux SSE: le serveur n'envoie que les changements ; uptime et
+        // compte à rebours de pause sont calculés localement chaque seconde.
+        const live = {};
+        let clockOffset = 0;
+        function applyState(key, value) {
+            live[key] = value;
+            if (key === "status_message") {
+                document.getElementById("status").innerText = "Status: " + value;
+            } else if (key === "likes_sent") {
+                document.getElementById("likes").innerText = value;
+            } else if (key === "ENABLE_AUTO_MESSAGES") {
+                document.getElementById("auto_status").innerText = value ? "ON" : "OFF";
+            } else if (key === "message_count") {
+                document.getElementById("message_count").innerText = value;
+                document.getElementById("messageCount").innerText = value;
+            } else if (key === "messages_version") {
+                scheduleLoad();
+            } else if (key === "ai_latency") {
+                showLatency(value);
+            } else if (key === "reply_cache_stats") {
+                showCache(value);
+            }
+        }
+        function tickClock() {
+            const now = Date.now() / 1000 + clockOffset;
+            document.getElementById("uptime").innerText =
+                live.bot_start_time ? Math.floor(now - live.bot_start_time) + "s" : "0s";
+            document.getElementById("next_pause").innerText =
+                live.next_pause_time ? Math.floor(Math.max(0, live.next_pause_time - now)) + "s" : "-";
+        }
+        if (window.EventSource) {
+            // Le navigateur renvoie Last-Event-ID à la reconnexion: le serveur rejoue le delta
+            const source = new EventSource("/events");
+            source.addEventListener("snapshot", e => {
+                const data = JSON.parse(e.data);
+                clockOffset = data.server_time - Date.now() / 1000;
+                for (const key in data.state) { applyState(key, data.state[key]); }
+            });
+            source.addEventListener("state", e => {
+                const data = JSON.parse(e.data);
+                applyState(data.key, data.value);
+            });
+            source.onopen = () => { if (polling) { clearInterval(polling); polling = null; } };
+            source.onerror = () => {
+                // Flux fermé définitivement (proxy sans streaming...): repli sur le sondage
+                if (source.readyState === EventSource.CLOSED) { startPolling(); }
+            };
+        } else {
+            startPolling();
+        }
+        // Uptime et compte à rebours calculés localement, avec le flux comme avec le sondage
+        setInterval(tickClock, 1000);
+        let loadTimer = null;
+        function scheduleLoad() {
+            // Regroupe les rafales de modifications (import, éditions depuis Qt)
+            clearTimeout(loadTimer);
+            loadTimer = setTimeout(loadMessages, 200);
+        }
+        function loadMessages() {
+            const params = new URLSearchParams({offset: messagesView.offset, limit: PAGE_SIZE, q: messagesView.query});
+            fetch("/messages?" + params, {cache: "no-cache"})
+                .then(res => res.json())
+                .then(data => {
+                    if (data.offset > 0 && data.offset >= data.matched) {
+                        // Page vidée par une suppression: revenir à la dernière page
+                        messagesView.offset = Math.max(0, Math.floor((data.matched - 1) / PAGE_SIZE) * PAGE_SIZE);
+                        loadMessages();
+                        return;
+                    }
+                    messagesView.version = data.version;
+                    messagesView.items = data.items;
+                    renderMessages(data);
+                });
+        }
+        function renderMessages(data) {
+            // Nœuds construits avec textContent: pas d'échappement à gérer pour les messages
+            const list = document.getElementById("messagesList");
+            const fragment = document.createDocumentFragment();
+            for (const item of data.items) {
+                const row = document.createElement("div");
+                row.className = "message-item";
+                const text = document.createElement("span");
+                text.className = "message-text";
+                text.textContent = (item.index + 1) + ". " + item.text;
+                const actions = document.createElement("div");
+                actions.className = "message-actions";
+                const edit = document.createElement("button");
+                edit.className = "btn btn-small";
+                edit.textContent = "✏️";
+                edit.onclick = () => editMessage(item.index, item.text);
+                const del = document.createElement("button");
+                del.className = "btn btn-small btn-danger";
+                del.textContent = "🗑️";
+                del.onclick = () => deleteMessage(item.index);
+                actions.append(edit, del);
+                row.append(text, actions);
+                fragment.append(row);
+            }
+            list.replaceChildren(fragment);
+            const first = data.matched ? data.offset + 1 : 0;
+            document.getElementById("pageInfo").innerText =
+                first + "–" + (data.offset + data.items.length) + " sur " + data.matched +
+                (data.matched !== data.total ? " (" + data.total + " au total)" : "");
+            document.getElementById("prevPage").disabled = data.offset === 0;
+            document.getElementById("nextPage").disabled = data.offset + data.items.length >= data.matched;
+            document.getElementById("clearMessages").disabled = data.total === 0;
+            document.getElementById("messageCount").innerText = data.total;
+        }
+        function changePage(direction) {
+            messagesView.offset = Math.max(0, messagesView.offset + direction * PAGE_SIZE);
+            loadMessages();
+        }
+        function afterChange(data) {
+            if (data.success) { loadMessages(); } else { alert('Erreur: ' + data.error); }
+        }
+        function importMessages() {
+            const file = document.getElementById('importFile').files[0];
+            if (!file) { alert('Choisissez un fichier texte ou CSV'); return; }
+            const form = new FormData();
+            form.append('action', 'import');
+            form.append('file', file);
+            fetch('/messages', {method: 'POST', body: form})
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) { alert('Erreur: ' + data.error); return; }
+                    alert(data.added + ' messages ajoutés, ' + data.duplicates + ' doublons et ' +
+                          data.invalid + ' messages trop longs ignorés');
+                    loadMessages();
+                });
+        }
         function addMessage() {
             const input = document.getElementById('newMessage');
             const message = input.value.trim();
@@ -783,7 +1142,7 @@ HTML_PAGE = """
                 body: 'action=add&message=' + encodeURIComponent(message)
             })
             .then(response => response.json())
-            .then(data => { if (data.success) { location.reload(); } else { alert('Erreur: ' + data.error); } });
+            .then(afterChange);
         }
         function editMessage(index, currentMessage) {
             const newMessage = prompt('Modifier le message:', currentMessage);
@@ -795,7 +1154,7 @@ HTML_PAGE = """
                 body: 'action=edit&index=' + index + '&message=' + encodeURIComponent(newMessage.trim())
             })
             .then(response => response.json())
-            .then(data => { if (data.success) { location.reload(); } else { alert('Erreur: ' + data.error); } });
+            .then(afterChange);
         }
         function deleteMessage(index) {
             if (!confirm('Êtes-vous sûr de vouloir supprimer ce message ?')) { return; }
@@ -805,7 +1164,25 @@ HTML_PAGE = """
                 body: 'action=delete&index=' + index
             })
             .then(response => response.json())
-            .then(data => { if (data.success) { location.reload(); } else { alert('Erreur: ' + data.error); } });
+            .then(afterChange);
+        }
+
+        function profiler(action) {
+            fetch('/profiler', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/x-www-form-urlencoded'},
+                body: 'action=' + action
+            })
+            .then(response => response.json())
+            .then(data => {
+                const lines = [(data.running ? "En cours" : "Arrêté") + " · " + data.samples + " échantillons · " + data.duration_s + " s"];
+                for (const name in data.threads) {
+                    const t = data.threads[name];
+                    lines.push(name + " : " + t.samples + " éch." + (t.cpu_s !== null ? ", CPU " + t.cpu_s + " s" : "") +
+                               " — " + t.top.map(leaf => leaf[0] + " ×" + leaf[1]).join(", "));
+                }
+                document.getElementById('profilerSummary').innerText = lines.join("\n");
+            });
         }
 
         function clearAllMessages() {
@@ -816,70 +1193,108 @@ HTML_PAGE = """
                 body: 'action=clear'
             })
             .then(response => response.json())
-            .then(data => { if (data.success) { location.reload(); } else { alert('Erreur: ' + data.error); } });
+            .then(afterChange);
         }
 
         document.getElementById('newMessage').addEventListener('keypress', function(e) {
             if (e.key === 'Enter') { addMessage(); }
         });
+        let filterTimer = null;
+        document.getElementById('messageFilter').addEventListener('input', function(e) {
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(() => {
+                messagesView.query = e.target.value;
+                messagesView.offset = 0;
+                loadMessages();
+            }, 250);
+        });
+        loadMessages();
     </script>
 </body>
 </html>
 """
 
+# Compilé une seule fois ; la page rendue est gardée tant que toggle et nombre
+# de messages n'ont pas changé (la liste elle-même est chargée par GET /messages)
+INDEX_TEMPLATE = app.jinja_env.from_string(HTML_PAGE)
+_rendered_index = {"key": None, "html": ""}
+
+def render_index():
+    key = (state.get("ENABLE_AUTO_MESSAGES"), state.get("message_count"))
+    if _rendered_index["key"] != key:
+        html = INDEX_TEMPLATE.render(auto_messages=key[0], message_count=key[1])
+        _rendered_index.update(key=key, html=html)
+    return _rendered_index["html"]
+
 # --------- Routes Flask ---------
 @app.route("/", methods=["GET"])
 @requires_auth
 def index():
-    return render_template_string(HTML_PAGE, auto_messages=ENABLE_AUTO_MESSAGES, messages=AUTO_MESSAGES)
+    return render_index()
+
+@app.route("/messages", methods=["GET"])
+@requires_auth
+def list_messages():
+    # ?offset=&limit=&q= : une page de la bibliothèque, filtrée sans tenir compte de la casse
+    return AUTO_MESSAGES.page(
+        request.args.get("offset", 0, type=int),
+        request.args.get("limit", 50, type=int),
+        request.args.get("q", ""),
+    )
 
 @app.route("/messages", methods=["POST"])
 @requires_auth
 def manage_messages():
-    global AUTO_MESSAGES
     action = request.form.get("action")
     try:
         if action == "add":
             message = request.form.get("message", "").strip()
-            if not message:
-                return {"success": False, "error": "Message vide"}
-            if len(message) > 200:
-                return {"success": False, "error": "Message trop long"}
-            AUTO_MESSAGES.append(message)
+            AUTO_MESSAGES.add(message)
             save_config_to_json()
+            notify_messages_changed()
             set_status(f"✅ Message ajouté via web : {message[:30]}...")
             return {"success": True}
 
         elif action == "edit":
             index_i = int(request.form.get("index"))
-            message = request.form.get("message", "").strip()
-            if not message:
-                return {"success": False, "error": "Message vide"}
-            if index_i < 0 or index_i >= len(AUTO_MESSAGES):
-                return {"success": False, "error": "Index invalide"}
-            AUTO_MESSAGES[index_i] = message
+            AUTO_MESSAGES.edit(index_i, request.form.get("message", ""))
             save_config_to_json()
-            set_status(f"✅ Message modifié via web")
+            notify_messages_changed()
+            set_status("✅ Message modifié via web")
             return {"success": True}
 
         elif action == "delete":
             index_i = int(request.form.get("index"))
-            if index_i < 0 or index_i >= len(AUTO_MESSAGES):
-                return {"success": False, "error": "Index invalide"}
-            deleted_msg = AUTO_MESSAGES.pop(index_i)
+            deleted_msg = AUTO_MESSAGES.delete(index_i)
             save_config_to_json()
+            notify_messages_changed()
             set_status(f"🗑️ Message supprimé via web : {deleted_msg[:30]}...")
             return {"success": True}
 
+        elif action == "import":
+            upload = request.files.get("file")
+            if upload is None:
+                return {"success": False, "error": "Aucun fichier"}
+            result = AUTO_MESSAGES.import_file(upload.read(), upload.filename or "")
+            if result["added"]:
+                save_config_to_json()
+                notify_messages_changed()
+            set_status(f"📥 Import web : {result['added']} messages ajoutés")
+            return {"success": True, **result}
+
         elif action == "clear":
             AUTO_MESSAGES.clear()
             save_config_to_json()
+            notify_messages_changed()
             set_status("🗑️ Tous les messages supprimés via web")
             return {"success": True}
 
         else:
             return {"success": False, "error": "Action invalide"}
 
+    except (ValueError, IndexError) as e:
+        # Message vide / trop long, index hors liste (modifiée entre-temps)
+        return {"success": False, "error": str(e)}
     except Exception as e:
         set_status(f"⚠️ Erreur gestion messages web : {e}")
         return {"success": False, "error": str(e)}
@@ -887,52 +1302,122 @@ def manage_messages():
 @app.route("/control", methods=["POST"])
 @requires_auth
 def control():
-    global running, current_live, driver, ENABLE_AUTO_MESSAGES
     action = request.form.get("action")
     live_url = request.form.get("live_url")
     auto_messages_toggle = request.form.get("auto_messages")
 
     if auto_messages_toggle is not None:
-        tik_backend.ENABLE_AUTO_MESSAGES = not ENABLE_AUTO_MESSAGES
+        enabled = state.set("ENABLE_AUTO_MESSAGES", not state.get("ENABLE_AUTO_MESSAGES"))
         save_config_to_json()
-        set_status(f"🔁 Auto-messages {'activés' if ENABLE_AUTO_MESSAGES else 'désactivés'}")
+        set_status(f"🔁 Auto-messages {'activés' if enabled else 'désactivés'}")
 
     if action == "start":
         toggle_running()
     elif action == "stop":
-        tik_backend.running = False
+        set_running(False)
         set_status("⏸️ Bot arrêté via web")
     elif action == "change_live" and live_url:
-        current_live = live_url
-        if driver:
-            driver.get(current_live)
-        set_status(f"🌐 Live changé : {current_live}")
+        state.set("current_live", live_url)
+        tik_backend.live_monitor.reset()
+        if tik_backend.driver:
+            try:
+                tik_backend.driver_executor.run(
+                    lambda d: d.get(live_url), tik_backend.PRIORITY_NAVIGATION, "navigation"
+                )
+            except Exception as e:
+                set_status(f"⚠️ Erreur changement de live : {e}")
+        set_status(f"🌐 Live changé : {live_url}")
+
+    return render_index()
+
+@app.route("/events", methods=["GET"])
+@requires_auth
+def event_stream():
+    # Server-Sent Events: instantané puis deltas d'état (id = version du StateStore)
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id")
+    return Response(
+        tik_backend.state_stream.listen(last_id),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/profiler", methods=["GET", "POST"])
+@requires_auth
+def profiler_control():
+    action = request.form.get("action")
+    if action == "start":
+        tik_backend.start_profiler()
+    elif action == "stop":
+        tik_backend.stop_profiler()
+    return tik_backend.profiler.summary()
 
-    return render_template_string(HTML_PAGE, auto_messages=ENABLE_AUTO_MESSAGES, messages=AUTO_MESSAGES)
+@app.route("/profiler/collapsed", methods=["GET"])
+@requires_auth
+def profiler_collapsed():
+    # Format "piles repliées": flamegraph.pl, speedscope.app, inferno
+    return Response(tik_backend.profiler.collapsed(request.args.get("thread")), mimetype="text/plain")
+
+@app.route("/threads", methods=["GET"])
+@requires_auth
+def thread_dump():
+    return Response(tik_backend.dump_stacks(), mimetype="text/plain")
+
+@app.route("/metrics", methods=["GET"])
+@requires_auth
+def metrics_endpoint():
+    return Response(tik_backend.metrics.expose(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/telemetry", methods=["GET"])
+@requires_auth
+def telemetry_endpoint():
+    # ?window=secondes&points=N : historique réduit ; window=0 : dernier relevé seulement
+    window = request.args.get("window", 3600, type=float)
+    if window <= 0:
+        return {
+            "latest": tik_backend.telemetry.latest(),
+            "stats": tik_backend.telemetry.stats(),
+            "diagnostics": diagnostics(),
+        }
+    points = min(max(request.args.get("points", 300, type=int), 2), 2000)
+    return tik_backend.telemetry.query(min(window, 24 * 3600), points)
+
+def diagnostics():
+    """Compteurs internes qui changent en continu: servis par /telemetry, pas par /status."""
+    return {
+        "seen_comments": tik_backend.seen_comments.stats(),
+        "config_writer": tik_backend.config_writer.stats(),
+        "settings": tik_backend.settings.stats(),
+        "event_log": tik_backend.event_log.stats(),
+        "reply_pipeline": tik_backend.reply_pipeline.snapshot() if tik_backend.reply_pipeline else None,
+        "reply_cache": tik_backend.reply_cache.stats() if tik_backend.reply_cache else None,
+        "conversation_memory": tik_backend.conversation_memory.stats(),
+        "openai_scheduler": tik_backend.openai_scheduler.stats(),
+        "driver_executor": tik_backend.driver_executor.stats(),
+    }
 
 @app.route("/status", methods=["GET"])
 @requires_auth
 def status():
-    global likes_sent, bot_start_time, next_pause_time, ENABLE_AUTO_MESSAGES, AUTO_MESSAGES
-    uptime = "0s"
-    if bot_start_time:
-        uptime = f"{int(time.time()-bot_start_time)}s"
-    next_pause_str = "-"
-    if next_pause_time:
-        next_pause_str = f"{int(max(0, next_pause_time - time.time()))}s"
+    # Uniquement l'état versionné (horodatages bruts, pas d'uptime calculé): le corps, donc
+    # l'ETag, ne change qu'avec `version` et un panel inactif reçoit des 304
+    version, snap = state.snapshot()
     return {
-        "status": status_message,
-        "likes": likes_sent,
-        "uptime": uptime,
-        "next_pause": next_pause_str,
-        "auto_messages": ENABLE_AUTO_MESSAGES,
-        "message_count": len(AUTO_MESSAGES)
+        "version": version,
+        "status": snap["status_message"],
+        "likes": snap["likes_sent"],
+        "bot_start_time": snap["bot_start_time"],
+        "next_pause_time": snap["next_pause_time"],
+        "auto_messages": snap["ENABLE_AUTO_MESSAGES"],
+        "message_count": snap["message_count"],
+        "messages_version": snap["messages_version"],
+        "ai_latency": snap["ai_latency"],
+        "reply_cache_stats": snap["reply_cache_stats"],
     }
 
 # --------- Utilitaires additionnels ---------
 def clear_terminal():
     while True:
-        time.sleep(CLEAR_INTERVAL)
+        time.sleep(tik_backend.settings.current.CLEAR_INTERVAL)
         os.system('cls' if os.name == 'nt' else 'clear')
         set_status("🧹 Terminal nettoyé automatiquement.")
 
@@ -962,21 +1447,26 @@ def launch_ngrok():
 if __name__ == "__main__":
     # Serveur Flask (daemon)
     flask_thread = threading.Thread(
-        target=lambda: app.run(host="0.0.0.0", port=5000, debug=False, use_reloader=False),
+        target=tik_backend.run_web_server,
+        name="flask",
         daemon=True
     )
     flask_thread.start()
 
     # Outils & boucles
-    threading.Thread(target=launch_ngrok, daemon=True).start()
-    threading.Thread(target=clear_terminal, daemon=True).start()
-    threading.Thread(target=refresh_live_loop, daemon=True).start()
-    threading.Thread(target=auto_message_loop, daemon=True).start()
-    threading.Thread(target=live_reply_loop, daemon=True).start()  # ChatGPT loop
+    threading.Thread(target=launch_ngrok, name="ngrok", daemon=True).start()
+    threading.Thread(target=clear_terminal, name="clear-terminal", daemon=True).start()
+    threading.Thread(target=refresh_live_loop, name="refresh-live", daemon=True).start()
+    threading.Thread(target=live_state_loop, name="live-state", daemon=True).start()
+    threading.Thread(target=tik_backend.settings.watch, name="settings-watch", daemon=True).start()
+    threading.Thread(target=tik_backend.telemetry.run, name="telemetry", daemon=True).start()
+    threading.Thread(target=auto_message_loop, name="auto-message", daemon=True).start()
+    threading.Thread(target=live_reply_loop, name="live-reply", daemon=True).start()  # ChatGPT loop
 
     # Selenium + Auto-like
-    threading.Thread(target=launch_driver, daemon=True).start()
-    threading.Thread(target=auto_like, daemon=True).start()
+    threading.Thread(target=tik_backend.driver_executor.serve_forever, name="driver-executor", daemon=True).start()
+    threading.Thread(target=launch_driver, name="launch-driver", daemon=True).start()
+    threading.Thread(target=auto_like, name="auto-like", daemon=True).start()
 
     # UI PyQt6 dans le thread principal
     launch_pyqt_control()
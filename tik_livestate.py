@@ -0,0 +1,54 @@
+"""
+Surveillance de l'état du live (en cours / terminé).
+
+Remplace le scan de driver.page_source à chaque like : une sonde ciblée
+(un execute_script qui ne renvoie qu'un booléen et l'URL) est lancée à basse
+fréquence par son propre thread, et la fin du live est publiée une seule fois
+via un threading.Event + callbacks abonnés.
+"""
+
+import threading
+
+# Cherche le bandeau "live terminé" parmi les éléments feuilles seulement
+_PROBE_JS = r"""
+const xp = "//*[not(*)][contains(translate(normalize-space(text()),"
+         + "'ABCDEFGHIJKLMNOPQRSTUVWXYZÉ','abcdefghijklmnopqrstuvwxyzé'),'live terminé')]";
+const hit = document.evaluate(xp, document.body, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return {ended: hit !== null, url: location.href};
+"""
+
+
+class LiveStateMonitor:
+    """Sonde l'état du live et notifie les abonnés quand il se termine."""
+
+    def __init__(self):
+        self.ended = threading.Event()
+        self.last_url = None
+        self.checks = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """callback(url) est appelé une fois à chaque fin de live détectée."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def reset(self):
+        """À appeler quand on change de live ou qu'on relance le bot."""
+        self.ended.clear()
+
+    def is_ended(self):
+        return self.ended.is_set()
+
+    def check(self, driver):
+        """Un seul aller-retour WebDriver ; retourne True si le live est terminé."""
+        self.checks += 1
+        res = driver.execute_script(_PROBE_JS) or {}
+        self.last_url = res.get("url", self.last_url)
+        if res.get("ended") and not self.ended.is_set():
+            self.ended.set()
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for cb in subscribers:
+                cb(self.last_url)
+        return self.ended.is_set()
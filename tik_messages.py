@@ -0,0 +1,181 @@
+"""
+Bibliothèque des auto-messages, partagée par l'UI Qt, le panel web et auto_message_loop.
+
+Toutes les modifications passent par MessageLibrary (sous verrou) et sont
+publiées sur le bus, sujet "messages", sous forme de changement de lignes :
+
+    {"op": "insert", "index": 3, "texts": [...], "version": 12}
+    {"op": "update", "index": 3, "texts": ["..."], "version": 13}
+    {"op": "remove", "index": 3, "count": 1, "version": 14}
+    {"op": "reset", "texts": [...], "version": 15}
+
+Le modèle Qt applique ces changements ligne par ligne (pas de reconstruction
+de la liste) ; le panel web lit des pages filtrées via page(). L'import en
+masse accepte un fichier texte (un message par ligne) ou CSV (colonne
+"message"/"text"/"texte", sinon la première).
+"""
+
+import csv
+import io
+import random
+import threading
+
+MAX_MESSAGE_LENGTH = 200
+MAX_PAGE_SIZE = 500
+CSV_COLUMNS = ("message", "messages", "text", "texte")
+
+
+def parse_import(data, filename=""):
+    """Messages contenus dans un fichier importé (bytes ou str), dans l'ordre, non nettoyés."""
+    if isinstance(data, bytes):
+        try:
+            data = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            data = data.decode("cp1252", errors="replace")  # export Excel sous Windows
+    if not filename.lower().endswith(".csv"):
+        return data.splitlines()
+    try:
+        dialect = csv.Sniffer().sniff(data[:4096], ",;\t")
+    except csv.Error:
+        dialect = "excel"  # une seule colonne: pas de séparateur à détecter
+    rows = list(csv.reader(io.StringIO(data), dialect))
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next((header.index(name) for name in CSV_COLUMNS if name in header), None)
+    if column is None:
+        column = 0
+    else:
+        rows = rows[1:]
+    return [row[column] for row in rows if len(row) > column]
+
+
+class MessageLibrary:
+    def __init__(self, messages=(), bus=None, max_length=MAX_MESSAGE_LENGTH):
+        self.bus = bus
+        self.max_length = max_length
+        self.version = 0
+        self._items = [str(m) for m in messages]
+        self._folded = [m.casefold() for m in self._items]  # pour la recherche
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._items)
+
+    def snapshot_with_version(self):
+        """(version, messages) cohérents: point de départ d'un abonné au sujet "messages"."""
+        with self._lock:
+            return self.version, list(self._items)
+
+    def _validate(self, text):
+        text = str(text).strip()
+        if not text:
+            raise ValueError("Message vide")
+        if len(text) > self.max_length:
+            raise ValueError("Message trop long")
+        return text
+
+    def _check_index(self, index):
+        if not 0 <= index < len(self._items):
+            raise IndexError("Index invalide")
+
+    def _publish(self, op, **payload):
+        # Appelé sous verrou: les abonnés reçoivent les changements dans l'ordre
+        self.version += 1
+        if self.bus is not None:
+            self.bus.publish("messages", {"op": op, "version": self.version, **payload})
+
+    def add(self, text):
+        text = self._validate(text)
+        with self._lock:
+            index = len(self._items)
+            self._items.append(text)
+            self._folded.append(text.casefold())
+            self._publish("insert", index=index, texts=[text])
+        return index
+
+    def add_many(self, texts):
+        """Ajout groupé (un seul événement) ; ignore vides, trop longs et doublons."""
+        result = {"added": 0, "duplicates": 0, "invalid": 0}
+        accepted = []
+        with self._lock:
+            known = set(self._items)
+            for text in texts:
+                try:
+                    text = self._validate(text)
+                except ValueError:
+                    if str(text).strip():  # lignes vides ignorées sans les compter
+                        result["invalid"] += 1
+                    continue
+                if text in known:
+                    result["duplicates"] += 1
+                    continue
+                known.add(text)
+                accepted.append(text)
+            if accepted:
+                index = len(self._items)
+                self._items.extend(accepted)
+                self._folded.extend(t.casefold() for t in accepted)
+                self._publish("insert", index=index, texts=accepted)
+        result["added"] = len(accepted)
+        return result
+
+    def import_file(self, data, filename=""):
+        return self.add_many(parse_import(data, filename))
+
+    def edit(self, index, text):
+        text = self._validate(text)
+        with self._lock:
+            self._check_index(index)
+            self._items[index] = text
+            self._folded[index] = text.casefold()
+            self._publish("update", index=index, texts=[text])
+
+    def delete(self, index):
+        with self._lock:
+            self._check_index(index)
+            text = self._items.pop(index)
+            del self._folded[index]
+            self._publish("remove", index=index, count=1)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._folded.clear()
+            self._publish("reset", texts=[])
+
+    def pick(self):
+        """Message tiré au hasard, ou None si la bibliothèque est vide."""
+        with self._lock:
+            return random.choice(self._items) if self._items else None
+
+    def page(self, offset=0, limit=50, query=""):
+        """Page de résultats pour le panel web ; "index" est la position dans la bibliothèque."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        needle = query.strip().casefold()
+        with self._lock:
+            if needle:
+                matches = [i for i, folded in enumerate(self._folded) if needle in folded]
+                items = [{"index": i, "text": self._items[i]} for i in matches[offset:offset + limit]]
+                matched = len(matches)
+            else:
+                end = min(offset + limit, len(self._items))
+                items = [{"index": i, "text": self._items[i]} for i in range(offset, end)]
+                matched = len(self._items)
+            return {
+                "version": self.version,
+                "total": len(self._items),
+                "matched": matched,
+                "offset": offset,
+                "limit": limit,
+                "items": items,
+            }
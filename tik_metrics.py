@@ -0,0 +1,174 @@
+"""
+Métriques en mémoire (compteurs, jauges, histogrammes à seaux fixes) exportées
+au format texte Prometheus sur /metrics.
+
+L'enregistrement doit rester bien sous la microseconde pour pouvoir vivre dans
+auto_like : les séries avec labels sont résolues une fois (`labels(...)`) et
+gardées par l'appelant ; observe() = bisect sur les bornes + un verrou.
+"""
+
+import threading
+from bisect import bisect_left
+
+# Latences (secondes): de la commande WebDriver (ms) à l'appel OpenAI (dizaines de s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        yield name + "_total" + labels, self.value
+
+
+class Gauge:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def set_function(self, function):
+        """Valeur calculée au moment de l'export (profondeur de file, etc.)."""
+        self.function = function
+
+    def samples(self, name, labels):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                return
+        yield name + labels, value
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def samples(self, name, labels, names=(), values=()):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            yield name + "_bucket" + _format_labels(names, values, [("le", _format_value(bound))]), cumulative
+        yield name + "_sum" + labels, total
+        yield name + "_count" + labels, cumulative
+
+
+class Family:
+    """Une métrique nommée et ses séries par valeurs de labels."""
+
+    TYPES = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}
+
+    def __init__(self, kind, name, documentation, labelnames=(), **options):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.options = options
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self.kind(**self.options)
+        return child
+
+    # Raccourcis pour les métriques sans label
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def set(self, value):
+        self._default.set(value)
+
+    def set_function(self, function):
+        self._default.set_function(function)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def expose(self):
+        # Format 0.0.4: HELP/TYPE doivent porter le nom exact des échantillons (suffixe _total des compteurs)
+        name = self.name + "_total" if self.kind is Counter else self.name
+        lines = [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.TYPES[self.kind]}"]
+        for values, child in list(self._children.items()):
+            labels = _format_labels(self.labelnames, values)
+            if isinstance(child, Histogram):
+                samples = child.samples(self.name, labels, self.labelnames, values)
+            else:
+                samples = child.samples(self.name, labels)
+            lines.extend(f"{sample} {_format_value(value)}" for sample, value in samples)
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self._families = {}
+
+    def _family(self, kind, name, documentation, labelnames, **options):
+        name = self.prefix + name
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = Family(kind, name, documentation, labelnames, **options)
+        return family
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._family(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._family(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._family(Histogram, name, documentation, labelnames, bounds=buckets)
+
+    def expose(self):
+        """Format d'exposition texte Prometheus (version 0.0.4)."""
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.expose())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,207 @@
+"""
+Pipeline de réponses IA en étapes concurrentes.
+
+    ingestion ──(file bornée)──> génération xN ──(file bornée)──> envoi rythmé
+
+- ingestion : submit() n'est jamais bloquant ; si la file est pleine, le plus
+  ancien commentaire en attente est abandonné (il serait périmé de toute façon).
+- génération : pool de threads qui appellent generate(comment) en parallèle ;
+  ils bloquent sur la file d'envoi pleine (backpressure). En mode batch, un
+  thread regroupe jusqu'à batch_size commentaires arrivés dans batch_window
+  secondes et appelle generate_batch(comments) une seule fois ; les réponses
+  manquantes sont regénérées une par une. Une réponse en streaming (objet
+  avec pump()) est transmise à l'envoi dès sa première phrase.
+- envoi : un seul thread, qui respecte l'intervalle min/max entre messages ;
+  une exception de send() est comptée (send_errors, on_send_error) sans
+  arrêter le thread, sinon la génération resterait bloquée sur la file pleine.
+
+Chaque étape expose la profondeur de sa file et ses latences (p50/p95/max).
+Toutes les mesures et attentes passent par `clock` (horloge système par
+défaut) : tik_replay rejoue un live enregistré avec une horloge accélérée.
+"""
+
+import queue
+import random
+import threading
+import time
+
+from tik_stats import LatencyStats
+
+
+class SystemClock:
+    """Horloge réelle ; une horloge virtuelle expose les mêmes attributs."""
+
+    speed = 1.0
+    sleep = staticmethod(time.sleep)  # avant `time`, qui masque le module dans ce corps de classe
+    time = staticmethod(time.time)
+
+
+class ReplyPipeline:
+    """Relie ingestion, génération concurrente et envoi rythmé par des files bornées."""
+
+    def __init__(self, generate, send, concurrency=3, queue_size=50, min_interval=4, max_interval=8,
+                 generate_batch=None, batch_size=1, batch_window=1.5, clock=None, on_send_error=None):
+        self.generate = generate
+        self.on_send_error = on_send_error
+        self.clock = clock or SystemClock()
+        self.send = send
+        self.generate_batch = generate_batch
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.ingest_queue = queue.Queue(maxsize=queue_size)
+        self.send_queue = queue.Queue(maxsize=max(1, concurrency))
+        self.dropped = 0
+        self.failed = 0
+        self.send_errors = 0
+        self.batches = 0
+        self.batched_comments = 0
+        self.batch_fallbacks = 0
+        self.stats = {
+            "ingest_wait": LatencyStats(),
+            "ttft": LatencyStats(),
+            "generation": LatencyStats(),
+            "send_wait": LatencyStats(),
+            "send": LatencyStats(),
+            "end_to_end": LatencyStats(),
+        }
+        self._threads = []
+
+    def start(self):
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._generation_worker, name=f"reply-gen-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._sender, name="reply-sender", daemon=True)
+        t.start()
+        self._threads.append(t)
+        return self
+
+    def submit(self, comment):
+        """Ajoute un commentaire ; abandonne le plus ancien en attente si la file est pleine."""
+        item = (comment.get("seen_at") or self.clock.time(), comment)
+        while True:
+            try:
+                self.ingest_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.ingest_queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def shed(self, keep):
+        """Abandonne les commentaires en attente les plus anciens pour n'en garder que `keep`."""
+        while self.ingest_queue.qsize() > keep:
+            try:
+                self.ingest_queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                break
+
+    def _take_batch(self):
+        batch = [self.ingest_queue.get()]
+        if self.generate_batch is None or self.batch_size <= 1:
+            return batch
+        deadline = self.clock.time() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - self.clock.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.ingest_queue.get(timeout=remaining / self.clock.speed))
+            except queue.Empty:
+                break
+        return batch
+
+    def _generate_all(self, comments):
+        replies = None
+        if len(comments) > 1:
+            try:
+                replies = self.generate_batch(comments)
+            except Exception:
+                replies = None
+            if replies and len(replies) == len(comments):
+                self.batches += 1
+                self.batched_comments += len(comments)
+            else:
+                replies = None
+        replies = replies or [None] * len(comments)
+        # Repli: appel unitaire pour chaque réponse absente du batch
+        for i, comment in enumerate(comments):
+            if not replies[i]:
+                if len(comments) > 1:
+                    self.batch_fallbacks += 1
+                try:
+                    replies[i] = self.generate(comment)
+                except Exception:
+                    replies[i] = None
+        return replies
+
+    def _generation_worker(self):
+        while True:
+            batch = self._take_batch()
+            started = self.clock.time()
+            for seen_at, _ in batch:
+                self.stats["ingest_wait"].record(started - seen_at)
+            replies = self._generate_all([comment for _, comment in batch])
+            done = self.clock.time()
+            for (seen_at, comment), reply in zip(batch, replies):
+                if hasattr(reply, "pump"):
+                    self._forward_stream(seen_at, comment, reply)
+                    continue
+                # Sans streaming, le premier token arrive avec la réponse complète
+                self.stats["ttft"].record(done - started)
+                self.stats["generation"].record(done - started)
+                if not reply:
+                    self.failed += 1
+                    continue
+                # Bloque si l'envoi est en retard: la génération ralentit d'elle-même
+                self.send_queue.put((seen_at, done, comment, reply))
+
+    def _forward_stream(self, seen_at, comment, reply):
+        if not reply.pump(until_first=True):
+            self.failed += 1
+            return
+        self.stats["ttft"].record(reply.ttft or 0.0)
+        self.send_queue.put((seen_at, self.clock.time(), comment, reply))
+        reply.pump()
+        self.stats["generation"].record(reply.total or 0.0)
+
+    def _sender(self):
+        while True:
+            seen_at, generated_at, comment, reply = self.send_queue.get()
+            started = self.clock.time()
+            self.stats["send_wait"].record(started - generated_at)
+            try:
+                sent = self.send(comment, reply)
+            except Exception as e:
+                self.send_errors += 1
+                if self.on_send_error is not None:
+                    try:
+                        self.on_send_error(comment, e)
+                    except Exception:
+                        pass
+                continue
+            done = self.clock.time()
+            self.stats["send"].record(done - started)
+            if sent is not False:
+                self.stats["end_to_end"].record(done - seen_at)
+                self.clock.sleep(random.uniform(self.min_interval, self.max_interval))
+
+    def snapshot(self):
+        return {
+            "concurrency": self.concurrency,
+            "ingest_depth": self.ingest_queue.qsize(),
+            "send_depth": self.send_queue.qsize(),
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "send_errors": self.send_errors,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_comments / self.batches, 1) if self.batches else 0.0,
+            "batch_fallbacks": self.batch_fallbacks,
+            "stages": {name: s.summary() for name, s in self.stats.items()},
+        }
@@ -0,0 +1,159 @@
+"""
+Profileur par échantillonnage (sys._current_frames) et dump des piles.
+
+Un thread relève toutes les `interval` secondes la pile Python de chaque
+thread et compte les piles identiques : rien n'est instrumenté, le coût est
+d'environ un parcours de pile par thread et par échantillon (≈1 % d'un cœur
+à 100 Hz pour une dizaine de threads), assez faible pour tourner pendant un live.
+
+C'est un profil "horloge murale" : un thread qui dort apparaît dans son
+time.sleep. Le temps CPU réellement consommé par thread (psutil, si
+disponible) est donc joint au résumé pour repérer celui qui brûle le CPU.
+
+collapsed() produit le format "pile;repliée compte" lu par flamegraph.pl,
+speedscope ou inferno.
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+
+try:
+    import psutil
+except ImportError:  # temps CPU par thread indisponible, le profil reste utilisable
+    psutil = None
+
+
+def _thread_names():
+    return {t.ident: t.name for t in threading.enumerate()}
+
+
+def _thread_cpu_times():
+    """native_id -> secondes CPU (user + system) ; vide sans psutil."""
+    if psutil is None:
+        return {}
+    try:
+        return {t.id: t.user_time + t.system_time for t in psutil.Process().threads()}
+    except Exception:
+        return {}
+
+
+def dump_stacks():
+    """Pile courante de chaque thread, au format traceback (lisible tel quel)."""
+    names = _thread_names()
+    parts = []
+    for ident, frame in sys._current_frames().items():
+        parts.append(f"--- Thread {names.get(ident, '?')} ({ident}) ---\n")
+        parts.extend(traceback.format_stack(frame))
+        parts.append("\n")
+    return "".join(parts)
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.01, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.started = None
+        self.stopped = None
+        self._counts = {}
+        self._labels = {}
+        self._cpu_start = {}
+        self._cpu_end = {}
+        self._native_ids = {}
+        self._running = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def is_running(self):
+        return self._running.is_set()
+
+    def start(self, interval=None):
+        with self._lock:
+            if self._running.is_set():
+                return False
+            if interval:
+                self.interval = interval
+            self._counts = {}
+            self.samples = 0
+            self.started, self.stopped = time.time(), None
+            self._cpu_start, self._cpu_end = _thread_cpu_times(), {}
+            self._running.set()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        with self._lock:
+            if not self._running.is_set():
+                return False
+            self._running.clear()
+        self._thread.join(timeout=2)
+        self.stopped = time.time()
+        self._cpu_end = _thread_cpu_times()
+        return True
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        me = threading.get_ident()
+        names_at = 0.0
+        counts = self._counts
+        while self._running.is_set():
+            now = time.time()
+            # Noms rafraîchis chaque seconde: les threads sont longue durée
+            if now - names_at > 1.0:
+                names, names_at = _thread_names(), now
+                self._native_ids = {t.name: t.native_id for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                depth = 0
+                while frame is not None and depth < self.max_depth:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                    depth += 1
+                key = (names.get(ident, str(ident)), tuple(reversed(stack)))
+                counts[key] = counts.get(key, 0) + 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def collapsed(self, thread=None):
+        """Une ligne par pile distincte : "thread;appelant;...;appelé N"."""
+        lines = []
+        for (name, stack), count in sorted(list(self._counts.items()), key=lambda kv: -kv[1]):
+            if thread and name != thread:
+                continue
+            lines.append(";".join((name,) + stack) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, top=5):
+        threads = {}
+        for (name, stack), count in list(self._counts.items()):
+            entry = threads.setdefault(name, {"samples": 0, "leaves": {}})
+            entry["samples"] += count
+            leaf = stack[-1] if stack else "?"
+            entry["leaves"][leaf] = entry["leaves"].get(leaf, 0) + count
+        cpu_end = self._cpu_end or _thread_cpu_times()
+        result = {}
+        for name, entry in sorted(threads.items(), key=lambda kv: -kv[1]["samples"]):
+            native = self._native_ids.get(name)
+            cpu = None
+            if native in cpu_end:
+                cpu = round(cpu_end[native] - self._cpu_start.get(native, 0.0), 3)
+            leaves = sorted(entry["leaves"].items(), key=lambda kv: -kv[1])[:top]
+            result[name] = {"samples": entry["samples"], "cpu_s": cpu, "top": leaves}
+        return {
+            "running": self.is_running(),
+            "interval_ms": round(self.interval * 1000, 1),
+            "samples": self.samples,
+            "duration_s": round((self.stopped or time.time()) - self.started, 1) if self.started else 0.0,
+            "threads": result,
+        }
@@ -0,0 +1,202 @@
+"""
+Ordonnanceur des requêtes OpenAI : limites de débit, 429 et budgets.
+
+- deux seaux à jetons : requêtes/minute et tokens/minute ;
+- sur une 429, respect du Retry-After (ou backoff exponentiel) avec jitter,
+  appliqué à tous les threads via une fenêtre de refroidissement commune ;
+- budgets de dépense horaire et journalier (0 = illimité).
+
+Quand une requête devrait attendre plus de max_wait secondes, elle est
+refusée tout de suite (RateLimited) : l'appelant abandonne le commentaire
+plutôt que de bloquer tout le pipeline.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+
+class RateLimited(Exception):
+    """Requête refusée: limite de débit, refroidissement 429 ou budget atteint."""
+
+
+class TokenBucket:
+    """Seau à jetons rechargé en continu (rate par minute, 0 = illimité)."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.time()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Secondes à attendre avant de pouvoir prélever `amount`."""
+        if not self.per_minute:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.per_minute
+
+    def take(self, amount):
+        if self.per_minute:
+            self.level -= amount
+
+    def set_rate(self, per_minute):
+        if per_minute == self.per_minute:
+            return
+        was_unlimited = not self.per_minute
+        self._refill(time.time())
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        # Passage d'illimité à limité: seau plein ; sinon on garde le niveau courant (borné)
+        self.level = self.capacity if was_unlimited else min(self.level, self.capacity)
+
+
+class SpendWindow:
+    """Somme glissante des dépenses sur `period` secondes."""
+
+    def __init__(self, period, budget):
+        self.period = period
+        self.budget = budget
+        self.total = 0.0
+        self._entries = deque()
+
+    def spent(self, now):
+        while self._entries and now - self._entries[0][0] > self.period:
+            self.total -= self._entries.popleft()[1]
+        return self.total
+
+    def exceeded(self, now):
+        return bool(self.budget) and self.spent(now) >= self.budget
+
+    def add(self, now, cost):
+        self._entries.append((now, cost))
+        self.total += cost
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RequestScheduler:
+    """Passage obligé de chaque appel à client.chat.completions.create."""
+
+    def __init__(self, rpm=0, tpm=0, hourly_budget=0.0, daily_budget=0.0, cost_per_1k_tokens=0.0,
+                 max_wait=10.0, max_retries=4, base_backoff=1.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.hourly = SpendWindow(3600, hourly_budget)
+        self.daily = SpendWindow(86400, daily_budget)
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.cooldown_until = 0.0
+        self.counters = {"calls": 0, "throttled": 0, "rejected": 0, "http_429": 0, "retries": 0, "tokens": 0}
+        self._lock = threading.Lock()
+
+    def configure(self, rpm, tpm, hourly_budget, daily_budget, cost_per_1k_tokens, max_wait):
+        """Applique de nouvelles limites sans perdre les dépenses et le refroidissement en cours."""
+        with self._lock:
+            self.requests.set_rate(rpm)
+            self.tokens.set_rate(tpm)
+            self.hourly.budget = hourly_budget
+            self.daily.budget = daily_budget
+            self.cost_per_1k_tokens = cost_per_1k_tokens
+            self.max_wait = max_wait
+
+    def is_limited(self):
+        """True si les appels sont actuellement suspendus (429 ou budget)."""
+        now = time.time()
+        with self._lock:
+            return now < self.cooldown_until or self.hourly.exceeded(now) or self.daily.exceeded(now)
+
+    def _acquire(self, estimated_tokens):
+        while True:
+            now = time.time()
+            with self._lock:
+                if self.hourly.exceeded(now) or self.daily.exceeded(now):
+                    self.counters["rejected"] += 1
+                    raise RateLimited("budget OpenAI atteint")
+                wait = max(
+                    self.cooldown_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(estimated_tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(estimated_tokens)
+                    return
+                if wait > self.max_wait:
+                    self.counters["rejected"] += 1
+                    raise RateLimited(f"limite de débit OpenAI (attente {wait:.0f}s)")
+                self.counters["throttled"] += 1
+            time.sleep(wait)
+
+    def _record_usage(self, estimated_tokens, used_tokens):
+        now = time.time()
+        with self._lock:
+            # Le seau a été débité de l'estimation: on corrige avec la consommation réelle
+            self.tokens.take(used_tokens - estimated_tokens)
+            self.counters["tokens"] += used_tokens
+            cost = used_tokens / 1000.0 * self.cost_per_1k_tokens
+            self.hourly.add(now, cost)
+            self.daily.add(now, cost)
+
+    def _backoff(self, exc, attempt):
+        delay = _retry_after(exc)
+        if delay is None:
+            delay = self.base_backoff * (2 ** attempt)
+        delay *= random.uniform(1.0, 1.25)  # jitter: évite que tous les threads repartent ensemble
+        with self._lock:
+            self.counters["http_429"] += 1
+            self.cooldown_until = max(self.cooldown_until, time.time() + delay)
+
+    def call(self, fn, estimated_tokens=0):
+        """Exécute fn() en respectant les limites ; retente les 429. Lève RateLimited si abandon."""
+        for attempt in range(self.max_retries + 1):
+            self._acquire(estimated_tokens)
+            with self._lock:
+                self.counters["calls"] += 1
+            try:
+                result = fn()
+            except Exception as e:
+                if getattr(e, "status_code", None) != 429:
+                    raise
+                self._backoff(e, attempt)
+                with self._lock:
+                    self.counters["retries"] += 1
+                continue
+            usage = getattr(result, "usage", None)
+            used = getattr(usage, "total_tokens", None) or estimated_tokens
+            self._record_usage(estimated_tokens, used)
+            return result
+        raise RateLimited("trop de réponses 429, requête abandonnée")
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {
+                **self.counters,
+                "cooldown_s": round(max(0.0, self.cooldown_until - now), 1),
+                "spent_hour": round(self.hourly.spent(now), 4),
+                "spent_day": round(self.daily.spent(now), 4),
+            }
+
+
+def estimate_tokens(messages, max_tokens):
+    """Estimation grossière (≈ 4 caractères par token) + tokens de sortie max."""
+    return sum(len(m.get("content", "")) for m in messages) // 4 + max_tokens
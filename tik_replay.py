@@ -0,0 +1,304 @@
+"""
+Enregistrement et rejeu des commentaires d'un live.
+
+CommentRecorder écrit, pendant le live, chaque nouveau commentaire transmis au
+pipeline IA et chaque message envoyé par le bot dans un fichier compact
+recordings/live-AAAAMMJJ-HHMMSS.jsonl.gz :
+
+    {"v": 1, "started": 1730000000.0, "live": "https://..."}
+    ["c", 1234, "viewer42", "salut"]          # commentaire, ms depuis le début
+    ["s", 5678, "Merci pour ton message !"]   # message envoyé
+
+replay() réinjecte ce flux dans un ReplyPipeline configuré comme celui de
+live_reply_loop (file, concurrence, rythme, batch), avec une horloge
+virtuelle accélérée (1×, 10× ou max) : génération et envoi sont simulés avec
+des latences tirées d'un générateur initialisé par --seed, donc deux versions
+du code se comparent sur exactement le même trafic réel.
+
+Usage : python -m tik_replay recordings/live-....jsonl.gz [--speed 10]
+        [--config config.json] [--output rapport.json] [--compare ancien.json]
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import threading
+import time
+
+from tik_pipeline import ReplyPipeline
+from tik_stats import LatencyStats
+
+FORMAT_VERSION = 1
+# Au-delà, la résolution de time.sleep et l'ordonnancement des threads faussent les latences
+MAX_SPEED = 500.0
+POLL_INTERVAL = 2.0  # période de lecture du chat dans live_reply_loop
+
+
+class CommentRecorder:
+    """Ajouts bufferisés sous verrou ; un fichier par live, ouvert au premier événement."""
+
+    def __init__(self, directory, get_live=None, flush_interval=2.0):
+        self.directory = directory
+        self.get_live = get_live
+        self.flush_interval = flush_interval
+        self.path = None
+        self.counts = {"comments": 0, "sends": 0}
+        self.last_error = None
+        self._file = None
+        self._started = None
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def start(self, live=None):
+        """Commence un nouveau fichier (changement de live)."""
+        with self._lock:
+            self._close()
+            self._open(live)
+
+    def _open(self, live):
+        os.makedirs(self.directory, exist_ok=True)
+        self._started = time.time()
+        self.path = os.path.join(self.directory, time.strftime("live-%Y%m%d-%H%M%S.jsonl.gz"))
+        self._file = gzip.open(self.path, "at", encoding="utf-8")
+        self._file.write(json.dumps({"v": FORMAT_VERSION, "started": self._started, "live": live}) + "\n")
+
+    def comment(self, user, content, at=None):
+        self._write("c", at, user, content)
+        self.counts["comments"] += 1
+
+    def send(self, text, at=None):
+        self._write("s", at, text)
+        self.counts["sends"] += 1
+
+    def _write(self, kind, at, *fields):
+        with self._lock:
+            if self._file is None:
+                try:
+                    self._open(self.get_live() if self.get_live else None)
+                except OSError as e:
+                    self.last_error = str(e)
+                    return
+            offset = int(((at or time.time()) - self._started) * 1000)
+            try:
+                self._file.write(json.dumps([kind, offset, *fields], ensure_ascii=False, separators=(",", ":")) + "\n")
+                now = time.time()
+                if now - self._last_flush >= self.flush_interval:
+                    self._file.flush()
+                    self._last_flush = now
+            except OSError as e:
+                self.last_error = str(e)
+
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def close(self):
+        """Ferme le fichier courant ; l'événement suivant en ouvre un nouveau."""
+        with self._lock:
+            self._close()
+
+    def stats(self):
+        return {"path": self.path, **self.counts, "last_error": self.last_error}
+
+
+def read_recording(path):
+    """Retourne (en-tête, [(t, user, content)], [(t, texte)]) ; t en secondes depuis le début."""
+    header, comments, sends = {}, [], []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                row = json.loads(line)
+                if isinstance(row, dict):
+                    header = row
+                elif row[0] == "c":
+                    comments.append((row[1] / 1000.0, row[2], row[3]))
+                elif row[0] == "s":
+                    sends.append((row[1] / 1000.0, row[2]))
+        except (EOFError, ValueError):
+            pass  # fin tronquée (arrêt brutal du bot) : on garde ce qui a été lu
+    comments.sort(key=lambda c: c[0])
+    return header, comments, sends
+
+
+class VirtualClock:
+    """Temps virtuel (secondes depuis le début de l'enregistrement) qui avance `speed` fois plus vite."""
+
+    def __init__(self, speed=1.0, origin=0.0):
+        self.speed = speed
+        self._origin = origin
+        self._real_origin = time.monotonic()
+
+    def time(self):
+        return self._origin + (time.monotonic() - self._real_origin) * self.speed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def sleep_until(self, moment):
+        self.sleep(moment - self.time())
+
+
+def replay(comments, speed=1.0, concurrency=3, queue_size=50, min_interval=4, max_interval=8, batch_size=1,
+           batch_window=1.5, gen_latency=0.8, gen_spread=0.5, send_latency=1.0, seed=1, drain_timeout=600):
+    """Rejoue `comments` ([(t, user, content)]) et retourne le rapport (latences en temps virtuel)."""
+    clock = VirtualClock(speed)
+    rng = random.Random(seed)
+    # Latence de génération fixée par commentaire: identique d'un rejeu à l'autre
+    mu = math.log(gen_latency) - gen_spread * gen_spread / 2 if gen_latency else 0.0
+    items = [
+        {"user": user, "content": content, "seen_at": t, "gen": rng.lognormvariate(mu, gen_spread) if gen_latency else 0.0}
+        for t, user, content in comments
+    ]
+    random.seed(seed)  # tirages du rythme d'envoi dans tik_pipeline
+    sent = []
+
+    def generate(com):
+        clock.sleep(com["gen"])
+        return f"réponse à {com['user']}"
+
+    def generate_batch(coms):
+        clock.sleep(max(c["gen"] for c in coms))
+        return [f"réponse à {c['user']}" for c in coms]
+
+    def send(com, reply):
+        clock.sleep(send_latency)
+        sent.append(clock.time())
+        return True
+
+    pipeline = ReplyPipeline(
+        generate, send, concurrency=concurrency, queue_size=queue_size, min_interval=min_interval,
+        max_interval=max_interval, generate_batch=generate_batch if batch_size > 1 else None,
+        batch_size=batch_size, batch_window=batch_window, clock=clock,
+    )
+    # Percentiles sur tout le rejeu, pas seulement la fenêtre glissante par défaut
+    pipeline.stats = {name: LatencyStats(window=len(items) + 1) for name in pipeline.stats}
+    peaks = {"ingest": 0, "send": 0}
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peaks["ingest"] = max(peaks["ingest"], pipeline.ingest_queue.qsize())
+            peaks["send"] = max(peaks["send"], pipeline.send_queue.qsize())
+            clock.sleep(0.1)
+
+    threading.Thread(target=sample, name="replay-sampler", daemon=True).start()
+    started_real = time.monotonic()
+    pipeline.start()
+    # Même rythme que live_reply_loop: les commentaires arrivent par lecture du chat
+    i = 0
+    tick = POLL_INTERVAL
+    while i < len(items):
+        clock.sleep_until(tick)
+        while i < len(items) and items[i]["seen_at"] <= tick:
+            pipeline.submit(items[i])
+            i += 1
+        tick += POLL_INTERVAL
+    end = clock.time() + drain_timeout
+    while clock.time() < end and len(sent) + pipeline.failed + pipeline.dropped < len(items):
+        clock.sleep(0.5)
+    done.set()
+
+    snap = pipeline.snapshot()
+    span = items[-1]["seen_at"] if items else 0.0
+    return {
+        "comments": len(items),
+        "duration_s": round(span, 1),
+        "speed": speed,
+        "real_s": round(time.monotonic() - started_real, 1),
+        "replies": len(sent),
+        "dropped": snap["dropped"],
+        "failed": snap["failed"],
+        "unfinished": len(items) - len(sent) - snap["dropped"] - snap["failed"],
+        "batches": snap["batches"],
+        "ingest_peak": peaks["ingest"],
+        "send_peak": peaks["send"],
+        "stages": snap["stages"],
+    }
+
+
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def _parse_speed(value):
+    return MAX_SPEED if value == "max" else float(value.rstrip("x×"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu d'un live enregistré dans le pipeline de réponses IA")
+    parser.add_argument("path", help="fichier recordings/live-*.jsonl.gz")
+    parser.add_argument("--speed", type=_parse_speed, default=10.0, help=f"1, 10, ... ou max (= {MAX_SPEED:g}×)")
+    parser.add_argument("--config", default="config.json", help="réglages du pipeline (file, concurrence, rythme, batch)")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--queue-size", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--min-interval", type=float)
+    parser.add_argument("--max-interval", type=float)
+    parser.add_argument("--gen-latency", type=float, default=0.8, help="latence IA moyenne simulée (s)")
+    parser.add_argument("--gen-spread", type=float, default=0.5, help="σ de la loi log-normale")
+    parser.add_argument("--send-latency", type=float, default=1.0, help="durée de saisie d'un message (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="rapport JSON")
+    parser.add_argument("--compare", help="rapport JSON précédent à comparer")
+    args = parser.parse_args()
+
+    from tik_settings import Settings
+    raw = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    s = Settings.from_dict(raw)
+    params = {
+        "concurrency": args.concurrency or s.CHATGPT_CONCURRENCY,
+        "queue_size": args.queue_size or s.REPLY_QUEUE_SIZE,
+        "min_interval": s.CHATGPT_MIN_INTERVAL if args.min_interval is None else args.min_interval,
+        "max_interval": s.CHATGPT_MAX_INTERVAL if args.max_interval is None else args.max_interval,
+        "batch_size": args.batch_size or s.CHATGPT_BATCH_SIZE,
+        "batch_window": s.CHATGPT_BATCH_WINDOW,
+        "gen_latency": args.gen_latency,
+        "gen_spread": args.gen_spread,
+        "send_latency": args.send_latency,
+        "seed": args.seed,
+    }
+    header, comments, sends = read_recording(args.path)
+    print(f"{len(comments)} commentaires, {len(sends)} messages envoyés pendant le live ; rejeu à {args.speed:g}×…")
+    result = replay(comments, speed=args.speed, **params)
+    report = {
+        "recording": os.path.basename(args.path),
+        "live": header.get("live"),
+        "recorded_sends": len(sends),
+        "params": params,
+        "results": result,
+    }
+    print(f"Réponses : {result['replies']}  abandonnés : {result['dropped']}  échecs : {result['failed']}  "
+          f"pics de file : {result['ingest_peak']} / {result['send_peak']}  ({result['real_s']} s réelles)")
+    print("Latences virtuelles (p50 / p95 / max, ms) :")
+    for name, lat in result["stages"].items():
+        print(f"  {name:<14}{lat['p50_ms']:>10} {lat['p95_ms']:>10} {lat['max_ms']:>10}  (n={lat['count']})")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = dict(_flatten(json.load(f)["results"]))
+        print(f"\nComparaison avec {args.compare} :")
+        for path, value in _flatten(result):
+            if path in previous and previous[path] and path not in ("real_s", "speed"):
+                print(f"  {path:<32}{previous[path]:>12} → {value:<12} ({(value / previous[path] - 1) * 100:+.1f} %)")
+
+
+if __name__ == "__main__":
+    main()
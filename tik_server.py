@@ -0,0 +1,56 @@
+"""
+Service HTTP du panel web : mode développement ou production.
+
+- "dev" : serveur de développement Flask/Werkzeug (comportement historique) ;
+- "production" : waitress (multithread) s'il est installé, sinon le serveur
+  Werkzeug threadé, sans rechargement ni debug.
+
+install_http_optimizations() ajoute sur l'application :
+- ETag + GET conditionnel (304) sur les routes choisies ;
+- compression gzip des réponses HTML/JSON/texte si le client l'accepte.
+Les réponses en streaming (flux SSE /events) ne sont jamais touchées.
+"""
+
+import gzip
+
+from flask import request
+
+COMPRESSIBLE_TYPES = ("text/html", "application/json", "text/plain")
+
+
+def install_http_optimizations(app, etag_paths=("/", "/status"), gzip_min_size=500, gzip_level=6):
+    @app.after_request
+    def _optimize(response):
+        if response.is_streamed or response.direct_passthrough or response.status_code != 200:
+            return response
+        if response.mimetype in COMPRESSIBLE_TYPES:
+            response.vary.add("Accept-Encoding")
+            if "gzip" in request.headers.get("Accept-Encoding", "") and response.content_length and \
+                    response.content_length >= gzip_min_size and "Content-Encoding" not in response.headers:
+                # mtime=0: compression déterministe, donc ETag stable pour un même contenu
+                response.set_data(gzip.compress(response.get_data(), compresslevel=gzip_level, mtime=0))
+                response.headers["Content-Encoding"] = "gzip"
+        if request.method == "GET" and request.path in etag_paths:
+            response.add_etag()
+            # Le navigateur revalide à chaque fois, mais ne retélécharge que si le contenu a changé
+            response.headers["Cache-Control"] = "no-cache"
+            response.make_conditional(request)
+        return response
+
+    return app
+
+
+def serve(app, host="0.0.0.0", port=5000, mode="dev", threads=16):
+    """Bloquant : sert l'application jusqu'à l'arrêt du processus."""
+    if mode != "production":
+        app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
+        return "dev"
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        from werkzeug.serving import make_server
+        make_server(host, port, app, threaded=True).serve_forever()
+        return "werkzeug"
+    # Chaque client SSE occupe un thread: en garder assez pour les requêtes classiques
+    waitress_serve(app, host=host, port=port, threads=threads, channel_timeout=120)
+    return "waitress"
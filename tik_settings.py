@@ -0,0 +1,251 @@
+"""
+Réglages typés, validés et rechargeables à chaud.
+
+config.json puis config_perso.json (qui surcharge) sont fusionnés, convertis
+et validés en un objet Settings immuable (__slots__). SettingsRegistry.current
+est remplacé d'un bloc à chaque rechargement : un thread qui lit
+`settings.current` voit toujours une configuration complète et cohérente.
+
+watch() surveille les deux fichiers (mtime + taille) ; un fichier invalide
+(JSON cassé, mauvais type, min > max...) est rejeté et la dernière
+configuration valide reste en place. Chaque changement est publié sur le bus
+("settings") avec les clés modifiées.
+"""
+
+import json
+import os
+import threading
+import time
+
+# (clé, type, défaut, contrainte) ; contrainte = minimum (nombres) ou choix possibles (texte)
+SCHEMA = (
+    ("WINDOW_SIZE", "ints", [1200, 1000], 100),
+    ("CHROME_HEADLESS", "bool", False, None),
+    ("CLICK_INTERVAL_MIN", "float", 0.4, 0),
+    ("CLICK_INTERVAL_MAX", "float", 1.1, 0),
+    ("HUMAN_PAUSE_FREQ_MIN", "int", 90, 1),
+    ("HUMAN_PAUSE_FREQ_MAX", "int", 150, 1),
+    ("HUMAN_PAUSE_MIN", "int", 5, 0),
+    ("HUMAN_PAUSE_MAX", "int", 60, 0),
+    ("HUMAN_DELAYS", "floats", [150.0], 0),
+    ("CLEAR_INTERVAL", "float", 150, 1),
+    ("REFRESH_INTERVAL", "float", 1200, 60),
+    ("LIVE_CHECK_INTERVAL", "float", 5, 0.5),
+    ("AUTO_MESSAGE_DELAY_MIN", "int", 30, 1),
+    ("AUTO_MESSAGE_DELAY_MAX", "int", 120, 1),
+    ("CHATGPT_SYSTEM_PROMPT", "str", "Tu es un assistant TikTok, sympathique, concis et engageant.", None),
+    ("CHATGPT_MIN_INTERVAL", "float", 4, 0),
+    ("CHATGPT_MAX_INTERVAL", "float", 8, 0),
+    ("CHATGPT_CONCURRENCY", "int", 3, 1),
+    ("REPLY_QUEUE_SIZE", "int", 50, 1),
+    ("CHATGPT_BATCH_SIZE", "int", 1, 1),
+    ("CHATGPT_BATCH_WINDOW", "float", 1.5, 0),
+    ("CHATGPT_STREAMING", "bool", False, None),
+    ("CONVERSATION_MAX_VIEWERS", "int", 2000, 1),
+    ("CONVERSATION_IDLE_TTL", "float", 1800, 0),
+    ("CONVERSATION_MAX_TURNS", "int", 10, 0),
+    ("OPENAI_BASE_URL", "str", "", None),
+    ("OPENAI_RPM", "int", 0, 0),
+    ("OPENAI_TPM", "int", 0, 0),
+    ("OPENAI_BUDGET_HOURLY", "float", 0, 0),
+    ("OPENAI_BUDGET_DAILY", "float", 0, 0),
+    ("OPENAI_COST_PER_1K_TOKENS", "float", 0.0, 0),
+    ("OPENAI_MAX_WAIT", "float", 10, 0),
+    ("REPLY_SHED_KEEP", "int", 5, 0),
+    ("REPLY_CACHE_SIZE", "int", 500, 0),
+    ("REPLY_CACHE_TTL", "float", 1800, 0),
+    ("REPLY_CACHE_VARIANTS", "int", 3, 1),
+    ("COMMENT_CAPTURE_MODE", "str", "scan", ("scan", "observer")),
+    ("COMMENT_BUFFER_SIZE", "int", 500, 1),
+    ("COMMENT_RECORD", "bool", False, None),
+    ("COMMENT_RECORD_DIR", "str", "recordings", None),
+    ("SEEN_COMMENTS_MAX", "int", 5000, 1),
+    ("SEEN_COMMENTS_TTL", "float", 600, 0),
+    ("WEB_SERVER_MODE", "str", "dev", ("dev", "production")),
+    ("WEB_SERVER_THREADS", "int", 16, 1),
+    ("WEB_GZIP_MIN_SIZE", "int", 500, 0),
+    ("CONFIG_SAVE_DELAY", "float", 0.5, 0),
+    ("TELEMETRY_INTERVAL", "float", 1.0, 0.1),
+    ("TELEMETRY_FILE", "str", "logs/telemetry.npz", None),
+)
+
+# Paires (min, max) qui doivent rester ordonnées
+RANGES = (
+    ("CLICK_INTERVAL_MIN", "CLICK_INTERVAL_MAX"),
+    ("HUMAN_PAUSE_FREQ_MIN", "HUMAN_PAUSE_FREQ_MAX"),
+    ("HUMAN_PAUSE_MIN", "HUMAN_PAUSE_MAX"),
+    ("AUTO_MESSAGE_DELAY_MIN", "AUTO_MESSAGE_DELAY_MAX"),
+    ("CHATGPT_MIN_INTERVAL", "CHATGPT_MAX_INTERVAL"),
+)
+
+# Lus une seule fois au démarrage (tailles de structures, threads, driver, serveur)
+RESTART_REQUIRED = frozenset((
+    "WINDOW_SIZE", "CHATGPT_CONCURRENCY", "REPLY_QUEUE_SIZE", "REPLY_CACHE_SIZE", "REPLY_CACHE_TTL",
+    "REPLY_CACHE_VARIANTS", "CONVERSATION_MAX_VIEWERS", "CONVERSATION_MAX_TURNS", "COMMENT_CAPTURE_MODE",
+    "COMMENT_BUFFER_SIZE", "SEEN_COMMENTS_MAX", "SEEN_COMMENTS_TTL", "WEB_SERVER_MODE", "WEB_SERVER_THREADS",
+    "WEB_GZIP_MIN_SIZE", "CONFIG_SAVE_DELAY", "OPENAI_BASE_URL",
+    "COMMENT_RECORD", "COMMENT_RECORD_DIR", "TELEMETRY_INTERVAL", "TELEMETRY_FILE",
+))
+
+
+class SettingsError(ValueError):
+    """Configuration rejetée ; `errors` liste chaque problème trouvé."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _coerce(key, kind, value, constraint):
+    if kind == "bool":
+        if not isinstance(value, bool):
+            raise ValueError(f"{key}: booléen attendu")
+        return value
+    if kind == "str":
+        if not isinstance(value, str):
+            raise ValueError(f"{key}: texte attendu")
+        if constraint and value not in constraint:
+            raise ValueError(f"{key}: valeur parmi {', '.join(constraint)} attendue")
+        return value
+    if kind in ("ints", "floats"):
+        if not isinstance(value, list) or not value or not all(_is_number(v) for v in value):
+            raise ValueError(f"{key}: liste de nombres non vide attendue")
+        item = int if kind == "ints" else float
+        if kind == "ints" and not all(float(v).is_integer() for v in value):
+            raise ValueError(f"{key}: entiers attendus")
+        if constraint is not None and min(value) < constraint:
+            raise ValueError(f"{key}: valeurs >= {constraint} attendues")
+        return tuple(item(v) for v in value)
+    if not _is_number(value):
+        raise ValueError(f"{key}: nombre attendu")
+    if kind == "int":
+        if not float(value).is_integer():
+            raise ValueError(f"{key}: entier attendu")
+        value = int(value)
+    else:
+        value = float(value)
+    if constraint is not None and value < constraint:
+        raise ValueError(f"{key}: valeur >= {constraint} attendue")
+    return value
+
+
+class Settings:
+    """Instantané immuable des réglages ; un attribut par clé du SCHEMA."""
+
+    __slots__ = tuple(key for key, *_ in SCHEMA)
+
+    def __init__(self, values):
+        for key in self.__slots__:
+            object.__setattr__(self, key, values[key])
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Settings est immuable: modifier le fichier de configuration")
+
+    @classmethod
+    def from_dict(cls, raw):
+        values, errors = {}, []
+        for key, kind, default, constraint in SCHEMA:
+            try:
+                values[key] = _coerce(key, kind, raw.get(key, default), constraint)
+            except ValueError as e:
+                errors.append(str(e))
+        for low, high in RANGES:
+            if low in values and high in values and values[low] > values[high]:
+                errors.append(f"{low} ({values[low]}) > {high} ({values[high]})")
+        if errors:
+            raise SettingsError(errors)
+        return cls(values)
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def diff(self, other):
+        """Clés dont la valeur diffère de `other` → nouvelle valeur."""
+        return {key: getattr(self, key) for key in self.__slots__ if getattr(self, key) != getattr(other, key)}
+
+
+class SettingsRegistry:
+    """Réglages courants + surveillance des fichiers de configuration."""
+
+    def __init__(self, paths, bus=None, interval=2.0, on_error=None):
+        self.paths = list(paths)
+        self.bus = bus
+        self.interval = interval
+        self.on_error = on_error
+        self.current = None
+        self.raw = {}
+        self.reloads = 0
+        self.rejected = 0
+        self.last_error = None
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        merged = {}
+        for path in self.paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise SettingsError([f"{os.path.basename(path)}: objet JSON attendu"])
+            merged.update(data)
+        return merged
+
+    def load(self):
+        """Lit et valide les fichiers ; lève OSError/ValueError sans rien changer si invalide."""
+        with self._lock:
+            # Signatures relevées avant lecture: une écriture pendant la lecture sera revue au prochain poll
+            self._signatures = {path: self._signature(path) for path in self.paths}
+            raw = self._read()
+            new = Settings.from_dict(raw)
+            old, old_raw = self.current, self.raw
+            self.current, self.raw = new, raw
+        return old, old_raw, new
+
+    def reload(self):
+        """Recharge ; retourne les clés modifiées, ou None si la configuration est rejetée."""
+        try:
+            old, old_raw, new = self.load()
+        except (OSError, ValueError) as e:
+            self.rejected += 1
+            self.last_error = str(e)
+            if self.on_error:
+                self.on_error(e)
+            return None
+        self.last_error = None
+        changed = new.diff(old) if old is not None else {}
+        if self.raw != old_raw:
+            self.reloads += 1
+            if self.bus is not None:
+                self.bus.publish("settings", {"changed": changed, "settings": new, "raw": self.raw})
+        return changed
+
+    def poll(self):
+        """Recharge si un des fichiers a changé depuis la dernière lecture."""
+        if any(self._signature(path) != sig for path, sig in self._signatures.items()):
+            return self.reload()
+        return {}
+
+    def watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = str(e)
+
+    def stats(self):
+        return {"reloads": self.reloads, "rejected": self.rejected, "last_error": self.last_error}
@@ -0,0 +1,174 @@
+"""
+État d'exécution partagé + bus d'événements en mémoire.
+
+Remplace les globales de module (copiées à l'import par tik_frontend, donc
+périmées) : chaque valeur vit dans un StateStore thread-safe, chaque
+modification incrémente une version et est publiée une seule fois sur le bus.
+L'UI Qt, le panel web et les logs s'abonnent au lieu de sonder.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
+
+
+class EventBus:
+    """Publish/subscribe synchrone par sujet ; un abonné en erreur n'affecte pas les autres."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, callback):
+        with self._lock:
+            # Copie à l'écriture: publish() lit la liste sans verrou
+            self._subscribers[topic] = self._subscribers.get(topic, ()) + (callback,)
+        return callback
+
+    def unsubscribe(self, topic, callback):
+        with self._lock:
+            self._subscribers[topic] = tuple(cb for cb in self._subscribers.get(topic, ()) if cb is not callback)
+
+    def publish(self, topic, payload):
+        for callback in self._subscribers.get(topic, ()):
+            try:
+                callback(payload)
+            except Exception:
+                pass
+
+
+class StateStore:
+    """Valeurs d'exécution versionnées ; chaque changement publie un événement "state"."""
+
+    def __init__(self, bus, **initial):
+        self.bus = bus
+        self.version = 0
+        self._values = dict(initial)
+        self._snapshot = None
+        self._lock = threading.Lock()
+        # Publication dans l'ordre des versions (réentrant: un abonné peut modifier l'état)
+        self._publish_lock = threading.RLock()
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def _changed(self, key, value, version):
+        self.bus.publish("state", {"key": key, "value": value, "version": version})
+
+    def set(self, key, value):
+        with self._publish_lock:
+            with self._lock:
+                if key in self._values and self._values[key] == value:
+                    return value
+                self._values[key] = value
+                self.version += 1
+                version = self.version
+                self._snapshot = None
+            self._changed(key, value, version)
+        return value
+
+    def incr(self, key, amount=1):
+        """Incrément atomique ; retourne la nouvelle valeur."""
+        with self._publish_lock:
+            with self._lock:
+                value = self._values.get(key, 0) + amount
+                self._values[key] = value
+                self.version += 1
+                version = self.version
+                self._snapshot = None
+            self._changed(key, value, version)
+        return value
+
+    def snapshot(self):
+        """(version, vue en lecture seule) ; recalculée seulement après un changement."""
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = (self.version, MappingProxyType(dict(self._values)))
+            return self._snapshot
+
+
+class StateStream:
+    """Diffusion des changements d'état vers des clients Server-Sent Events.
+
+    Garde les derniers événements pour rejouer le delta depuis un Last-Event-ID ;
+    si l'id est trop ancien (ou un client a pris du retard), un instantané
+    complet est renvoyé à la place.
+    """
+
+    def __init__(self, store, history=256, client_queue=256):
+        self.store = store
+        self.client_queue = client_queue
+        self._history = deque(maxlen=history)
+        self._clients = set()
+        self._lock = threading.Lock()
+        store.bus.subscribe("state", self._on_state)
+
+    def _on_state(self, event):
+        with self._lock:
+            self._history.append(event)
+            clients = list(self._clients)
+        for q in clients:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                q.lagging = True
+
+    def clients(self):
+        return len(self._clients)
+
+    @staticmethod
+    def _format(kind, event_id, payload):
+        return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    def _snapshot_event(self):
+        version, snap = self.store.snapshot()
+        return self._format("snapshot", version, {"state": dict(snap), "server_time": time.time()})
+
+    def _replay(self, last_id):
+        """Événements postérieurs à last_id, ou None si l'historique ne remonte pas assez loin."""
+        with self._lock:
+            history = list(self._history)
+        if last_id >= self.store.version:
+            return []
+        missed = [ev for ev in history if ev["version"] > last_id]
+        if not missed or missed[0]["version"] != last_id + 1:
+            return None
+        return missed
+
+    def listen(self, last_id=None, heartbeat=15):
+        """Générateur de messages SSE pour un client (un par connexion HTTP)."""
+        q = queue.Queue(maxsize=self.client_queue)
+        q.lagging = False
+        with self._lock:
+            self._clients.add(q)
+        try:
+            missed = None
+            if last_id is not None:
+                try:
+                    missed = self._replay(int(last_id))
+                except ValueError:
+                    missed = None
+            if missed is None:
+                yield self._snapshot_event()
+            else:
+                for ev in missed:
+                    yield self._format("state", ev["version"], ev)
+            while True:
+                try:
+                    ev = q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"  # garde la connexion (et le tunnel ngrok) ouverte
+                    continue
+                if q.lagging:
+                    q.lagging = False
+                    while not q.empty():
+                        q.get_nowait()
+                    yield self._snapshot_event()
+                    continue
+                yield self._format("state", ev["version"], ev)
+        finally:
+            with self._lock:
+                self._clients.discard(q)
@@ -0,0 +1,39 @@
+"""
+Statistiques de latence partagées (pipeline IA, exécuteur WebDriver, journal
+d'événements, benchmarks) : percentile sur une liste triée et fenêtre
+glissante de mesures avec résumé p50/p95/max.
+"""
+
+import threading
+from collections import deque
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class LatencyStats:
+    """Fenêtre glissante de latences (secondes) avec percentiles."""
+
+    def __init__(self, window=500):
+        self.count = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.count += 1
+            self._samples.append(seconds)
+
+    def summary(self):
+        with self._lock:
+            values = sorted(self._samples)
+        return {
+            "count": self.count,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "max_ms": round((values[-1] if values else 0.0) * 1000, 1),
+        }
@@ -0,0 +1,166 @@
+"""
+Échantillonneur de télémétrie système en arrière-plan.
+
+Un thread dédié relève à cadence fixe (1 s par défaut) :
+- le débit réseau montant / descendant de la machine (Kio/s, calculé sur le
+  temps réellement écoulé, donc juste même si un relevé prend du retard) ;
+- CPU (%) et mémoire résidente (Mo) du bot, de chromedriver et des processus
+  Chrome (tous les descendants du bot autres que chromedriver).
+
+L'arborescence des processus est relue toutes les `scan_interval` secondes
+seulement ; les objets psutil sont gardés d'un relevé à l'autre, ce qui rend
+cpu_percent() non bloquant.
+
+L'historique (1 s sur une heure, 1 min sur une journée) est un
+MultiResolutionSeries sauvegardé régulièrement sur disque et rechargé au
+démarrage ; la fenêtre Qt et le panel web le lisent sans refaire de mesure.
+"""
+
+import os
+import time
+
+import psutil
+
+from tik_timeseries import MultiResolutionSeries
+
+COLUMNS = (
+    "net_up_kib_s", "net_down_kib_s",
+    "bot_cpu", "bot_rss_mb",
+    "driver_cpu", "driver_rss_mb",
+    "chrome_cpu", "chrome_rss_mb",
+)
+LEVELS = ((1, 3600), (60, 1440))
+
+
+class TelemetrySampler:
+    def __init__(self, interval=1.0, path=None, save_interval=60.0, scan_interval=10.0, on_sample=None):
+        self.interval = interval
+        self.path = path
+        self.save_interval = save_interval
+        self.scan_interval = scan_interval
+        self.on_sample = on_sample
+        self.series = MultiResolutionSeries(COLUMNS, LEVELS)
+        self.samples = 0
+        self.late = 0
+        self.sample_seconds = 0.0
+        self.last_error = None
+        self._process = psutil.Process()
+        self._groups = {"driver": [], "chrome": []}
+        self._scanned_at = 0.0
+        self._net = None
+        if path and os.path.exists(path):
+            try:
+                self.series.load(path)
+            except Exception as e:
+                self.last_error = f"chargement: {e}"
+
+    def _scan(self):
+        groups = {"driver": [], "chrome": []}
+        try:
+            children = self._process.children(recursive=True)
+        except psutil.Error:
+            children = []
+        known = {p.pid: p for group in self._groups.values() for p in group}
+        for child in children:
+            # Réutiliser l'objet déjà connu: cpu_percent() mesure depuis son dernier appel
+            proc = known.get(child.pid, child)
+            try:
+                name = proc.name().lower()
+            except psutil.Error:
+                continue
+            groups["driver" if "chromedriver" in name else "chrome"].append(proc)
+        self._groups = groups
+
+    @staticmethod
+    def _usage(processes):
+        cpu = rss = 0.0
+        for proc in processes:
+            try:
+                cpu += proc.cpu_percent(None)
+                rss += proc.memory_info().rss
+            except psutil.Error:
+                pass  # processus terminé depuis le dernier scan
+        return cpu, rss / (1024 * 1024)
+
+    def sample(self):
+        """Un relevé ; retourne les valeurs dans l'ordre de COLUMNS."""
+        now = time.time()
+        if now - self._scanned_at >= self.scan_interval:
+            self._scan()
+            self._scanned_at = now
+        counters = psutil.net_io_counters()
+        mono = time.monotonic()
+        up = down = 0.0
+        if self._net is not None:
+            elapsed = max(1e-3, mono - self._net[0])
+            up = (counters.bytes_sent - self._net[1]) / 1024 / elapsed
+            down = (counters.bytes_recv - self._net[2]) / 1024 / elapsed
+        self._net = (mono, counters.bytes_sent, counters.bytes_recv)
+        values = (
+            (up, down)
+            + self._usage([self._process])
+            + self._usage(self._groups["driver"])
+            + self._usage(self._groups["chrome"])
+        )
+        self.series.add(now, values)
+        self.samples += 1
+        if self.on_sample is not None:
+            self.on_sample(values)
+        return values
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.series.save(self.path)
+        except Exception as e:
+            self.last_error = f"sauvegarde: {e}"
+
+    def run(self):
+        """Boucle du thread "telemetry" : cadence fixe, sans dérive."""
+        next_tick = time.monotonic()
+        saved_at = time.monotonic()
+        while True:
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                self.last_error = str(e)
+            self.sample_seconds = time.monotonic() - started
+            if started - saved_at >= self.save_interval:
+                self.save()
+                saved_at = started
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Relevé en retard (machine chargée) : on repart du présent plutôt que d'enchaîner
+                self.late += 1
+                next_tick = time.monotonic()
+                delay = 0
+            time.sleep(delay)
+
+    def latest(self):
+        last = self.series.latest()
+        if last is None:
+            return None
+        t, values = last
+        return {"time": float(t), **{name: round(float(v), 2) for name, v in zip(COLUMNS, values)}}
+
+    def query(self, window=3600, max_points=300):
+        """Historique pour le panel web : {"time": [...], colonne: [...]}."""
+        t, values = self.series.window(window, max_points, time.time())
+        result = {"time": [round(float(x), 1) for x in t]}
+        for i, name in enumerate(COLUMNS):
+            result[name] = [round(float(v), 2) for v in values[:, i]]
+        return result
+
+    def stats(self):
+        return {
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "late": self.late,
+            "sample_ms": round(self.sample_seconds * 1000, 2),
+            "processes": {group: len(procs) for group, procs in self._groups.items()},
+            "last_error": self.last_error,
+        }
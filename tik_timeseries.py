@@ -0,0 +1,121 @@
+"""
+Séries temporelles en mémoire pour les graphes temps réel.
+
+RingBuffer : tableau numpy préalloué (capacité × colonnes) ; push() écrit une
+ligne en O(1), sans list.pop(0) ni réallocation.
+
+MultiResolutionSeries : un RingBuffer par pas de temps (1 s, 10 s, 60 s par
+défaut). Chaque échantillon va dans le niveau le plus fin ; les niveaux plus
+grossiers reçoivent la moyenne de chaque intervalle terminé. window() prend
+le niveau le plus fin qui couvre la fenêtre demandée puis la réduit à
+`max_points` au plus : le coût du tracé ne dépend pas de la durée affichée.
+save()/load() conservent l'historique entre deux lancements (fichier .npz).
+"""
+
+import math
+import os
+import threading
+
+import numpy as np
+
+# (pas en secondes, nombre de points) : 1 h à la seconde, 6 h à 10 s, 24 h à la minute
+DEFAULT_LEVELS = ((1, 3600), (10, 2160), (60, 1440))
+
+
+class RingBuffer:
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, columns))
+        self.count = 0  # lignes écrites depuis la création
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def push(self, row):
+        self.data[self.count % self.capacity] = row
+        self.count += 1
+
+    def view(self, last=None):
+        """Les `last` dernières lignes, de la plus ancienne à la plus récente (copie)."""
+        n = len(self) if last is None else min(last, len(self))
+        end = self.count % self.capacity
+        start = (end - n) % self.capacity
+        if n == 0 or start < end:
+            return self.data[start:start + n].copy()
+        return np.concatenate((self.data[start:], self.data[:end]))
+
+
+class MultiResolutionSeries:
+    def __init__(self, names, levels=DEFAULT_LEVELS):
+        self.names = tuple(names)
+        width = 1 + len(self.names)  # colonne 0 = horodatage
+        self.levels = [(step, RingBuffer(capacity, width)) for step, capacity in levels]
+        # Intervalle en cours par niveau grossier: [début, sommes, nombre]
+        self._pending = [None] * len(self.levels)
+        self._lock = threading.Lock()
+
+    def add(self, t, values):
+        row = np.empty(1 + len(self.names))
+        row[0] = t
+        row[1:] = values
+        with self._lock:
+            self.levels[0][1].push(row)
+            for i in range(1, len(self.levels)):
+                step, ring = self.levels[i]
+                bucket = t // step * step
+                pending = self._pending[i]
+                if pending is not None and pending[0] != bucket:
+                    # Point horodaté au milieu de l'intervalle terminé
+                    ring.push(np.concatenate(([pending[0] + step / 2], pending[1] / pending[2])))
+                    pending = None
+                if pending is None:
+                    pending = self._pending[i] = [bucket, np.zeros(len(self.names)), 0]
+                pending[1] += row[1:]
+                pending[2] += 1
+
+    def save(self, path):
+        """Écriture atomique (fichier temporaire puis os.replace) de tous les niveaux."""
+        with self._lock:
+            arrays = {f"level_{step}": ring.view() for step, ring in self.levels}
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, names=np.array(self.names), **arrays)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        """Recharge un historique sauvegardé ; ignoré si les colonnes ont changé."""
+        with np.load(path) as saved:
+            if tuple(saved["names"]) != self.names:
+                return False
+            with self._lock:
+                for step, ring in self.levels:
+                    key = f"level_{step}"
+                    if key in saved:
+                        for row in saved[key][-ring.capacity:]:
+                            ring.push(row)
+        return True
+
+    def latest(self):
+        """Dernier échantillon (t, valeurs) ou None."""
+        with self._lock:
+            ring = self.levels[0][1]
+            if not len(ring):
+                return None
+            row = ring.view(1)[0]
+        return row[0], row[1:]
+
+    def window(self, seconds, max_points=300, now=None):
+        """(t, valeurs) sur les `seconds` dernières secondes, au plus `max_points` points."""
+        step, ring = self.levels[-1]
+        for step, ring in self.levels:
+            if step * ring.capacity >= seconds:
+                break
+        with self._lock:
+            data = ring.view(int(math.ceil(seconds / step)) + 1)
+        if now is not None and len(data):
+            data = data[data[:, 0] >= now - seconds]
+        if len(data) > max_points:
+            # Moyenne par paquets de `factor` points, en gardant les plus récents entiers
+            factor = int(math.ceil(len(data) / max_points))
+            data = data[len(data) % factor:].reshape(-1, factor, data.shape[1]).mean(axis=1)
+        return data[:, 0], data[:, 1:]